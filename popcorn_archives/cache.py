@@ -0,0 +1,146 @@
+import sqlite3
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from collections import namedtuple
+from urllib.parse import urlencode
+from . import config as config_manager
+
+CACHE_FILE = os.path.join(config_manager.APP_DIR, 'http_cache.db')
+
+# Responses younger than the TTL are served without touching the network.
+# Older ones are revalidated with their ETag, and still used as a fallback
+# when TMDb cannot be reached. Unless configure() is given a TTL, it comes
+# from the CACHE_TTL_DAYS setting. Entries are only evicted, oldest first,
+# once the cache outgrows MAX_CACHE_BYTES.
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+PRUNE_EVERY = 500
+
+CachedResponse = namedtuple('CachedResponse', ['payload', 'etag', 'fresh'])
+
+_settings = {'enabled': True, 'refresh': False, 'ttl': None}
+_lock = threading.Lock()
+_writes_since_prune = 0
+_local = threading.local()
+
+def configure(enabled=True, refresh=False, ttl=None):
+    """
+    Sets the cache mode for this process.
+    `enabled=False` bypasses the cache entirely; `refresh=True` ignores
+    fresh entries so every response is revalidated with TMDb. `ttl` is in
+    seconds and overrides the configured CACHE_TTL_DAYS.
+    """
+    _settings.update(enabled=enabled, refresh=refresh, ttl=ttl)
+
+def get_ttl():
+    """Returns the TTL in seconds."""
+    return _settings['ttl'] or config_manager.get_settings().cache_ttl_days * 24 * 60 * 60
+
+def is_enabled():
+    return _settings['enabled']
+
+def _connect():
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    conn = sqlite3.connect(CACHE_FILE, timeout=10)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            etag TEXT,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL
+        )
+    ''')
+    return conn
+
+def get_cache_connection():
+    """
+    Returns this thread's cache connection, opening it (and creating the
+    table) on first use, like database.get_db_connection.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.path != CACHE_FILE or _local.pid != os.getpid():
+        conn = _connect()
+        _local.conn, _local.path, _local.pid = conn, CACHE_FILE, os.getpid()
+    return conn
+
+def close_cache_connection():
+    """Closes this thread's cache connection, if one is open."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+
+atexit.register(close_cache_connection)
+
+def make_key(path, params):
+    """
+    Builds a stable cache key from an API path and its query parameters.
+    The API key is left out and the search query is normalized, so
+    "The  Matrix" and "the matrix" share one entry.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if name == 'api_key':
+            continue
+        if name == 'query':
+            value = re.sub(r'\s+', ' ', str(value)).strip().lower()
+        normalized[name] = value
+    return f"{path}?{urlencode(sorted(normalized.items()))}"
+
+def get(key):
+    """Returns the cached response for `key`, or None if there is none."""
+    with get_cache_connection() as conn:
+        row = conn.execute("SELECT payload, etag, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    payload, etag, stored_at = row
+    fresh = not _settings['refresh'] and (time.time() - stored_at) < get_ttl()
+    return CachedResponse(json.loads(payload), etag, fresh)
+
+def put(key, payload, etag=None):
+    """Stores a response body, pruning the cache every so often."""
+    global _writes_since_prune
+    body = json.dumps(payload)
+    with get_cache_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, payload, etag, size, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (key, body, etag, len(body), time.time())
+        )
+    with _lock:
+        _writes_since_prune += 1
+        should_prune = _writes_since_prune >= PRUNE_EVERY
+        if should_prune:
+            _writes_since_prune = 0
+    if should_prune:
+        prune()
+
+def touch(key):
+    """Marks an entry as fresh again after TMDb confirmed it is unchanged (HTTP 304)."""
+    with get_cache_connection() as conn:
+        conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+def prune(max_bytes=MAX_CACHE_BYTES):
+    """
+    Drops the oldest entries until the cache fits within `max_bytes`.
+    Stale entries are otherwise kept: they still serve ETag revalidation
+    and the offline fallback. Returns the number of entries removed.
+    """
+    with get_cache_connection() as conn:
+        removed = conn.execute('''
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY stored_at DESC, key) AS running_size
+                    FROM responses
+                ) WHERE running_size > ?
+            )
+        ''', (max_bytes,)).rowcount
+    return removed
+
+def clear():
+    """Removes every cached response."""
+    with get_cache_connection() as conn:
+        conn.execute("DELETE FROM responses")
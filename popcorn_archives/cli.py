@@ -1,21 +1,23 @@
 import click
 import os
-import csv
-import time
-from tqdm import tqdm
 from click import version_option
-from importlib.metadata import version
 from . import database
 from . import config as config_manager
-import inquirer
-import textwrap
 from . import logger as app_logger
-import click_completion
 
-click_completion.init()
+# Accepted by the --since/--until options of `log view` and `export`.
+_DATETIME_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S']
+
+# Heavy libraries (inquirer, tqdm, requests, ...) are imported inside the
+# commands that need them, so quick commands like `watch` or `random`
+# start almost instantly. Completion support is only loaded when the
+# shell is actually asking for completions.
+if '_POPARCH_COMPLETE' in os.environ:
+    import click_completion
+    click_completion.init()
 
 @click.group(context_settings=dict(help_option_names=['-h', '--help'], max_content_width=120))
-@version_option(version=version("popcorn-archives"), prog_name="popcorn-archives")
+@version_option(package_name="popcorn-archives", prog_name="popcorn-archives")
 def cli():
     """
     Popcorn Archives: A CLI tool for managing your movie watchlist.
@@ -32,8 +34,10 @@ def cli():
 @cli.command()
 def stats():
     """Displays a beautiful and personalized dashboard of your movie archive."""
-    
-    total_count = database.get_total_movies_count()
+    from . import stats as archive_stats
+
+    dashboard = archive_stats.get_dashboard(top_n=3)
+    total_count = dashboard['total']
     if total_count == 0:
         click.echo("The archive is empty. Add some movies first!")
         return
@@ -44,21 +48,16 @@ def stats():
     # --- Section 1: Archive Overview ---
     click.echo(click.style("\n--- Archive Overview ---", bold=True))
     click.echo(f"  {'Total Movies:':<18} {click.style(str(total_count), fg='green', bold=True)}")
-    
-    watched_stats = database.get_watched_stats()
-    if watched_stats and watched_stats[0] is not None:
-        watched_count, unwatched_count = watched_stats
-        click.echo(f"  {'- Watched:':<17} {watched_count}")
-        click.echo(f"  {'- Unwatched:':<17} {unwatched_count}")
+    click.echo(f"  {'- Watched:':<17} {dashboard['watched']}")
+    click.echo(f"  {'- Unwatched:':<17} {dashboard['unwatched']}")
     
     click.echo("") # Add spacing
     
-    oldest = database.get_oldest_movie()
-    newest = database.get_newest_movie()
+    oldest, newest = dashboard['oldest'], dashboard['newest']
     if oldest and newest:
-        click.echo(f"  {'Oldest Movie:':<18} {oldest[0]['title']} ({oldest[0]['year']})")
-        click.echo(f"  {'Newest Movie:':<18} {newest[0]['title']} ({newest[0]['year']})")
-        time_span = newest[0]['year'] - oldest[0]['year']
+        click.echo(f"  {'Oldest Movie:':<18} {oldest['title']} ({oldest['year']})")
+        click.echo(f"  {'Newest Movie:':<18} {newest['title']} ({newest['year']})")
+        time_span = newest['year'] - oldest['year']
         click.echo(f"  {'Time Span:':<18} Covering {time_span} years of cinema")
 
     # --- Section 2: Your Taste Profile ---
@@ -76,28 +75,26 @@ def stats():
             # Use fixed-width formatting for alignment
             click.echo(f"    {prefix:<3} {name:<25} ({count} movies)")
 
-    print_top_list("Top Genres", database.get_top_items_from_column('genre', limit=3))
-    print_top_list("Favorite Directors", database.get_top_items_from_column('director', limit=3), is_ranked=False)
-    print_top_list("Most Frequent Actors", database.get_top_items_from_column('cast', limit=3), is_ranked=False)
-    print_top_list("Favorite Topics", database.get_top_items_from_column('keywords', limit=3))
+    print_top_list("Top Genres", dashboard['top_genres'])
+    print_top_list("Favorite Directors", dashboard['top_directors'], is_ranked=False)
+    print_top_list("Most Frequent Actors", dashboard['top_actors'], is_ranked=False)
+    print_top_list("Favorite Topics", dashboard['top_keywords'])
 
     # --- Section 3: Hidden Gems & Fun Facts ---
     click.echo(click.style("\n--- Hidden Gems & Fun Facts ---", bold=True))
     
-    shortest, longest = database.get_extreme_runtime_movies()
+    shortest, longest = dashboard['shortest'], dashboard['longest']
     if shortest and longest:
         click.echo(f"  {'Marathon Movie:':<20} {longest['title']} ({longest['year']}) - {longest['runtime']} min")
         click.echo(f"  {'Shortest Film:':<20} {shortest['title']} ({shortest['year']}) - {shortest['runtime']} min")
 
-    top_decade = database.get_top_decade()
-    if top_decade:
-        click.echo(f"  {'Your Golden Decade:':<20} The {int(top_decade['decade'])}s (with {top_decade['movie_count']} movies)")
+    if dashboard['top_decade']:
+        decade, decade_count = dashboard['top_decade']
+        click.echo(f"  {'Your Golden Decade:':<20} The {decade}s (with {decade_count} movies)")
     
-    # --- NEW: Add Highest Rated Movie ---
-    top_movie, top_rating = database.get_highest_rated_movie()
+    top_movie = dashboard['top_rated']
     if top_movie:
-        click.echo(f"  {'Your Top Rated:':<20} {top_movie['title']} ({top_movie['year']}) - ({top_rating}/10 ⭐)")
-    # ------------------------------------
+        click.echo(f"  {'Your Top Rated:':<20} {top_movie['title']} ({top_movie['year']}) - ({top_movie['user_rating']}/10 ⭐)")
     
     click.echo("")
 
@@ -134,7 +131,12 @@ def safe_echo(text):
 
 @cli.command()
 @click.argument('path', type=click.Path(exists=True, file_okay=False))
-def scan(path):
+@click.option('--depth', type=click.IntRange(1, 32), default=1, show_default=True, help="How many folder levels below PATH to search (e.g. 2 for Movies/<Genre>/<Title (Year)>).")
+@click.option('--workers', type=click.IntRange(1, 64), default=8, show_default=True, help="Number of folders listed concurrently.")
+@click.option('--incremental', is_flag=True, help="Only re-read folders that changed since the last scan.")
+@click.option('--watch', is_flag=True, help="Keep running and sync the archive whenever movie folders are added, renamed or removed.")
+@click.option('--poll', 'poll_interval', type=click.FloatRange(min=1), help="With --watch, rescan every N seconds instead of using inotify.")
+def scan(path, depth, workers, incremental, watch, poll_interval):
     """
     Scans a directory for movie folders and adds them to the archive.
 
@@ -149,12 +151,25 @@ def scan(path):
     Example:
       - Scan a local directory of movies:
         poparch scan /path/to/my/movies
+      - Scan a nested library, re-reading only changed folders:
+        poparch scan /mnt/nas/Movies --depth 2 --incremental
+      - Keep the archive in sync with a library:
+        poparch scan /mnt/nas/Movies --depth 2 --watch
     """
     # Lazy loading for performance and to keep other commands fast.
     from . import core
+    import inquirer
+    from tqdm import tqdm
+
+    if watch:
+        _watch_library(path, depth, workers, poll_interval)
+        return
 
     # Step 1: Scan the directory to find valid and invalid movie folders.
-    valid_movies, invalid_folders = core.scan_movie_folders(path)
+    with tqdm(desc="Scanning for movies", unit=" folders") as pbar:
+        valid_movies, invalid_folders = core.scan_movie_folders(
+            path, depth=depth, workers=workers, incremental=incremental, progress=pbar.update
+        )
 
     # Step 2: Report any folders that could not be parsed.
     if invalid_folders:
@@ -185,21 +200,16 @@ def scan(path):
         app_logger.log_info("User cancelled scan operation.")
         return
 
-    # Step 4: Add movies to the database with a progress bar and prepare log data.
-    added_count = 0
-    skipped_count = 0
-    added_titles = [] # FIX: Initialize the list to store names for logging.
-
-    for title, year in tqdm(valid_movies, desc="Adding to database"):
-        if database.add_movie(title, year):
-            added_count += 1
-            added_titles.append(f"'{title} ({year})'") # Append successful adds to the list.
-        else:
-            skipped_count += 1
+    # Step 4: Add movies to the database in batched transactions.
+    with tqdm(total=len(valid_movies), desc="Adding to database") as pbar:
+        added_count, skipped_count = database.add_movies_bulk(valid_movies, progress=pbar.update)
     
-    # Step 5: Log the successfully added movies in a detailed message.
-    if added_titles:
-        app_logger.log_info(f"Added {added_count} movies via scan: {', '.join(added_titles)}")
+    # Step 5: Log a summary of the operation.
+    if added_count:
+        app_logger.log_info(
+            f"Added {added_count} movies via scan of '{path}' ({skipped_count} already in archive).",
+            operation='scan', added=added_count, skipped=skipped_count
+        )
     
     # Step 6: Print the final summary report to the user.
     click.echo(click.style("\nOperation complete:", bold=True))
@@ -207,28 +217,61 @@ def scan(path):
     if skipped_count > 0:
         click.echo(click.style(f"  {skipped_count} movies were already in the archive.", fg='yellow'))
 
+def _watch_library(path, depth, workers, poll_interval):
+    """Runs `scan --watch` until interrupted, reporting every change it applies."""
+    from . import watcher
+
+    def report(inserted, removed_count):
+        for title, year in inserted:
+            safe_echo(click.style(f"  + {title} ({year})", fg='green'))
+        if removed_count:
+            click.echo(click.style(f"  - {removed_count} movies removed (folders deleted or renamed)", fg='yellow'))
+
+    def report_error(message):
+        click.echo(click.style(f"  ! {message}", fg='red'))
+
+    trigger = watcher.PollingTrigger(poll_interval) if poll_interval else None
+    library = watcher.LibraryWatcher(path, depth=depth, workers=workers, trigger=trigger,
+                                     on_change=report, on_error=report_error)
+    if library.enricher:
+        click.echo("New movies will be queued for TMDb enrichment.")
+    click.echo(f"Watching '{path}' for changes. Press Ctrl+C to stop.")
+    try:
+        library.run()
+    except KeyboardInterrupt:
+        click.echo("\nStopped watching.")
+    except OSError as e:
+        app_logger.log_error(f"Watch mode stopped for '{path}': {e}")
+        click.echo(click.style(f"Error: Watch mode stopped: {e}", fg='red'))
+
 @cli.command(name="import")
 @click.argument('filepath', type=click.Path(exists=True, dir_okay=False))
 @click.option('--letterboxd', is_flag=True, help="Import data from a Letterboxd ZIP export.")
-def import_data(filepath, letterboxd):
+@click.option('--column', help="Column holding the movie names: a header name or a 1-based number (default: first column).")
+@click.option('--delimiter', help="CSV field delimiter, e.g. ';' or 'tab' (default: detected from the file).")
+def import_data(filepath, letterboxd, column, delimiter):
     """Imports movies from a standard CSV, Excel, or a Letterboxd ZIP file."""
 
     from . import core, database
+    import csv
+    import zipfile
+    import inquirer
+    from tqdm import tqdm
 
     # --- Mode 1: Letterboxd Import ---
     if letterboxd:
         click.echo("Processing Letterboxd export file...")
-        to_update, to_add, error = core.process_letterboxd_zip(filepath)
+        to_update, to_add, watchlist, error = core.process_letterboxd_zip(filepath)
         if error:
             click.echo(click.style(error["Error"], fg='red')); return
 
-        click.echo(f"Found {len(to_update)} movies to update and {len(to_add)} new movies.")
-        if not to_update and not to_add:
+        click.echo(f"Found {len(to_update)} movies to update, {len(to_add)} new movies and {len(watchlist)} watchlist entries.")
+        if not to_update and not to_add and not watchlist:
             click.echo("Nothing to import."); return
 
         movies_to_process = []
-        if to_add:
-            questions = [inquirer.List('choice', message="What to do with new movies?", choices=['Add all new movies', 'Only update existing movies', 'Abort'])]
+        if to_add or watchlist:
+            questions = [inquirer.List('choice', message="What to do with new movies and watchlist entries?", choices=['Add all new movies', 'Only update existing movies', 'Abort'])]
             answer = inquirer.prompt(questions)
             
             if not answer or answer['choice'] == 'Abort':
@@ -237,67 +280,63 @@ def import_data(filepath, letterboxd):
             if answer['choice'] == 'Add all new movies':
                 movies_to_process.extend(to_add)
             else:
-                skipped_list = [f"{m['title']} ({m['year']})" for m in to_add]
+                skipped_list = [f"{m['title']} ({m['year']})" for m in to_add] + watchlist
                 click.echo(click.style("\nThe following movies will be skipped:", bold=True))
                 click.echo(", ".join(skipped_list))
+                watchlist = []
         
         movies_to_process.extend(to_update)
-        if not movies_to_process:
+        if not movies_to_process and not watchlist:
             click.echo("No movies selected for processing. Exiting."); return
 
-        updated_log, added_log = [], []
-        for movie in tqdm(movies_to_process, desc="Importing from Letterboxd"):
-            # Use the original title for updating if it exists ---
-            title_to_update = movie.get('original_title', movie['title'])
-            
-            # Check if the movie is new, even if it's in the update list (edge case)
-            is_new = not database.get_movie_details(title_to_update, movie['year'])
-            if is_new:
-                database.add_movie(movie['title'], movie['year']) # Add with the official Letterboxd title
-                added_log.append(f"'{movie['title']} ({movie['year']})'")
-            else:
-                updated_log.append(f"'{title_to_update} ({movie['year']})'")
-            
-            database.set_movie_watched_status(title_to_update, movie['year'], watched_status=True)
-            if movie.get('rating'):
-                database.set_user_rating(title_to_update, movie['year'], movie['rating'])
+        click.echo("Importing from Letterboxd...")
+        added_count, updated_count, watchlist_count = database.apply_letterboxd_import(movies_to_process, watchlist)
 
-        if updated_log: app_logger.log_info(f"Updated {len(updated_log)} movies from Letterboxd: {', '.join(updated_log)}")
-        if added_log: app_logger.log_info(f"Added {len(added_log)} new movies from Letterboxd: {', '.join(added_log)}")
+        app_logger.log_info(
+            f"Letterboxd import: {added_count} movies added, {updated_count} updated, "
+            f"{watchlist_count} watchlist entries added.",
+            operation='letterboxd_import', added=added_count, updated=updated_count, watchlist=watchlist_count
+        )
         click.echo(click.style("\nLetterboxd import complete!", fg='green'))
+        click.echo(f"  Added: {added_count}  Updated: {updated_count}  Watchlist: {watchlist_count}")
         return
 
     # --- Mode 2: Standard File Import (CSV or Excel) ---
     click.echo(f"Processing file: {filepath}")
     file_extension = os.path.splitext(filepath)[1].lower()
+    if column and column.isdigit():
+        column = int(column) - 1
+    if delimiter in ('tab', '\\t'):
+        delimiter = '\t'
     
-    movies_to_add = []
-    if file_extension == '.csv':
-        click.echo("Detected CSV file.")
-        movies_to_add = core.read_csv_file(filepath)
-    elif file_extension in ['.xlsx', '.xls']:
-        click.echo("Detected Excel file. Reading...")
-        movies_to_add = core.read_excel_file(filepath)
-    else:
-        click.echo(click.style(f"Error: Unsupported file format '{file_extension}'.", fg='red'))
+    try:
+        if file_extension == '.csv':
+            click.echo("Detected CSV file.")
+            # Rows are parsed and inserted in chunks as the file is read; progress is measured in bytes.
+            with tqdm(total=os.path.getsize(filepath), unit='B', unit_scale=True, desc="Importing movies") as pbar:
+                movies = core.iter_csv_file(filepath, column=column, delimiter=delimiter, progress=pbar.update)
+                added_count, skipped_count = database.add_movies_bulk(movies)
+        elif file_extension in ['.xlsx', '.xlsm']:
+            click.echo("Detected Excel file.")
+            with tqdm(total=core.count_excel_rows(filepath), unit=' rows', desc="Importing movies") as pbar:
+                movies = core.iter_excel_file(filepath, column=column, progress=pbar.update)
+                added_count, skipped_count = database.add_movies_bulk(movies)
+        elif file_extension == '.xls':
+            click.echo(click.style("Error: Legacy .xls workbooks are not supported. Please save the file as .xlsx.", fg='red'))
+            return
+        else:
+            click.echo(click.style(f"Error: Unsupported file format '{file_extension}'.", fg='red'))
+            return
+    except (ValueError, csv.Error, UnicodeDecodeError, zipfile.BadZipFile) as e:
+        click.echo(click.style(f"Error processing file: {e}", fg='red'))
         return
 
-    if not movies_to_add:
+    if not added_count and not skipped_count:
         click.echo("No valid movies found in the file to import."); return
 
-    added_count, skipped_count = 0, 0
-    added_titles = []
-    
-    for title, year in tqdm(movies_to_add, desc="Importing movies"):
-        if database.add_movie(title, year):
-            added_count += 1
-            added_titles.append(f"'{title} ({year})'")
-        else:
-            skipped_count += 1
-    
-    if added_titles:
-        log_message = f"Added {added_count} movies via {file_extension.upper()[1:]} import: {', '.join(added_titles)}"
-        app_logger.log_info(log_message)
+    if added_count:
+        log_message = f"Added {added_count} movies via {file_extension.upper()[1:]} import ({skipped_count} skipped as duplicates)."
+        app_logger.log_info(log_message, operation='import', added=added_count, skipped=skipped_count)
 
     click.echo(f"\nImport complete.")
     click.echo(click.style(f"  Added: {added_count} new movies.", fg='green'))
@@ -316,7 +355,8 @@ def import_data(filepath, letterboxd):
 @click.option('--dop', help="Filter by a director of photography's name.")
 @click.option('--company', '-p', help="Filter by a production company.")
 @click.option('--genre', '-g', help="Filter by a specific genre.")
-def search(query, actor, director, keyword, collection, year_filter, decade_filter, writer, company, dop, genre):
+@click.option('--text', '-t', help="Ranked full-text search across titles, plots, people and keywords (prefixes allowed).")
+def search(query, actor, director, keyword, collection, year_filter, decade_filter, writer, company, dop, genre, text):
     """
     Performs an advanced, combined search of your movie archive.
 
@@ -330,8 +370,31 @@ def search(query, actor, director, keyword, collection, year_filter, decade_filt
     \b
       - Find all movies directed by Nolan with 'dark' in the title:
         $ poparch search "dark" -d "Nolan"
+    \b
+      - Best matches for words anywhere in the metadata:
+        $ poparch search -t "heist vegas"
     """
     from . import core, database
+    import sqlite3
+    import inquirer
+
+    # --- Full-text mode: ranked results from the FTS index ---
+    if text:
+        if any([query, actor, director, keyword, collection, year_filter, decade_filter, writer, company, dop, genre]):
+            click.echo(click.style("Error: --text cannot be combined with other search filters.", fg='red')); return
+        try:
+            results = database.search_movies_fulltext(text)
+        except sqlite3.OperationalError:
+            click.echo(click.style("Full-text search is not available in this SQLite build.", fg='red')); return
+        if not results:
+            click.echo(click.style("No movies found matching your criteria.", fg='yellow')); return
+        click.echo(click.style(f"\n🔎 Top {len(results)} matches for '{text}'", bold=True, fg='cyan'))
+        for movie in results:
+            year_str = f"({movie['year']})"
+            click.echo(f"  🎬 {movie['title']:<45} {year_str:>6}")
+            if movie['director']:
+                safe_echo(f"     {'Directed by:':<15} {movie['director']}")
+        return
 
     # --- FINAL, CORRECTED LOGIC ---
     title_query = query
@@ -458,6 +521,7 @@ def delete(name):
     Movie format: "Title YYYY" or "Title (YYYY)"
     """
     from . import core
+    import inquirer
     title, year = core.parse_movie_title(name)
     if not title or not year:
         click.echo(click.style(f"Error: Invalid movie format for '{name}'.", fg='red'))
@@ -479,52 +543,65 @@ def delete(name):
 
 @cli.command()
 @click.argument('filepath', type=click.Path(dir_okay=False, writable=True))
-def export(filepath):
-    """Exports the entire movie archive to a CSV file."""
-    import csv
-    import os
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'csv.gz', 'jsonl', 'jsonl.gz', 'parquet', 'feather']), help="Output format. Defaults to the file extension, or CSV.")
+@click.option('--columns', help="Comma-separated columns to export, 'all' for every field, or 'name' for \"Title Year\". CSV defaults to name, other formats to all.")
+@click.option('--since', help="Only export movies inserted, updated or deleted after this change sequence number or UTC time (YYYY-MM-DD[ HH:MM[:SS]]).")
+def export(filepath, fmt, columns, since):
+    """Exports the movie archive to CSV, JSON lines, Parquet or Feather."""
+    from . import exporter
     from tqdm import tqdm
 
-    click.echo(f"Exporting archive to '{filepath}'...")
-
-    if not filepath.lower().endswith('.csv'):
-        filepath += '.csv'
-
-    all_movies = database.get_all_movies()
-    if not all_movies:
-        click.echo(click.style("Archive is empty. Nothing to export.", fg='yellow'))
-        return
-
-    def clean_title(title: str) -> str:
-        """Remove leading/trailing quotes and whitespace."""
-        return title.strip().strip('\'"')
-
+    columns = [column.strip() for column in columns.split(',') if column.strip()] if columns else None
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-
-            writer.writerow(['name'])
-
-            for title, year in tqdm(all_movies, desc="Exporting"):
-                cleaned_title = clean_title(title)
-                writer.writerow([f"{cleaned_title} {year}"])
+        if since is not None:
+            if since.isdigit():
+                since_seq = int(since)
+            else:
+                timestamp = click.DateTime(_DATETIME_FORMATS).convert(since, None, None)
+                since_seq = database.get_change_seq_before(timestamp.strftime('%Y-%m-%d %H:%M:%S'))
+            click.echo(f"Exporting changes after #{since_seq} to '{filepath}'...")
+            with tqdm(unit=' changes', desc="Exporting") as pbar:
+                filepath, written, last_seq = exporter.export_changes(
+                    filepath, since_seq, fmt=fmt, columns=columns, progress=pbar.update
+                )
+            click.echo(click.style(f"Exported {written} changed movies to '{filepath}'.", fg='green'))
+            click.echo(f"Next incremental export: poparch export --since {last_seq}")
+            return
 
-        click.echo(click.style(
-            f"Successfully exported {len(all_movies)} movies to '{filepath}'.",
-            fg='green'
-        ))
+        total = database.get_total_movies_count()
+        if not total:
+            click.echo(click.style("Archive is empty. Nothing to export.", fg='yellow'))
+            return
 
+        click.echo(f"Exporting archive to '{filepath}'...")
+        # Taken first, so changes made while exporting are picked up by the next incremental export.
+        last_seq = database.get_change_seq()
+        # Rows are streamed from the database in chunks and written as they arrive.
+        with tqdm(total=total, unit=' movies', desc="Exporting") as pbar:
+            filepath, written = exporter.export_movies(filepath, fmt=fmt, columns=columns, progress=pbar.update)
+    except click.BadParameter:
+        click.echo(click.style(f"Error: --since must be a change number or a date, not '{since}'.", fg='red'))
+        return
+    except (ValueError, ImportError) as e:
+        click.echo(click.style(f"Error: {e}", fg='red'))
+        return
     except IOError as e:
         click.echo(click.style(
             f"Error: Could not write to file at '{filepath}'.\n{e}",
             fg='red'
         ))
+        return
 
-
+    click.echo(click.style(
+        f"Successfully exported {written} movies to '{filepath}'.",
+        fg='green'
+    ))
+    click.echo(f"Next incremental export: poparch export --since {last_seq}")
 
 @cli.command()
 def clear():
     """!!! Deletes ALL movies from the archive !!!"""
+    import inquirer
 
     warning = "Warning: This operation will permanently delete ALL movies."
     click.echo(click.style(warning, fg='red', bold=True))
@@ -566,12 +643,17 @@ def unwatch(name):
 @cli.command()
 @click.option('--key', help="Your TMDb API key to save.")
 @click.option('--logging', type=click.Choice(['on', 'off']), help="Enable or disable logging.")
+@click.option('--log-format', type=click.Choice(['text', 'json']), help="Write log records as text lines or JSON lines.")
+@click.option('--workers', type=click.IntRange(1, 32), help="Default number of concurrent TMDb lookups.")
+@click.option('--rate-limit', type=click.FloatRange(min=0, min_open=True), help="Maximum TMDb requests per second.")
+@click.option('--cache-ttl', type=click.FloatRange(min=0, min_open=True), help="Days a cached TMDb response is trusted.")
 @click.option('--show-paths', is_flag=True, help="Show paths for config, database, and log files.")
-def config(key, logging, show_paths):
+def config(key, logging, log_format, workers, rate_limit, cache_ttl, show_paths):
     """Manages application configuration and displays file paths."""
     # Lazy load to avoid circular dependencies if config needs them
     from .database import DB_FILE
     from .logger import LOG_FILE
+    from .cache import CACHE_FILE
     
     # --- Action Block ---
     # Perform actions first if any options are provided.
@@ -587,12 +669,19 @@ def config(key, logging, show_paths):
         status = "enabled" if is_enabled else "disabled"
         click.echo(f"Logging has been {status}.")
         action_taken = True
+
+    for name, value in (('log_format', log_format), ('workers', workers), ('rate_limit', rate_limit), ('cache_ttl_days', cache_ttl)):
+        if value is not None:
+            config_manager.save_setting(name, value)
+            click.echo(f"{name.upper()} set to {value}.")
+            action_taken = True
         
     if show_paths:
         click.echo(click.style("\nApplication File Paths:", bold=True))
         click.echo(f"  {'Config File:':<15} {config_manager.CONFIG_FILE}")
         click.echo(f"  {'Database File:':<15} {DB_FILE}")
         click.echo(f"  {'Log File:':<15} {LOG_FILE}")
+        click.echo(f"  {'TMDb Cache:':<15} {CACHE_FILE}")
         action_taken = True
 
     # --- Help/Status Block ---
@@ -607,7 +696,12 @@ def config(key, logging, show_paths):
             click.echo(click.style("  - API Key: Not Set", fg='yellow'))
             
         logging_status = "Enabled" if config_manager.is_logging_enabled() else "Disabled"
-        click.echo(f"  - Logging: {logging_status}")
+        click.echo(f"  - Logging: {logging_status} ({config_manager.get_settings().log_format})")
+
+        settings = config_manager.get_settings()
+        click.echo(f"  - Workers: {settings.workers}")
+        click.echo(f"  - Rate Limit: {settings.rate_limit:g} requests/s")
+        click.echo(f"  - Cache TTL: {settings.cache_ttl_days:g} days")
         
         click.echo("\nUse 'poparch config --help' to see available options.")
 
@@ -657,6 +751,7 @@ def _fetch_and_add_flow(title, year):
     either adding a new movie OR updating an existing one.
     """
     from . import core, database
+    import inquirer
     
     click.echo(f"Fetching details for '{title} ({year})' from TMDb...")
     details = core.fetch_movie_details_from_api(title, year)
@@ -688,13 +783,17 @@ def _fetch_and_add_flow(title, year):
 
 @cli.command(name='info')
 @click.argument('query')
-def smart_info(query):
+@click.option('--no-cache', is_flag=True, help="Bypass the local TMDb response cache.")
+@click.option('--refresh-cache', is_flag=True, help="Revalidate cached TMDb responses instead of trusting them.")
+def smart_info(query, no_cache, refresh_cache):
     """
     Smartly finds a movie and displays its details.
     Searches your local archive first, then online. Handles ambiguity.
     """
-    from . import core, database
-    import textwrap
+    from . import core, database, cache
+    import inquirer
+
+    cache.configure(enabled=not no_cache, refresh=refresh_cache)
     
     def _display_local_info(movie_row):
         """Helper for local movies that offers to fetch missing details."""
@@ -785,14 +884,53 @@ def smart_info(query):
 @click.argument('filepath', type=click.Path(exists=True, dir_okay=False), required=False)
 @click.option('--force', is_flag=True, help="Force update for all movies.")
 @click.option('--cleanup', is_flag=True, help="Find and merge duplicate or similar entries before updating.")
-def update(filepath, force, cleanup):
+@click.option('--auto', is_flag=True, help="Merge duplicate groups without prompting (implies --cleanup).")
+@click.option('--policy', type=click.Choice(['oldest', 'enriched', 'rating']), default='enriched', show_default=True, help="Which row --auto keeps: the oldest, the most complete, or the highest rated.")
+@click.option('--dry-run', is_flag=True, help="With --auto, show the merge plan without changing the database.")
+@click.option('--report', type=click.Path(dir_okay=False, writable=True), help="With --auto, write the merge plan to this JSON file.")
+@click.option('--workers', type=click.IntRange(1, 32), help="Number of movies to look up concurrently. Defaults to the WORKERS setting (8).")
+@click.option('--no-cache', is_flag=True, help="Bypass the local TMDb response cache.")
+@click.option('--refresh-cache', is_flag=True, help="Revalidate cached TMDb responses instead of trusting them.")
+@click.option('--async', 'async_mode', is_flag=True, help="Use the pipelined asyncio engine (search, fetch and save as separate stages).")
+def update(filepath, force, cleanup, auto, policy, dry_run, report, workers, no_cache, refresh_cache, async_mode):
     """Fetches details for movies and provides maintenance options."""
-    from . import core, database
+    from . import core, database, cache
     import time
     from tqdm import tqdm
 
+    cache.configure(enabled=not no_cache, refresh=refresh_cache)
+    workers = workers or config_manager.get_settings().workers
+
     # --- Cleanup Phase ---
-    if cleanup:
+    if (dry_run or report) and not auto:
+        click.echo(click.style("Error: --dry-run and --report can only be used with --auto.", fg='red'))
+        return
+
+    if auto:
+        click.echo("Scanning database for movies with similar titles...")
+        plan = database.auto_merge_duplicates(policy=policy, dry_run=dry_run)
+        merged_count = sum(len(entry['remove']) for entry in plan)
+        if report:
+            import json
+            with open(report, 'w', encoding='utf-8') as f:
+                json.dump({'policy': policy, 'dry_run': dry_run, 'groups': plan}, f, indent=2, ensure_ascii=False)
+            click.echo(f"Merge plan written to '{report}'.")
+        if dry_run:
+            for entry in plan:
+                keep = entry['keep']
+                removed = ", ".join(f"{m['title']} ({m['year']})" for m in entry['remove'])
+                click.echo(f"Keep {keep['title']} ({keep['year']}) <- {removed}")
+            click.echo(click.style(f"\nDry run: {merged_count} duplicate movies in {len(plan)} groups would be merged.", fg='yellow'))
+        elif merged_count > 0:
+            click.echo(click.style(f"\nSuccessfully merged {merged_count} duplicate movies in {len(plan)} groups.", fg='green'))
+        else:
+            click.echo("No similar title duplicates found.")
+
+        if not any([filepath, force]):
+            click.echo("Cleanup complete.")
+            return
+        click.echo("Cleanup finished. Continuing with other operations...\n")
+    elif cleanup:
         click.echo("Scanning database for movies with similar titles...")
         merged_count = database.cleanup_database()
         if merged_count > 0:
@@ -839,39 +977,58 @@ def update(filepath, force, cleanup):
 
     # --- Update Process ---
     updated_count = 0
+    processed_count = 0
     failed_movies = []
     start_time = time.time()
+    core.configure_http_session(pool_size=workers * 2 if async_mode else workers)
+    results = None
+
+    def record_result(movie, error):
+        nonlocal updated_count, processed_count
+        title, year = movie['title'], movie['year']
+        truncated_title = title[:30] + ('...' if len(title) > 30 else '')
+        pbar.set_description(f"Fetched: {truncated_title}")
+        pbar.update(1)
+        processed_count += 1
+        if error:
+            failed_movies.append((f"{title} ({year})", error))
+        else:
+            updated_count += 1
 
     try:
-        with tqdm(movies_to_update, desc="Updating movies") as pbar:
-            for movie in pbar:
-                title, year = movie['title'], movie['year']
-                truncated_title = title[:30] + ('...' if len(title) > 30 else '')
-                pbar.set_description(f"Fetching: {truncated_title}")
-
-                # Fetch and update movie details
-                details = core.fetch_movie_details_from_api(title, year)
-                if not details.get("Error"):
-                    if database.update_movie_details(title, year, details):
-                        updated_count += 1
+        with tqdm(total=len(movies_to_update), desc="Updating movies") as pbar:
+            if async_mode:
+                # Search, details and database writes run as separate pipelined stages.
+                from . import pipeline
+                pipeline.run_enrichment_pipeline(
+                    movies_to_update, search_concurrency=workers,
+                    details_concurrency=workers, on_result=record_result
+                )
+            else:
+                # Lookups run concurrently (paced by the TMDb rate limiter in core),
+                # while database writes stay on this thread as results come in.
+                results = core.fetch_many_movie_details(movies_to_update, workers=workers)
+                for movie, details in results:
+                    if details.get("Error"):
+                        record_result(movie, details['Error'])
+                    elif database.update_movie_details(movie['title'], movie['year'], details):
+                        record_result(movie, None)
                     else:
-                        failed_movies.append((f"{title} ({year})", "Database update failed"))
-                else:
-                    failed_movies.append((f"{title} ({year})", details['Error']))
-
-                # Rate limiting
-                time.sleep(0.1)
+                        record_result(movie, "Database update failed")
 
     except KeyboardInterrupt:
         click.echo(click.style("\n\nOperation aborted by user.", fg='yellow'))
 
     finally:
+        if results is not None:
+            results.close()
+
         # --- Summary Report ---
         total_processed = len(movies_to_update)
         elapsed_time = time.time() - start_time
         
         click.echo(click.style("\n--- Update Summary ---", bold=True))
-        click.echo(click.style(f"  Processed:    {total_processed}/{total_processed}", fg='cyan'))
+        click.echo(click.style(f"  Processed:    {processed_count}/{total_processed}", fg='cyan'))
         click.echo(click.style(f"  Successfully updated: {updated_count}", fg='green'))
         click.echo(f"  Time taken: {elapsed_time:.1f} seconds")
 
@@ -889,14 +1046,19 @@ def update(filepath, force, cleanup):
 
         # --- Logging ---
         app_logger.log_info(
-            f"Update Summary: Processed {total_processed}/{total_processed}. "
+            f"Update Summary: Processed {processed_count}/{total_processed}. "
             f"Success: {updated_count}, Failed: {len(failed_movies)}. "
-            f"Time: {elapsed_time:.1f}s"
+            f"Time: {elapsed_time:.1f}s",
+            operation='update', processed=processed_count, updated=updated_count,
+            failed=len(failed_movies), duration=round(elapsed_time, 3)
         )
         
         if failed_movies:
             failed_titles = [f[0] for f in failed_movies]
-            app_logger.log_error(f"Failed to update movies: {', '.join(failed_titles)}")
+            app_logger.log_error(
+                f"Failed to update {len(failed_titles)} movies: {app_logger.summarize_items(failed_titles)}",
+                operation='update', failed=len(failed_titles)
+            )
 
 @cli.command()
 @click.argument('name')
@@ -965,16 +1127,27 @@ def log():
     pass
 
 @log.command()
-def view():
-    """Displays the last 20 lines of the log file."""
-    from .logger import LOG_FILE
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for line in lines[-20:]:
-                click.echo(line, nl=False)
-    else:
+@click.option('-n', '--lines', 'count', type=click.IntRange(min=0), default=20, show_default=True, help="Number of entries to show.")
+@click.option('-f', '--follow', is_flag=True, help="Keep printing new entries as they are written (Ctrl+C to stop).")
+@click.option('--level', type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], case_sensitive=False), help="Only show entries at this level or above.")
+@click.option('--since', type=click.DateTime(_DATETIME_FORMATS), help="Only show entries at or after this time.")
+@click.option('--until', type=click.DateTime(_DATETIME_FORMATS), help="Only show entries at or before this time.")
+def view(count, follow, level, since, until):
+    """Displays the last entries of the log, including rotated segments."""
+    from . import logview
+    level = level.upper() if level else None
+    if not follow and not logview.log_segments():
         click.echo("Log file does not exist yet.")
+        return
+
+    for line in logview.tail(count, level=level, since=since, until=until):
+        click.echo(line)
+    if follow:
+        try:
+            for line in logview.follow(level=level, since=since, until=until):
+                click.echo(line)
+        except KeyboardInterrupt:
+            pass
 
 @log.command()
 def clear():
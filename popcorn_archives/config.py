@@ -1,50 +1,151 @@
 import configparser
 import os
+import time
+import threading
+from collections import namedtuple
 import click
 
 APP_NAME = "PopcornArchives"
 APP_DIR = click.get_app_dir(APP_NAME)
 CONFIG_FILE = os.path.join(APP_DIR, 'config.ini')
 
-def save_api_key(api_key):
-    """Saves the TMDb API key to the config file."""
-    os.makedirs(APP_DIR, exist_ok=True)
-    config = configparser.ConfigParser()
-    config['TMDB'] = {'API_KEY': api_key}
-    with open(CONFIG_FILE, 'w') as configfile:
-        config.write(configfile)
+DEFAULT_WORKERS = 8
+# TMDb allows roughly 40-50 requests per second per IP; stay safely below it.
+DEFAULT_RATE_LIMIT = 40
+DEFAULT_CACHE_TTL_DAYS = 30
+LOG_FORMATS = ('text', 'json')
 
-def get_api_key():
-    """Reads the TMDb API key from the config file."""
-    if not os.path.exists(CONFIG_FILE):
-        return None
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+# Hot loops call get_settings() for every item, so config.ini is stat()ed at
+# most this often; a change on disk is picked up within this many seconds.
+RELOAD_CHECK_INTERVAL = 1.0
+
+Settings = namedtuple('Settings', ['api_key', 'logging', 'workers', 'rate_limit', 'cache_ttl_days', 'log_format'])
+
+
+def _parse_bool(value):
     try:
-        return config['TMDB']['API_KEY']
+        return configparser.ConfigParser.BOOLEAN_STATES[value.strip().lower()]
     except KeyError:
+        raise ValueError(f"Not a boolean: {value!r}")
+
+
+def _parse_log_format(value):
+    value = value.strip().lower()
+    if value not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {value!r}")
+    return value
+
+
+def _parse_positive(cast):
+    def parse(value):
+        number = cast(value)
+        if number <= 0:
+            raise ValueError(f"Must be positive: {value!r}")
+        return number
+    return parse
+
+
+# Setting -> (section, option, environment override, parser, default)
+_FIELDS = {
+    'api_key': ('TMDB', 'API_KEY', 'POPARCH_API_KEY', str, None),
+    'logging': ('SETTINGS', 'LOGGING', 'POPARCH_LOGGING', _parse_bool, False),
+    'workers': ('SETTINGS', 'WORKERS', 'POPARCH_WORKERS', _parse_positive(int), DEFAULT_WORKERS),
+    'rate_limit': ('SETTINGS', 'RATE_LIMIT', 'POPARCH_RATE_LIMIT', _parse_positive(float), DEFAULT_RATE_LIMIT),
+    'cache_ttl_days': ('SETTINGS', 'CACHE_TTL_DAYS', 'POPARCH_CACHE_TTL_DAYS', _parse_positive(float), DEFAULT_CACHE_TTL_DAYS),
+    'log_format': ('SETTINGS', 'LOG_FORMAT', 'POPARCH_LOG_FORMAT', _parse_log_format, 'text'),
+}
+
+_cache = {'settings': None, 'mtime': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+def _config_mtime():
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
         return None
-    
-def save_logging_status(is_enabled: bool):
-    """Saves the logging status to the config file."""
-    os.makedirs(APP_DIR, exist_ok=True)
+
+
+def _read_config():
     config = configparser.ConfigParser()
-    # Read existing config to not overwrite API key
     if os.path.exists(CONFIG_FILE):
         config.read(CONFIG_FILE)
-    if 'SETTINGS' not in config:
-        config['SETTINGS'] = {}
-    config['SETTINGS']['LOGGING'] = 'on' if is_enabled else 'off'
+    return config
+
+
+def _load_settings():
+    """
+    Builds a Settings from config.ini. A POPARCH_* environment variable wins
+    over the file; missing or malformed values fall back to the default.
+    """
+    config = _read_config()
+    values = {}
+    for name, (section, option, env_var, parse, default) in _FIELDS.items():
+        raw = os.environ.get(env_var)
+        if raw is None:
+            raw = config.get(section, option, fallback=None)
+        try:
+            values[name] = parse(raw) if raw not in (None, '') else default
+        except ValueError:
+            values[name] = default
+    return Settings(**values)
+
+
+def get_settings():
+    """
+    Returns the current settings. They are read once per process and only
+    reloaded when config.ini's mtime changes, which is checked at most once
+    every RELOAD_CHECK_INTERVAL seconds.
+    """
+    now = time.monotonic()
+    settings = _cache['settings']
+    if settings is not None and now - _cache['checked'] < RELOAD_CHECK_INTERVAL:
+        return settings
+    with _lock:
+        mtime = _config_mtime()
+        if _cache['settings'] is None or mtime != _cache['mtime']:
+            _cache.update(settings=_load_settings(), mtime=mtime)
+        _cache['checked'] = now
+        return _cache['settings']
+
+
+def invalidate_settings():
+    """Forces the next get_settings() call to read config.ini again."""
+    with _lock:
+        _cache.update(settings=None, mtime=None, checked=0.0)
+
+
+def _save_option(section, option, value):
+    """Writes one option, keeping everything else in the config file."""
+    os.makedirs(APP_DIR, exist_ok=True)
+    config = _read_config()
+    if section not in config:
+        config[section] = {}
+    config[section][option] = value
     with open(CONFIG_FILE, 'w') as configfile:
         config.write(configfile)
+    invalidate_settings()
+
+
+def save_setting(name, value):
+    """Saves one of the tunables in Settings (e.g. 'workers') to the config file."""
+    section, option, _, parse, _ = _FIELDS[name]
+    parse(str(value))  # Reject values that would be ignored on load
+    _save_option(section, option, str(value))
+
+
+def save_api_key(api_key):
+    """Saves the TMDb API key to the config file."""
+    _save_option('TMDB', 'API_KEY', api_key)
+
+def get_api_key():
+    """Returns the TMDb API key, or None if it is not set."""
+    return get_settings().api_key
+
+def save_logging_status(is_enabled: bool):
+    """Saves the logging status to the config file."""
+    _save_option('SETTINGS', 'LOGGING', 'on' if is_enabled else 'off')
 
 def is_logging_enabled():
-    """Checks if logging is enabled in the config file."""
-    if not os.path.exists(CONFIG_FILE):
-        return False
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
-    try:
-        return config.getboolean('SETTINGS', 'LOGGING')
-    except (configparser.NoSectionError, configparser.NoOptionError):
-        return False # Default to off if not set
\ No newline at end of file
+    """Checks if logging is enabled (off unless configured)."""
+    return get_settings().logging
@@ -1,10 +1,12 @@
-import os
+import io
 import csv
 import re
-import requests
-import pandas as pd
-from tqdm import tqdm
+import time
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from . import config as config_manager
+from . import cache as response_cache
 import zipfile
 from . import logger as app_logger
 from fuzzywuzzy import fuzz
@@ -12,126 +14,381 @@ import click
 
 
 
+# "Title YYYY" or "Title (YYYY)", optionally followed by [bracketed] tags.
+_TITLE_YEAR_RE = re.compile(r'^(.*?)\s*\(?(\d{4})\)?(?:\s*\[.*\])*$')
+# A plausible release year inside a release-style name such as "Title.2019.1080p.BluRay".
+_RELEASE_YEAR_RE = re.compile(r'[(\[]?\b((?:18|19|20)\d{2})\b[)\]]?')
+# Tags that mark the start of release metadata after the year.
+_QUALITY_TAG_RE = re.compile(
+    r'[(\[]|(?:\d{3,4}[pi]|[48]k|uhd|hdr\w*|dv|10bit|blu-?ray|bdrip|brrip|\w*remux|web-?dl|web-?rip|web|'
+    r'hdtv|hdrip|dvd\w*|x26[45]|h26[45]|hevc|avc|xvid|divx|aac\w*|ac3|e?ac3|dts\w*|truehd|atmos|ddp?\d\w*|'
+    r'extended|remastered|unrated|uncut|proper|repack|limited|imax|criterion|directors?)\b',
+    re.IGNORECASE
+)
+_SEPARATOR_RE = re.compile(r'[._]+')
+_SPACES_RE = re.compile(r'\s+')
+PARSE_CACHE_SIZE = 65536
+
+def _parse_release_name(name):
+    """
+    Parses release-style names: words separated by dots or underscores,
+    and/or quality tags after the year ("Heat.1995.1080p.BluRay.x264-GRP").
+    Dots are only treated as separators when the name has no spaces, so
+    titles like "Dr. Strangelove" keep their punctuation.
+    """
+    text = name.replace('_', ' ') if ' ' in name else _SEPARATOR_RE.sub(' ', name)
+    for match in _RELEASE_YEAR_RE.finditer(text):
+        title = _SPACES_RE.sub(' ', text[:match.start()]).strip(' -')
+        tail = text[match.end():].strip(' -')
+        if title and (not tail or _QUALITY_TAG_RE.match(tail)):
+            year = int(match.group(1))
+            if 1800 < year < 2100:
+                return title.title(), year
+    return None, None
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
 def parse_movie_title(name):
     """
     Parses the movie title and year from a string.
     Supports "Title YYYY" and "Title (YYYY)" formats.
-    Handles trailing metadata after year.
-    Returns (None, None) if no valid year is found.
+    Handles trailing metadata after year, including release-style names
+    such as "Title.2019.1080p.BluRay".
+    Returns (None, None) if no valid year is found. Results are memoized.
     """
     name = name.strip()
     # سال 4 رقمی با یا بدون پرانتز، قبل از متادیتای اضافی
-    match = re.match(r'^(.*?)\s*\(?(\d{4})\)?(?:\s*\[.*\])*$', name)
+    match = _TITLE_YEAR_RE.match(name)
     if match:
-        title = match.group(1).strip().title()
         year = int(match.group(2))
         if 1800 < year < 2100:
-            return title, year
-    return None, None
+            return match.group(1).strip().title(), year
+        return None, None
+    return _parse_release_name(name)
+
+def parse_many(names):
+    """
+    Parses many names at once, returning a list of (title, year) tuples in
+    the same order; unparseable names give (None, None). Repeated names are
+    served from the parse cache.
+    """
+    return list(map(parse_movie_title, names))
 
-def scan_movie_folders(path):
+def scan_movie_folders(path, depth=1, workers=8, incremental=False, progress=None):
     """
-    Scans a directory for movie folders.
+    Scans a directory for movie folders, descending `depth` levels.
     Returns a tuple of two lists: (valid_movies, invalid_folders).
+    See scanner.scan_library for the details and scan statistics.
     """
-    valid_movies = []
-    invalid_folders = []
-    
+    from . import scanner # Lazy import: the scanner depends on the database layer
+
     try:
-        dirs_to_scan = [entry.name for entry in os.scandir(path) if entry.is_dir()]
+        result = scanner.scan_library(path, depth=depth, workers=workers, incremental=incremental, progress=progress)
     except OSError:
         return [], []
+    return result.movies, result.invalid_folders
 
-    for dir_name in tqdm(dirs_to_scan, desc="Scanning for movies"):
-        title, year = parse_movie_title(dir_name)
-        if title and year:
-            valid_movies.append((title, year))
-        else:
-            invalid_folders.append(dir_name)
-            
-    return valid_movies, invalid_folders
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ',;\t|'
+
+class _ProgressReader(io.RawIOBase):
+    """Wraps a binary file and reports the number of bytes read to a callback."""
+
+    def __init__(self, raw, callback):
+        self._raw = raw
+        self._callback = callback
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._raw.readinto(buffer)
+        if count:
+            self._callback(count)
+        return count
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+def sniff_csv_delimiter(filepath):
+    """
+    Guesses the delimiter from the start of a CSV file. When the sniffer
+    cannot decide (e.g. ragged rows), the candidate used most in the first
+    line wins, defaulting to a comma.
+    """
+    with open(filepath, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+        sample = csvfile.read(CSV_SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        first_line = sample.split('\n', 1)[0]
+        best = max(CSV_DELIMITERS, key=first_line.count)
+        return best if first_line.count(best) else ','
+
+def _select_column(header, column):
+    """Resolves a column given as a 0-based index or a header name to an index."""
+    if column is None:
+        return 0
+    if isinstance(column, int):
+        return column
+    names = [name.strip().lower() for name in header or []]
+    if column.strip().lower() not in names:
+        raise ValueError(f"Column '{column}' not found in the header.")
+    return names.index(column.strip().lower())
+
+def iter_csv_file(filepath, has_header=True, column=None, delimiter=None, progress=None):
+    """
+    Streams (title, year) tuples from a CSV file one row at a time, so memory
+    stays flat however large the file is.
+
+    Args:
+        filepath (str): Path to the CSV file
+        has_header (bool): Whether the first row is a header to skip
+        column (int | str, optional): 0-based index or header name of the
+            column holding movie names; defaults to the first column
+        delimiter (str, optional): Field delimiter; sniffed from the file when omitted
+        progress (callable, optional): Called with the number of bytes read
+
+    Raises:
+        ValueError: If `column` names a header that does not exist
+    """
+    delimiter = delimiter or sniff_csv_delimiter(filepath)
+    raw = open(filepath, mode='rb')
+    if progress:
+        raw = io.BufferedReader(_ProgressReader(raw, progress))
+    with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as csvfile:
+        reader = csv.reader(csvfile, delimiter=delimiter)
+        header = next(reader, None) if has_header else None
+        if has_header and header is None:
+            return # File is empty
+        index = _select_column(header, column)
+
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                # Use the robust parse_movie_title to extract data
+                title, year = parse_movie_title(row[index])
+                if title and year:
+                    yield title, year
 
-def read_csv_file(filepath, has_header=True):
+def read_csv_file(filepath, has_header=True, column=None, delimiter=None):
     """
     Reads a CSV file and returns a list of movie tuples (title, year).
-    This function now correctly handles CSV parsing and is consistent
-    with read_excel_file.
+    Use iter_csv_file to stream large files instead.
     """
-    movie_list = []
     try:
-        with open(filepath, mode='r', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            if has_header:
-                try:
-                    next(reader)  # Skip the header row
-                except StopIteration:
-                    return [] # File is empty or only has a header
-
-            for row in reader:
-                # We only care about the first column, even if there are more.
-                if row and row[0].strip():
-                    # Use the robust parse_movie_title to extract data
-                    title, year = parse_movie_title(row[0])
-                    if title and year:
-                        movie_list.append((title, year))
+        return list(iter_csv_file(filepath, has_header, column, delimiter))
     except FileNotFoundError:
         return None
     except Exception as e:
         click.echo(click.style(f"Error processing CSV file: {e}", fg='red'))
         return []
-    return movie_list
 
-def read_excel_file(filepath):
+def iter_excel_file(filepath, has_header=True, column=None, progress=None):
     """
-    Reads an Excel file (.xlsx, .xls) and returns a list of movies.
-    It assumes the movie names are in the first column.
+    Streams (title, year) tuples from the first sheet of an .xlsx workbook.
+    The workbook is opened in openpyxl's read-only mode, so rows are parsed
+    as they are read and memory stays flat for large files.
+
+    Args:
+        filepath (str): Path to the workbook
+        has_header (bool): Whether the first row is a header to skip
+        column (int | str, optional): 0-based index or header name of the
+            column holding movie names; defaults to the first column
+        progress (callable, optional): Called with 1 for every row read
+
+    Raises:
+        ValueError: If `column` names a header that does not exist
     """
+    from openpyxl import load_workbook  # Lazy: only needed for Excel imports
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
     try:
-        # Read the Excel file into a pandas DataFrame.
-        # We only read the first column (index 0).
-        df = pd.read_excel(filepath, usecols=[0], header=0)
-        
-        if df.empty:
-            return []
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) if has_header else None
+        if has_header and header is None:
+            return # Empty sheet
+        index = _select_column([str(name or '') for name in header or ()], column)
 
-        movie_list = []
-        # The column name will be the header of the first column.
-        # We iterate over each row in that column.
-        for movie_name in df[df.columns[0]]:
+        for row in rows:
+            if progress:
+                progress(1)
+            movie_name = row[index] if len(row) > index else None
             if isinstance(movie_name, str) and movie_name.strip():
                 # Use the existing parse_movie_title to extract title and year
                 title, year = parse_movie_title(movie_name)
                 if title and year:
-                    movie_list.append((title, year))
-        
-        return movie_list
+                    yield title, year
+    finally:
+        workbook.close()  # Read-only workbooks keep the file open until closed
+
+def count_excel_rows(filepath):
+    """Returns the row count recorded in the first sheet's dimensions, or None if unknown."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True)
+    try:
+        return workbook.worksheets[0].max_row
+    finally:
+        workbook.close()
+
+def read_excel_file(filepath, column=None):
+    """
+    Reads an Excel file (.xlsx) and returns a list of movies.
+    It assumes the movie names are in the first column unless `column` is given.
+    Use iter_excel_file to stream large workbooks instead.
+    """
+    try:
+        return list(iter_excel_file(filepath, column=column))
     except FileNotFoundError:
         return None # Should be caught by click's Path type, but good practice
     except Exception as e:
-        # Handle other potential pandas errors, like a corrupted file
+        # Handle other potential errors, like a corrupted file
         click.echo(click.style(f"Error processing Excel file: {e}", fg='red'))
         return []
 
 BASE_URL = "https://api.themoviedb.org/3"
 
-def fetch_movie_details_from_api(title, year=None, ignore_year_in_search=False):
+
+class RateLimiter:
     """
-    Fetches a rich and comprehensive set of movie details from TMDb.
-    
-    Args:
-        title (str): The movie title to search for
-        year (int, optional): The release year of the movie
-        ignore_year_in_search (bool): Whether to ignore year in initial search
-    
+    A thread-safe token bucket. Each request takes one token; tokens refill
+    at `rate` per second up to `capacity`, so short bursts are allowed while
+    the long-run request rate never exceeds the quota.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+# The rate comes from the settings (RATE_LIMIT / POPARCH_RATE_LIMIT) when core is first imported.
+tmdb_rate_limiter = RateLimiter(config_manager.get_settings().rate_limit)
+
+# Shared HTTP session: keeps TCP/TLS connections alive between requests and
+# transparently retries throttled (429) or failing (5xx) responses with
+# exponential backoff, honoring any Retry-After header sent by TMDb.
+HTTP_POOL_SIZE = 16
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_TIMEOUT = 10
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def _build_http_session(pool_size, max_retries):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update({"accept": "application/json"})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def configure_http_session(pool_size=HTTP_POOL_SIZE, max_retries=HTTP_MAX_RETRIES):
+    """
+    (Re)creates the shared TMDb session with the given connection pool size.
+    The pool never shrinks below the default so concurrent callers are not
+    left waiting for a free connection.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+        _http_session = _build_http_session(max(pool_size, HTTP_POOL_SIZE), max_retries)
+        return _http_session
+
+def get_http_session():
+    """Returns the shared TMDb session, creating it on first use."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = _build_http_session(HTTP_POOL_SIZE, HTTP_MAX_RETRIES)
+    return _http_session
+
+def _tmdb_get(path, params):
+    """
+    Performs a rate-limited GET against the TMDb API and returns the JSON body.
+    Fresh responses come straight from the on-disk cache; stale ones are
+    revalidated with their ETag and reused if TMDb cannot be reached.
+    """
+    import requests
+
+    key = response_cache.make_key(path, params) if response_cache.is_enabled() else None
+    cached = response_cache.get(key) if key else None
+    if cached and cached.fresh:
+        return cached.payload
+
+    headers = {'If-None-Match': cached.etag} if cached and cached.etag else None
+    tmdb_rate_limiter.acquire()
+    try:
+        response = get_http_session().get(f"{BASE_URL}{path}", params=params, headers=headers, timeout=HTTP_TIMEOUT)
+    except requests.exceptions.RequestException:
+        if cached:
+            return cached.payload  # Offline: a stale answer beats no answer.
+        raise
+
+    if response.status_code == 304 and cached:
+        response_cache.touch(key)
+        return cached.payload
+
+    response.raise_for_status()
+    payload = response.json()
+    if key:
+        response_cache.put(key, payload, response.headers.get('ETag'))
+    return payload
+
+def _api_error(title, year, error):
+    """Converts an exception raised during a TMDb call into an error dict."""
+    import requests
+
+    if isinstance(error, requests.exceptions.Timeout):
+        return {"Error": "Request to TMDb API timed out."}
+    if isinstance(error, requests.exceptions.RequestException):
+        app_logger.log_error(f"Network/API Error for '{title} ({year})': {error}")
+        return {"Error": f"Network/API Error"}
+    app_logger.log_error(f"An unexpected error occurred for '{title} ({year})': {error}")
+    return {"Error": f"An unexpected error occurred"}
+
+def search_tmdb_movie(title, year=None, ignore_year_in_search=False):
+    """
+    Searches TMDb for the best match of a title.
+
     Returns:
-        dict: Movie details or error message
+        dict: {"id": <tmdb id>} for a confident match, {"MultipleResults": [...]}
+        when the query is ambiguous, or an error message
     """
     api_key = config_manager.get_api_key()
     if not api_key:
         return {"Error": "API key not configured."}
-    
-    headers = {"accept": "application/json"}
-    
+
     try:
         # Step 1: Search for the movie with exact title matching
         search_params = {
@@ -142,14 +399,12 @@ def fetch_movie_details_from_api(title, year=None, ignore_year_in_search=False):
         if year and not ignore_year_in_search:
             search_params['year'] = year
             
-        search_response = requests.get(f"{BASE_URL}/search/movie", params=search_params, headers=headers, timeout=10)
-        search_response.raise_for_status()
-        search_data = search_response.json()
+        search_data = _tmdb_get("/search/movie", search_params)
 
         if not search_data.get('results'):
             # If no results, try searching without year
             if year and not ignore_year_in_search:
-                return fetch_movie_details_from_api(title, year, True)
+                return search_tmdb_movie(title, year, True)
             return {"Error": f"Movie '{title}' not found on TMDb."}
 
         # Step 2: Improved matching algorithm
@@ -186,36 +441,34 @@ def fetch_movie_details_from_api(title, year=None, ignore_year_in_search=False):
         title_similarity = fuzz.ratio(best_match.get('title', '').lower(), title.lower())
         if title_similarity < 60 and not ignore_year_in_search:
             # If similarity is too low, try without year constraint
-            return fetch_movie_details_from_api(title, year, True)
+            return search_tmdb_movie(title, year, True)
+
+        return {"id": best_match['id']}
 
-        movie_id = best_match['id']
+    except Exception as e:
+        return _api_error(title, year, e)
+
+def fetch_tmdb_movie_details(movie_id, title, year=None):
+    """
+    Fetches and flattens the full TMDb record (with credits and keywords)
+    for a movie id found by `search_tmdb_movie`.
+    """
+    api_key = config_manager.get_api_key()
+    if not api_key:
+        return {"Error": "API key not configured."}
 
+    try:
         # Step 3: Get full details
         details_params = {'api_key': api_key, 'append_to_response': 'credits,keywords'}
-        details_response = requests.get(f"{BASE_URL}/movie/{movie_id}", 
-                                     params=details_params, 
-                                     headers=headers, 
-                                     timeout=10)
-        details_response.raise_for_status()
-        details = details_response.json()
-
-        # Step 4: Process crew information
-        crew = details.get('credits', {}).get('crew', [])
-        directors = [p['name'] for p in crew if p.get('job') == 'Director']
-        writers = ", ".join(sorted(list(set(
-            p['name'] for p in crew if p.get('department') == 'Writing'
-        ))))
-        dop = next((p['name'] for p in crew if p.get('job') == 'Director of Photography'), 
-                  "N/A")
-        
-        # Step 5: Process other details
-        # Process crew information with N/A fallbacks
+        details = _tmdb_get(f"/movie/{movie_id}", details_params)
+
+        # Step 4: Process crew information with N/A fallbacks
         crew = details.get('credits', {}).get('crew', [])
         directors = [p['name'] for p in crew if p.get('job') == 'Director']
         writers = sorted(list(set(p['name'] for p in crew if p.get('department') == 'Writing')))
         dop = next((p['name'] for p in crew if p.get('job') == 'Director of Photography'), 'N/A')
         
-        # Process other details with N/A fallbacks
+        # Step 5: Process other details with N/A fallbacks
         cast = [p['name'] for p in details.get('credits', {}).get('cast', [])[:7]]
         keywords = [k['name'] for k in details.get('keywords', {}).get('keywords', [])]
         collection_info = details.get('belongs_to_collection', {})
@@ -242,72 +495,155 @@ def fetch_movie_details_from_api(title, year=None, ignore_year_in_search=False):
             "revenue": details.get('revenue') or 0,
             "production_companies": ", ".join(companies) or 'N/A'
         }
-    
-    except requests.exceptions.Timeout:
-        return {"Error": "Request to TMDb API timed out."}
-    except requests.exceptions.RequestException as e:
-        app_logger.log_error(f"Network/API Error for '{title} ({year})': {e}")
-        return {"Error": f"Network/API Error"}
+
     except Exception as e:
-        app_logger.log_error(f"An unexpected error occurred for '{title} ({year})': {e}")
-        return {"Error": f"An unexpected error occurred"}
+        return _api_error(title, year, e)
+
+def fetch_movie_details_from_api(title, year=None, ignore_year_in_search=False):
+    """
+    Fetches a rich and comprehensive set of movie details from TMDb.
     
+    Args:
+        title (str): The movie title to search for
+        year (int, optional): The release year of the movie
+        ignore_year_in_search (bool): Whether to ignore year in initial search
     
+    Returns:
+        dict: Movie details or error message
+    """
+    match = search_tmdb_movie(title, year, ignore_year_in_search)
+    if "id" not in match:
+        return match
+    return fetch_tmdb_movie_details(match["id"], title, year)
+
+
+def fetch_many_movie_details(movies, workers=None):
+    """
+    Looks up many movies concurrently on a bounded worker pool.
+
+    Yields (movie, details) pairs in completion order. At most `workers`
+    lookups run at once and only a small window of titles is queued ahead,
+    so memory stays flat for very large archives. Request pacing is left to
+    the shared TMDb rate limiter. `workers` defaults to the WORKERS setting.
+    """
+    workers = workers or config_manager.get_settings().workers
+    movies = iter(movies)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = {}
+
+    def submit_next():
+        movie = next(movies, None)
+        if movie is None:
+            return False
+        future = executor.submit(fetch_movie_details_from_api, movie['title'], movie['year'])
+        pending[future] = movie
+        return True
+
+    try:
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                movie = pending.pop(future)
+                try:
+                    details = future.result()
+                except Exception as e:
+                    app_logger.log_error(f"Lookup failed for '{movie['title']} ({movie['year']})': {e}")
+                    details = {"Error": "An unexpected error occurred"}
+                submit_next()
+                yield movie, details
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Letterboxd export files that mark a movie as watched. They are read in this
+# order, so a rating in ratings.csv overrides the latest one logged in diary.csv.
+LETTERBOXD_WATCHED_FILES = ('watched.csv', 'diary.csv', 'ratings.csv')
+LETTERBOXD_WATCHLIST_FILE = 'watchlist.csv'
+
+def _iter_letterboxd_rows(zf, member):
+    """
+    Streams (title, year, row) from a CSV member of a Letterboxd ZIP, decoding
+    it incrementally instead of reading the whole file into memory.
+    Rows without a title or a valid year are skipped.
+    """
+    with zf.open(member) as raw, io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as text:
+        for row in csv.DictReader(text):
+            title, year_str = row.get('Name'), row.get('Year')
+            if not title or not year_str:
+                continue
+            try:
+                yield title, int(year_str), row
+            except ValueError:
+                continue # Skip rows with invalid year
+
+def _letterboxd_rating(value):
+    """Converts a Letterboxd 0.5-5 star rating to the archive's 1-10 scale."""
+    try:
+        return int(float(value) * 2) or None
+    except (TypeError, ValueError):
+        return None
+
 def process_letterboxd_zip(filepath):
     """
     Processes a Letterboxd ZIP export and intelligently categorizes movies
     by comparing normalized titles to handle platform differences.
+
+    Movies from watched.csv, diary.csv and ratings.csv are merged into one
+    entry per film. watchlist.csv entries are returned separately as plain
+    titles (the form `watchlist --add` stores), leaving out films that are
+    watched on Letterboxd or already in the archive.
+
+    Returns:
+        tuple: (movies_to_update, movies_to_add, watchlist_titles, error)
     """
     from . import database # Lazy load
 
     try:
         with zipfile.ZipFile(filepath, 'r') as zf:
-            if 'ratings.csv' not in zf.namelist():
-                return None, None, {"Error": "ratings.csv not found in the ZIP file."}
-            
-            with zf.open('ratings.csv') as csv_file:
-                content = csv_file.read().decode('utf-8')
-                reader = csv.DictReader(content.splitlines())
-                
-                movies_to_update = []
-                movies_to_add = []
-
-                for row in reader:
-                    title, year_str = row.get('Name'), row.get('Year')
-                    rating = row.get('Rating')
-                    if not title or not year_str: continue
-                    
-                    try:
-                        year = int(year_str)
-                    except ValueError:
-                        continue # Skip rows with invalid year
-
-                    movie_data = {
-                        'title': title, 'year': year,
-                        'rating': int(float(rating) * 2) if rating else None,
-                        'watched': True
-                    }
-
-                    # Smart Matching Logic ---
-                    # Normalize the title from Letterboxd
-                    normalized_letterboxd_title = normalize_title(title)
-                    
-                    # Search the database using the normalized title
-                    existing_movie = database.find_movie_by_normalized_title(normalized_letterboxd_title, year)
-                    
-                    if existing_movie:
-                        # We found a match! We need to update this existing movie.
-                        # We pass the original DB title to ensure we update the correct record.
-                        movie_data['original_title'] = existing_movie['title']
-                        movies_to_update.append(movie_data)
-                    else:
-                        # No match found, this is a new movie.
-                        movies_to_add.append(movie_data)
-                    # -------------------------------
-        
-        return movies_to_update, movies_to_add, None
+            members = set(zf.namelist())
+            if not members & {*LETTERBOXD_WATCHED_FILES, LETTERBOXD_WATCHLIST_FILE}:
+                return None, None, None, {"Error": "No Letterboxd CSV files (ratings.csv, watched.csv, diary.csv, watchlist.csv) found in the ZIP file."}
+
+            # One pass over the archive instead of a query per CSV row.
+            archive_index = database.build_normalized_title_index()
+            movies = {}
+
+            for member in LETTERBOXD_WATCHED_FILES:
+                if member not in members:
+                    continue
+                for title, year, row in _iter_letterboxd_rows(zf, member):
+                    key = (normalize_title(title), year)
+                    movie_data = movies.get(key)
+                    if movie_data is None:
+                        movie_data = movies[key] = {'title': title, 'year': year, 'rating': None, 'watched': True}
+                        # Smart Matching Logic: keep the original DB title to update the correct record.
+                        existing_movie = archive_index.get(key)
+                        if existing_movie:
+                            movie_data['original_title'] = existing_movie['title']
+                    rating = _letterboxd_rating(row.get('Rating'))
+                    if rating:
+                        movie_data['rating'] = rating
+
+            watchlist = []
+            if LETTERBOXD_WATCHLIST_FILE in members:
+                for title, year, _ in _iter_letterboxd_rows(zf, LETTERBOXD_WATCHLIST_FILE):
+                    key = (normalize_title(title), year)
+                    if key not in movies and key not in archive_index:
+                        watchlist.append(title)
+
+        movies_to_update = [m for m in movies.values() if 'original_title' in m]
+        movies_to_add = [m for m in movies.values() if 'original_title' not in m]
+        return movies_to_update, movies_to_add, watchlist, None
     except Exception as e:
-        return None, None, {"Error": f"Failed to process ZIP file: {e}"}
+        return None, None, None, {"Error": f"Failed to process ZIP file: {e}"}
+
+# Common invalid characters in Windows filenames: <>:"/\|?*
+_TITLE_STRIP_TABLE = str.maketrans('', '', ':?*<>|/')
+_WHITESPACE_RE = re.compile(r'\s+')
 
 def normalize_title(title):
     """
@@ -316,15 +652,8 @@ def normalize_title(title):
     """
     if not isinstance(title, str):
         return ""
-    # Define characters to remove. This list can be expanded.
-    # Common invalid characters in Windows filenames: <>:"/\|?*
-    invalid_chars = [':', '?', '*', '<', '>', '|', '/']
-    
-    # Remove all invalid characters
-    for char in invalid_chars:
-        title = title.replace(char, '')
-    
-    # Also, replace multiple spaces with a single space and trim
-    title = re.sub(r'\s+', ' ', title).strip()
+    # Remove characters that are often invalid in file/folder names,
+    # then collapse repeated whitespace and trim.
+    title = _WHITESPACE_RE.sub(' ', title.translate(_TITLE_STRIP_TABLE)).strip()
     
     return title.lower() # Return in lowercase for case-insensitive comparison
\ No newline at end of file
@@ -1,27 +1,130 @@
 import sqlite3
 import os
+import re
+import atexit
+import threading
+from contextlib import contextmanager
 import click
+from itertools import islice
 from collections import Counter
 from . import logger as app_logger
-from thefuzz import fuzz
 
 APP_NAME = "PopcornArchives"
 APP_DIR = click.get_app_dir(APP_NAME)
 DB_FILE = os.path.join(APP_DIR, 'movies.db')
 
-def get_db_connection():
-    """Establishes a new connection to the database."""
+# Connection tuning. WAL lets readers (e.g. `stats`) run while an `update`
+# is writing, and synchronous=NORMAL is durable enough under WAL while
+# avoiding an fsync on every commit.
+CACHE_SIZE_KIB = 20000        # Page cache per connection (~20 MB)
+MMAP_SIZE = 256 * 1024 * 1024  # Memory-map up to 256 MB of the database file
+
+# Stored in PRAGMA user_version once init_db has migrated the file. Bump it
+# whenever init_db gains a new table, column, index or trigger so existing
+# databases run the migration exactly once.
+SCHEMA_VERSION = 4
+
+_local = threading.local()
+
+class _ManagedConnection(sqlite3.Connection):
+    """
+    A connection that can be shared by all helpers on one thread.
+    While a `transaction()` block is active, the helpers' own commits and
+    `with conn:` blocks are deferred to the enclosing transaction.
+    """
+    explicit_depth = 0
+
+    def commit(self):
+        if not self.explicit_depth:
+            super().commit()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.explicit_depth:
+            return False
+        return super().__exit__(exc_type, exc_value, traceback)
+
+def _connect():
     os.makedirs(APP_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_FILE, timeout=10)
+    conn = sqlite3.connect(DB_FILE, timeout=10, factory=_ManagedConnection)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+def get_db_connection():
+    """
+    Returns this thread's database connection, opening it on first use.
+    The connection is reused by every helper call in the process (one per
+    thread when running concurrently) instead of reconnecting each time.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.path != DB_FILE or _local.pid != os.getpid():
+        conn = _connect()
+        _local.conn, _local.path, _local.pid = conn, DB_FILE, os.getpid()
     return conn
 
+def close_db_connection():
+    """Closes this thread's connection, if one is open."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+
+atexit.register(close_db_connection)
+
+@contextmanager
+def transaction():
+    """
+    Groups several database calls into one atomic transaction:
+
+        with database.transaction():
+            database.add_movie("Heat", 1995)
+            database.set_user_rating("Heat", 1995, 9)
+
+    Everything is committed at the end of the block, or rolled back if it
+    raises. Nested blocks join the outermost transaction.
+    """
+    conn = get_db_connection()
+    if not isinstance(conn, _ManagedConnection):
+        with conn:
+            yield conn
+        return
+
+    if conn.explicit_depth:
+        conn.explicit_depth += 1
+        try:
+            yield conn
+        finally:
+            conn.explicit_depth -= 1
+        return
+
+    if conn.in_transaction:
+        sqlite3.Connection.commit(conn)
+    conn.execute("BEGIN")
+    conn.explicit_depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.explicit_depth = 0
+        conn.rollback()
+        raise
+    else:
+        conn.explicit_depth = 0
+        conn.commit()
+
 def init_db():
     """
     Initializes and migrates the database schema. This function is safe to run
-    multiple times and handles both new and old database versions.
+    multiple times and handles both new and old database versions. A database
+    already at SCHEMA_VERSION is left untouched after a single PRAGMA read.
     """
     with get_db_connection() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
         conn.execute('''
             CREATE TABLE IF NOT EXISTS movies (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -59,7 +162,9 @@ def init_db():
             "poster_path": "TEXT",
             "budget": "INTEGER",
             "revenue": "INTEGER",
-            "production_companies": "TEXT"
+            "production_companies": "TEXT",
+            "created_at": "TEXT",
+            "updated_at": "TEXT"
         }
 
         for col_name, col_type in expected_columns.items():
@@ -73,8 +178,86 @@ def init_db():
                 title TEXT NOT NULL UNIQUE
             )
         ''')
+        _create_indexes(conn)
+        _create_fts_index(conn)
+        _create_entity_tables(conn)
+        _create_scan_manifest(conn)
+        _create_stats_tables(conn)
+        _create_change_tracking(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
 
+def _create_indexes(conn):
+    """
+    Creates the secondary indexes used by lookups and filters. The
+    LOWER(title) expression index serves every case-insensitive title
+    lookup, which cannot use the UNIQUE(title, year) index.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_title_lower ON movies(LOWER(title), year)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_year ON movies(year)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_watched ON movies(watched)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_user_rating ON movies(user_rating)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movies_runtime ON movies(runtime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_watchlist_title_lower ON watchlist(LOWER(title))")
+
+# Columns mirrored into the full-text index, with their bm25 weights
+# (a hit in the title matters more than one in the plot).
+FTS_COLUMNS = {
+    "title": 10.0,
+    "plot": 1.0,
+    "tagline": 2.0,
+    "cast": 4.0,
+    "director": 4.0,
+    "writers": 3.0,
+    "dop": 2.0,
+    "keywords": 3.0,
+    "collection": 5.0,
+    "production_companies": 2.0,
+}
+
+def _create_fts_index(conn):
+    """
+    Creates the FTS5 index over the text columns of `movies`, kept in sync
+    by triggers. Returns False if this SQLite build lacks FTS5, in which
+    case full-text search is simply unavailable.
+    """
+    columns = ", ".join(f'"{c}"' for c in FTS_COLUMNS)
+    new_values = ", ".join(f'new."{c}"' for c in FTS_COLUMNS)
+    old_values = ", ".join(f'old."{c}"' for c in FTS_COLUMNS)
+
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'").fetchone()
+    try:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+                {columns}, content='movies', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+            INSERT INTO movies_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+            INSERT INTO movies_fts(movies_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF {columns} ON movies BEGIN
+            INSERT INTO movies_fts(movies_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO movies_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    if not exists:
+        if conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone():
+            click.echo("Database migration: Building full-text search index...")
+        conn.execute("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')")
+    return True
+
 def add_movie(title, year):
     """Adds a new movie to the database."""
     sql = "INSERT INTO movies (title, year) VALUES (?, ?)"
@@ -90,6 +273,40 @@ def add_movie(title, year):
         return False
     app_logger.log_info(f"Added movie: {title} ({year})")
 
+def _chunked(iterable, size):
+    """Yields successive lists of up to `size` items from any iterable."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def add_movies_bulk(movies, chunk_size=1000, progress=None):
+    """
+    Adds many movies at once using batched INSERT OR IGNORE statements.
+    Each chunk is committed in its own transaction, so huge imports neither
+    pay a commit per title nor hold one giant transaction open.
+
+    Args:
+        movies (iterable): (title, year) tuples; may be a generator
+        chunk_size (int): Rows inserted per transaction
+        progress (callable, optional): Called with the size of each processed chunk
+
+    Returns:
+        tuple: (added_count, skipped_count) where skipped rows were already
+        in the archive or repeated within the input
+    """
+    sql = "INSERT OR IGNORE INTO movies (title, year) VALUES (?, ?)"
+    added_count, skipped_count = 0, 0
+    with get_db_connection() as conn:
+        for chunk in _chunked(movies, chunk_size):
+            cursor = conn.executemany(sql, [(title.title(), year) for title, year in chunk])
+            conn.commit()
+            # rowcount sums the rows actually inserted; ignored duplicates don't count.
+            added_count += cursor.rowcount
+            skipped_count += len(chunk) - cursor.rowcount
+            if progress:
+                progress(len(chunk))
+    return added_count, skipped_count
+
 def search_movie(query, exact=False):
     """
     Searches for movies by title, case-insensitively.
@@ -190,6 +407,89 @@ def get_all_movies():
         cursor = conn.execute("SELECT title, year FROM movies ORDER BY year, title")
         return cursor.fetchall()
 
+# Computed export column: "Title Year", the format `import` reads back.
+# Stray whitespace and quotes around the title are dropped.
+_NAME_COLUMN_SQL = "TRIM(TRIM({t}title, ' ' || char(9, 10, 13)), '''\"') || ' ' || {t}year"
+
+def get_movie_columns():
+    """Returns {column: declared SQL type} for the movies table, in table order."""
+    conn = get_db_connection()
+    return {row['name']: row['type'] for row in conn.execute("PRAGMA table_info(movies)")}
+
+def _export_select(columns, details='', identity=''):
+    """
+    Builds the SELECT list for an export. `identity` prefixes id, title
+    and year (and the computed 'name'), `details` every other column.
+    """
+    known = get_movie_columns()
+    selected = []
+    for column in columns:
+        if column == 'name':
+            selected.append(f"{_NAME_COLUMN_SQL.format(t=identity)} AS name")
+        elif column in ('id', 'title', 'year'):
+            selected.append(f'{identity}"{column}"')
+        elif column in known:
+            selected.append(f'{details}"{column}"')
+        else:
+            raise ValueError(f"Unknown column '{column}'.")
+    return ", ".join(selected)
+
+def _iter_chunks(sql, params, chunk_size):
+    cursor = get_db_connection().execute(sql, params)
+    try:
+        while chunk := cursor.fetchmany(chunk_size):
+            yield [tuple(row) for row in chunk]
+    finally:
+        cursor.close()
+
+def iter_movie_chunks(columns, chunk_size=5000):
+    """
+    Streams the archive as lists of up to `chunk_size` tuples, fetched from
+    a single cursor. Rows come in id order, which walks the table without a
+    sort, so memory use stays constant however large the archive is.
+    `columns` are movies columns or 'name' (see _NAME_COLUMN_SQL).
+    """
+    yield from _iter_chunks(f"SELECT {_export_select(columns)} FROM movies ORDER BY id", (), chunk_size)
+
+def get_change_seq():
+    """Returns the sequence number of the latest change, or 0 if nothing has changed yet."""
+    conn = get_db_connection()
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM movie_changes").fetchone()[0]
+
+def get_change_seq_before(timestamp):
+    """
+    Returns the last sequence number recorded before `timestamp` (UTC text,
+    e.g. '2025-01-01 10:00:00'), so changes from that moment on come after it.
+    """
+    conn = get_db_connection()
+    first = conn.execute("SELECT MIN(seq) FROM movie_changes WHERE changed_at >= ?", (timestamp,)).fetchone()[0]
+    return first - 1 if first is not None else get_change_seq()
+
+# Latest change per movie in (since, until]. With MAX(seq) as the only
+# min/max aggregate, SQLite takes the bare op/title/year from that row.
+_CHANGES_SQL = """
+    SELECT c.seq,
+           CASE WHEN c.op = 'delete' THEN 'delete' WHEN c.inserted THEN 'insert' ELSE 'update' END,
+           c.changed_at, {select}
+    FROM (
+        SELECT movie_id AS id, MAX(seq) AS seq, op, title, year, changed_at, SUM(op = 'insert') AS inserted
+        FROM movie_changes WHERE seq > ? AND seq <= ? GROUP BY movie_id
+    ) AS c
+    LEFT JOIN movies AS m ON m.id = c.id AND c.op != 'delete'
+    ORDER BY c.seq
+"""
+
+def iter_change_chunks(since_seq, until_seq, columns, chunk_size=5000):
+    """
+    Streams one row per movie changed after `since_seq` (up to and
+    including `until_seq`): (seq, op, changed_at, *columns). `op` is
+    'insert' for movies added in that range, 'update' for ones changed,
+    and 'delete' for tombstones, which only carry id, title and year.
+    The cost depends on the number of changes, not the archive size.
+    """
+    sql = _CHANGES_SQL.format(select=_export_select(columns, details='m.', identity='c.'))
+    yield from _iter_chunks(sql, (since_seq, until_seq), chunk_size)
+
 def get_decade_distribution(limit=5):
     """
     Finds the top N decades with the most movies.
@@ -236,6 +536,52 @@ def get_movie_details(title, year):
         )
         return cursor.fetchone()
 
+_UPDATE_DETAILS_SQL = """
+    UPDATE movies SET
+        runtime = ?,
+        genre = ?,
+        director = ?,
+        plot = ?,
+        tmdb_score = ?,
+        imdb_id = ?,
+        cast = ?,
+        keywords = ?,
+        collection = ?,
+        tagline = ?,
+        writers = ?,
+        dop = ?,
+        original_language = ?,
+        poster_path = ?,
+        budget = ?,
+        revenue = ?,
+        production_companies = ?
+    WHERE title = ? AND year = ?
+"""
+
+def _details_params(title, year, details):
+    """Builds the parameter tuple for _UPDATE_DETAILS_SQL."""
+    return (
+        details.get('runtime', None),
+        details.get('genre', None),
+        details.get('director', None),
+        details.get('plot', None),
+        details.get('tmdb_score', None),
+        details.get('imdb_id', None),
+        details.get('cast', None),
+        details.get('keywords', None),
+        details.get('collection', None),
+        details.get('tagline', None),
+        details.get('writers', None),
+        details.get('dop', None),
+        details.get('original_language', None),
+        details.get('poster_path', None),
+        details.get('budget', 0),
+        details.get('revenue', 0),
+        details.get('production_companies', None),
+        title,  # WHERE clause
+        year    # WHERE clause
+    )
+
 def update_movie_details(title, year, details):
     """
     Updates the details of a movie in the database.
@@ -252,56 +598,16 @@ def update_movie_details(title, year, details):
         with get_db_connection() as conn:
             # First, verify the movie exists
             cursor = conn.execute(
-                "SELECT title, year FROM movies WHERE title = ? AND year = ?",
+                "SELECT id FROM movies WHERE title = ? AND year = ?",
                 (title, year)
             )
-            if not cursor.fetchone():
+            movie = cursor.fetchone()
+            if not movie:
                 app_logger.log_error(f"Cannot update non-existent movie: {title} ({year})")
                 return False
 
-            sql = """
-                UPDATE movies SET
-                    runtime = ?,
-                    genre = ?,
-                    director = ?,
-                    plot = ?,
-                    tmdb_score = ?,
-                    imdb_id = ?,
-                    cast = ?,
-                    keywords = ?,
-                    collection = ?,
-                    tagline = ?,
-                    writers = ?,
-                    dop = ?,
-                    original_language = ?,
-                    poster_path = ?,
-                    budget = ?,
-                    revenue = ?,
-                    production_companies = ?
-                WHERE title = ? AND year = ?
-            """
-            
-            conn.execute(sql, (
-                details.get('runtime', None),
-                details.get('genre', None),
-                details.get('director', None),
-                details.get('plot', None),
-                details.get('tmdb_score', None),
-                details.get('imdb_id', None),
-                details.get('cast', None),
-                details.get('keywords', None),
-                details.get('collection', None),
-                details.get('tagline', None),
-                details.get('writers', None),
-                details.get('dop', None),
-                details.get('original_language', None),
-                details.get('poster_path', None),
-                details.get('budget', 0),
-                details.get('revenue', 0),
-                details.get('production_companies', None),
-                title,  # WHERE clause
-                year    # WHERE clause
-            ))
+            conn.execute(_UPDATE_DETAILS_SQL, _details_params(title, year, details))
+            _sync_movie_entities(conn, movie['id'], details)
             
             return True
             
@@ -309,6 +615,37 @@ def update_movie_details(title, year, details):
         app_logger.log_error(f"Database error updating {title} ({year}): {str(e)}")
         return False
 
+def update_movies_details_bulk(items):
+    """
+    Writes details for many movies in a single transaction.
+
+    Args:
+        items (list): (title, year, details) tuples
+
+    Returns:
+        list: One boolean per item, False where the movie no longer exists
+        or the details carried an error
+    """
+    results = []
+    try:
+        with transaction() as conn:
+            for title, year, details in items:
+                if "Error" in details:
+                    results.append(False)
+                    continue
+                movie = conn.execute("SELECT id FROM movies WHERE title = ? AND year = ?", (title, year)).fetchone()
+                if not movie:
+                    app_logger.log_error(f"Cannot update non-existent movie: {title} ({year})")
+                    results.append(False)
+                    continue
+                conn.execute(_UPDATE_DETAILS_SQL, _details_params(title, year, details))
+                _sync_movie_entities(conn, movie['id'], details)
+                results.append(True)
+    except Exception as e:
+        app_logger.log_error(f"Database error during bulk update of {len(items)} movies: {str(e)}")
+        return [False] * len(items)
+    return results
+
 def get_movies_missing_details():
     """
     Returns all movies that have NULL values (haven't been processed by API yet).
@@ -334,23 +671,22 @@ def get_movies_missing_details():
     
 def get_all_unique_genres():
     """
-    Returns a sorted list of all unique genres present in the database.
-    Handles genres stored as comma-separated strings.
+    Returns a sorted list of all unique genres present in the database,
+    read from the normalized genre entities.
     """
     with get_db_connection() as conn:
-        cursor = conn.execute("SELECT DISTINCT genre FROM movies WHERE genre IS NOT NULL")
-        
-        all_genres = set()
-        for row in cursor.fetchall():
-            # Split genres like "Action, Adventure, Sci-Fi" into individual items
-            genres = [g.strip() for g in row['genre'].split(',')]
-            all_genres.update(genres)
-            
-        return sorted(list(all_genres))
+        cursor = conn.execute('''
+            SELECT name FROM entities
+            WHERE kind = 'genre'
+              AND EXISTS (SELECT 1 FROM movie_entities me WHERE me.role = 'genre' AND me.entity_id = entities.id)
+        ''')
+        return sorted(row['name'] for row in cursor.fetchall())
     
 def search_movies_advanced(title=None, director=None, actor=None, keyword=None, collection=None, year=None, decade=None, writer=None, dop=None, company=None, genre=None):
     """
     Performs an advanced search with multiple dynamic criteria.
+    People, keyword, company and genre filters are resolved through the
+    normalized entity tables instead of scanning the comma-separated columns.
     """
     with get_db_connection() as conn:
         base_query = 'SELECT title, year, director, "cast", collection, keywords, writers, dop, production_companies, genre FROM movies'
@@ -362,14 +698,14 @@ def search_movies_advanced(title=None, director=None, actor=None, keyword=None,
             conditions.append("title LIKE ? COLLATE NOCASE")
             params.append(f'%{title}%')
         if director:
-            conditions.append("director LIKE ? COLLATE NOCASE")
-            params.append(f'%{director}%')
+            conditions.append(_entity_filter('director'))
+            params.extend(['director', ENTITY_COLUMNS['director'], f'%{director}%'])
         if actor:
-            conditions.append('"cast" LIKE ? COLLATE NOCASE')
-            params.append(f'%{actor}%')
+            conditions.append(_entity_filter('cast'))
+            params.extend(['cast', ENTITY_COLUMNS['cast'], f'%{actor}%'])
         if keyword:
-            conditions.append("keywords LIKE ? COLLATE NOCASE")
-            params.append(f'%{keyword}%')
+            conditions.append(_entity_filter('keywords'))
+            params.extend(['keywords', ENTITY_COLUMNS['keywords'], f'%{keyword}%'])
         if collection:
             conditions.append("collection LIKE ? COLLATE NOCASE")
             params.append(f'%{collection}%')
@@ -380,17 +716,18 @@ def search_movies_advanced(title=None, director=None, actor=None, keyword=None,
             conditions.append("year BETWEEN ? AND ?")
             params.extend([decade, decade + 9])
         if writer:
-            conditions.append("writers LIKE ? COLLATE NOCASE")
-            params.append(f'%{writer}%')
+            conditions.append(_entity_filter('writers'))
+            params.extend(['writers', ENTITY_COLUMNS['writers'], f'%{writer}%'])
         if dop:
-            conditions.append("dop LIKE ? COLLATE NOCASE")
-            params.append(f'%{dop}%')
+            conditions.append(_entity_filter('dop'))
+            params.extend(['dop', ENTITY_COLUMNS['dop'], f'%{dop}%'])
         if company:
-            conditions.append("production_companies LIKE ? COLLATE NOCASE")
-            params.append(f'%{company}%')
+            conditions.append(_entity_filter('production_companies'))
+            params.extend(['production_companies', ENTITY_COLUMNS['production_companies'], f'%{company}%'])
         if genre:
-            conditions.append("genre LIKE ? COLLATE NOCASE")
-            params.append(f'%{genre}%')
+            # Genres are a small closed set, so they are matched exactly (case-insensitively).
+            conditions.append(_entity_filter('genre', exact=True))
+            params.extend(['genre', 'genre', genre])
 
         if not conditions:
             return []
@@ -398,38 +735,290 @@ def search_movies_advanced(title=None, director=None, actor=None, keyword=None,
         query = f"{base_query} WHERE {' AND '.join(conditions)} ORDER BY year, title"
         return conn.execute(query, tuple(params)).fetchall()
     
+# Multi-valued metadata columns and the kind of entity each one holds.
+# The column name doubles as the link's role, so the same person can be
+# linked to a movie both as 'director' and as 'writers'.
+ENTITY_COLUMNS = {
+    "genre": "genre",
+    "cast": "person",
+    "director": "person",
+    "writers": "person",
+    "dop": "person",
+    "keywords": "keyword",
+    "production_companies": "company",
+}
+
+def _create_entity_tables(conn):
+    """
+    Creates the normalized entity tables that back aggregations and
+    people/genre filters, and backfills them the first time they appear.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'entities'").fetchone()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL COLLATE NOCASE,
+            UNIQUE(kind, name)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_entities (
+            movie_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            PRIMARY KEY (movie_id, role, entity_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movie_entities_role ON movie_entities(role, entity_id, movie_id)")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS movie_entities_delete AFTER DELETE ON movies BEGIN
+            DELETE FROM movie_entities WHERE movie_id = old.id;
+        END
+    ''')
+    if not exists:
+        columns = ", ".join(f'"{c}"' for c in ENTITY_COLUMNS)
+        rows = conn.execute(f"SELECT id, {columns} FROM movies WHERE genre IS NOT NULL").fetchall()
+        if rows:
+            click.echo(f"Database migration: Indexing people, genres and keywords for {len(rows)} movies...")
+        for row in rows:
+            _sync_movie_entities(conn, row['id'], row)
+
+def _create_stats_tables(conn):
+    """
+    Creates the aggregate tables behind `poparch stats` and the triggers
+    that keep them current, then rebuilds them from the data. Movie counts
+    (total, per watched status, per decade) live in movie_stats; per-role
+    entity counts live in entity_stats, indexed by count for top-N reads.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_stats (
+            kind TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (kind, bucket)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS entity_stats (
+            role TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (role, entity_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entity_stats_top ON entity_stats(role, count DESC)")
+
+    buckets = {'total': "0", 'watched': "{row}.watched", 'decade': "({row}.year / 10) * 10"}
+    def adjust(row, delta):
+        statements = []
+        for kind, bucket in buckets.items():
+            bucket = bucket.format(row=row)
+            if delta > 0:
+                statements.append(
+                    f"INSERT INTO movie_stats (kind, bucket, count) VALUES ('{kind}', {bucket}, 1) "
+                    f"ON CONFLICT(kind, bucket) DO UPDATE SET count = count + 1;"
+                )
+            else:
+                statements.append(f"UPDATE movie_stats SET count = count - 1 WHERE kind = '{kind}' AND bucket = {bucket};")
+        if delta < 0:
+            statements.append("DELETE FROM movie_stats WHERE count <= 0;")
+        return "\n".join(statements)
+
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS movie_stats_insert AFTER INSERT ON movies BEGIN {adjust('new', 1)} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS movie_stats_delete AFTER DELETE ON movies BEGIN {adjust('old', -1)} END")
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movie_stats_update AFTER UPDATE OF watched, year ON movies
+        WHEN old.watched IS NOT new.watched OR old.year IS NOT new.year BEGIN
+            {adjust('old', -1)}
+            {adjust('new', 1)}
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS entity_stats_insert AFTER INSERT ON movie_entities BEGIN
+            INSERT INTO entity_stats (role, entity_id, count) VALUES (new.role, new.entity_id, 1)
+            ON CONFLICT(role, entity_id) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS entity_stats_delete AFTER DELETE ON movie_entities BEGIN
+            UPDATE entity_stats SET count = count - 1 WHERE role = old.role AND entity_id = old.entity_id;
+            DELETE FROM entity_stats WHERE role = old.role AND entity_id = old.entity_id AND count <= 0;
+        END
+    ''')
+
+    # Migrations can change the underlying tables, so the aggregates are rebuilt whenever init_db migrates.
+    conn.execute("DELETE FROM movie_stats")
+    conn.execute('''
+        INSERT INTO movie_stats (kind, bucket, count)
+        SELECT 'total', 0, COUNT(*) FROM movies
+        UNION ALL SELECT 'watched', watched, COUNT(*) FROM movies GROUP BY watched
+        UNION ALL SELECT 'decade', (year / 10) * 10, COUNT(*) FROM movies GROUP BY (year / 10) * 10
+    ''')
+    conn.execute("DELETE FROM entity_stats")
+    conn.execute('''
+        INSERT INTO entity_stats (role, entity_id, count)
+        SELECT role, entity_id, COUNT(*) FROM movie_entities GROUP BY role, entity_id
+    ''')
+
+# UTC with milliseconds; sorts and compares correctly as text.
+_NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+def _create_change_tracking(conn):
+    """
+    Maintains movies.created_at/updated_at and an append-only change log
+    with triggers. Every insert, update and delete of a movie appends a row
+    to movie_changes, whose AUTOINCREMENT `seq` only ever grows, so a
+    consumer that remembers the last seq it saw can fetch just the changes
+    since then (see iter_change_chunks). Deleted movies leave their id,
+    title and year behind as a tombstone.
+
+    Timestamps are set by a nested UPDATE. The update trigger only fires
+    when a statement leaves updated_at untouched, so that UPDATE does not
+    log a second change. Rows that existed before this migration keep NULL
+    timestamps.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            title TEXT,
+            year INTEGER,
+            changed_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_movie_changes_time ON movie_changes(changed_at)")
+
+    def log_change(op, row):
+        return (f"INSERT INTO movie_changes (movie_id, op, title, year, changed_at) "
+                f"VALUES ({row}.id, '{op}', {row}.title, {row}.year, {_NOW_SQL});")
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movies_track_insert AFTER INSERT ON movies BEGIN
+            UPDATE movies SET created_at = COALESCE(new.created_at, {_NOW_SQL}), updated_at = {_NOW_SQL} WHERE id = new.id;
+            {log_change('insert', 'new')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movies_track_update AFTER UPDATE ON movies
+        WHEN new.updated_at IS old.updated_at BEGIN
+            UPDATE movies SET updated_at = {_NOW_SQL} WHERE id = new.id;
+            {log_change('update', 'new')}
+        END
+    ''')
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS movies_track_delete AFTER DELETE ON movies BEGIN {log_change('delete', 'old')} END")
+
+def _split_items(value):
+    """Splits a comma-separated metadata value, dropping blanks and 'N/A'."""
+    if not value or not isinstance(value, str):
+        return []
+    return [item.strip() for item in value.split(',') if item.strip() and item.strip() != 'N/A']
+
+def _sync_movie_entities(conn, movie_id, values):
+    """Replaces a movie's entity links with the ones found in `values`."""
+    conn.execute("DELETE FROM movie_entities WHERE movie_id = ?", (movie_id,))
+    available = set(values.keys())
+    for column, kind in ENTITY_COLUMNS.items():
+        for name in _split_items(values[column] if column in available else None):
+            conn.execute("INSERT OR IGNORE INTO entities (kind, name) VALUES (?, ?)", (kind, name))
+            conn.execute('''
+                INSERT OR IGNORE INTO movie_entities (movie_id, role, entity_id)
+                SELECT ?, ?, id FROM entities WHERE kind = ? AND name = ?
+            ''', (movie_id, column, kind, name))
+
+def _entity_filter(role, exact=False):
+    """
+    Builds a WHERE clause selecting movies linked to a matching entity.
+
+    Names are matched first, within one kind of the UNIQUE(kind, name)
+    index, and only the matching entities are looked up in movie_entities.
+    A substring LIKE ('mann' finds 'Michael Mann') cannot seek the index,
+    but it scans the distinct names of that kind rather than every link.
+    """
+    name_match = "name = ?" if exact else "name LIKE ?"
+    return (
+        "id IN (SELECT movie_id FROM movie_entities WHERE role = ? AND entity_id IN "
+        f"(SELECT id FROM entities WHERE kind = ? AND {name_match}))"
+    )
+
+def _fts_match_expression(query):
+    """
+    Turns free text into an FTS5 query where every word must match as a
+    prefix, e.g. 'dark knig' -> '"dark"* "knig"*'. Quoting each word keeps
+    FTS5 operators and punctuation in user input from breaking the query.
+    """
+    words = re.findall(r'\w+', query)
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_movies_fulltext(query, limit=50):
+    """
+    Searches titles, plots, people, keywords and companies through the FTS5
+    index and returns the best matches first (bm25 ranking).
+    Raises sqlite3.OperationalError if full-text search is unavailable.
+    """
+    match = _fts_match_expression(query)
+    if not match:
+        return []
+    weights = ", ".join(str(w) for w in FTS_COLUMNS.values())
+    sql = f'''
+        SELECT m.title, m.year, m.director, m."cast", m.collection, m.keywords,
+               m.writers, m.dop, m.production_companies, m.genre
+        FROM movies_fts
+        JOIN movies m ON m.id = movies_fts.rowid
+        WHERE movies_fts MATCH ?
+        ORDER BY bm25(movies_fts, {weights})
+        LIMIT ?
+    '''
+    with get_db_connection() as conn:
+        return conn.execute(sql, (match, limit)).fetchall()
+
 def get_movies_by_name_list(name_list):
     """
     Takes a list of 'Title (YYYY)' strings and returns the corresponding
     movie records from the database.
     """
-    with get_db_connection() as conn:
-        # This is a bit complex: we need to parse the names and create a
-        # dynamic query.
-        movies_to_find = []
-        from .core import parse_movie_title # Avoid circular import
-        for name in name_list:
-            title, year = parse_movie_title(name)
-            if title and year:
-                movies_to_find.append((title, year))
+    from .core import parse_many # Avoid circular import
+    movies_to_find = [(title, year) for title, year in parse_many(name_list) if title and year]
 
-        if not movies_to_find:
-            return []
-        
-        # Create placeholders for the query: e.g., "(?, ?) OR (?, ?)"
-        placeholders = " OR ".join(["(LOWER(title) = LOWER(?) AND year = ?)"] * len(movies_to_find))
-        # Flatten the list of tuples for the parameters
-        params = [item for t in movies_to_find for item in t]
-        
-        sql = f"SELECT title, year FROM movies WHERE {placeholders}"
-        cursor = conn.execute(sql, tuple(params))
-        return cursor.fetchall()
+    if not movies_to_find:
+        return []
+
+    # Join against a VALUES list so each wanted title is one probe of the
+    # LOWER(title) index, instead of one huge OR chain. Chunks stay well
+    # under SQLite's bound-parameter limit.
+    results = []
+    with get_db_connection() as conn:
+        for chunk in _chunked(movies_to_find, 400):
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            params = [item for t in chunk for item in t]
+            sql = f"""
+                WITH wanted(title, year) AS (VALUES {values})
+                SELECT DISTINCT m.title, m.year
+                FROM wanted
+                JOIN movies m ON LOWER(m.title) = LOWER(wanted.title) AND m.year = wanted.year
+            """
+            results.extend(conn.execute(sql, params).fetchall())
+    return results
     
 def get_top_items_from_column(column_name, limit=5):
     """
     A generic function to get the most common items from a comma-separated column.
     Used for genres, directors, cast, and keywords.
     """
+    if column_name in ENTITY_COLUMNS:
+        # Read the trigger-maintained counts in index order instead of counting links.
+        with get_db_connection() as conn:
+            cursor = conn.execute('''
+                SELECT e.name, s.count AS movie_count
+                FROM entity_stats s
+                JOIN entities e ON e.id = s.entity_id
+                WHERE s.role = ?
+                ORDER BY s.count DESC, e.name
+                LIMIT ?
+            ''', (column_name, limit))
+            return [(row['name'], row['movie_count']) for row in cursor.fetchall()]
+
     with get_db_connection() as conn:
         # We need to fetch all non-empty rows for the given column.
         sql = f'SELECT "{column_name}" FROM movies WHERE "{column_name}" IS NOT NULL'
@@ -512,17 +1101,24 @@ def get_highest_rated_movie():
         # We only return the first one if there are multiple
         return cursor.fetchone(), max_rating
 
+# Groups case-insensitive title duplicates; walks the LOWER(title) index.
+_EXACT_DUPLICATES_SQL = """
+    SELECT LOWER(title) AS l_title, year FROM movies
+    GROUP BY LOWER(title), year
+    HAVING COUNT(id) > 1
+"""
+
 def cleanup_database(threshold=85):
     """
     Finds and interactively merges both exact (case-insensitive) and
     fuzzily similar title duplicates.
     """
     import inquirer
+    from . import dedup
     
     with get_db_connection() as conn:
         # Step 1: Handle EXACT case-insensitive duplicates automatically
-        sql_exact = "SELECT LOWER(title) as l_title, year FROM movies GROUP BY l_title, year HAVING COUNT(id) > 1"
-        exact_duplicates = conn.execute(sql_exact).fetchall()
+        exact_duplicates = conn.execute(_EXACT_DUPLICATES_SQL).fetchall()
         
         merged_count = 0
         for group in exact_duplicates:
@@ -540,16 +1136,10 @@ def cleanup_database(threshold=85):
 
         # Step 2: Find and interactively merge FUZZILY similar titles
         all_movies = conn.execute("SELECT id, title, year FROM movies").fetchall()
-        potential_duplicates = {}
-        # This is a bit slow (O(n^2)), but robust for typical library sizes.
-        for i in range(len(all_movies)):
-            for j in range(i + 1, len(all_movies)):
-                m1, m2 = all_movies[i], all_movies[j]
-                if m1['year'] == m2['year'] and fuzz.ratio(m1['title'].lower(), m2['title'].lower()) > threshold:
-                    # Grouping by a sorted tuple of IDs to uniquely identify a pair
-                    key = tuple(sorted((m1['id'], m2['id'])))
-                    if key not in potential_duplicates:
-                        potential_duplicates[key] = [m1, m2]
+        potential_duplicates = {
+            (m1['id'], m2['id']): [m1, m2]
+            for m1, m2 in dedup.find_similar_pairs(all_movies, threshold)
+        }
         
         if not potential_duplicates:
             if merged_count == 0: # Only say this if nothing at all was found
@@ -580,27 +1170,200 @@ def cleanup_database(threshold=85):
             conn.commit()
         return total_merged
 
+def auto_merge_duplicates(threshold=85, policy='enriched', dry_run=False, chunk_size=200):
+    """
+    Merges every cluster of exact and similar-title duplicates without prompting.
+
+    Duplicate pairs are grouped into clusters with union-find. In each cluster
+    the `policy` ('oldest', 'enriched' or 'rating') picks the row to keep, and
+    metadata missing from it is filled from the rows being removed. Clusters
+    are applied in transactions of `chunk_size`.
+
+    Returns:
+        list: One merge plan per cluster (see dedup.plan_merge). Nothing is
+        written when `dry_run` is True.
+    """
+    from . import dedup
+
+    with get_db_connection() as conn:
+        movies = [dict(row) for row in conn.execute("SELECT * FROM movies ORDER BY id")]
+
+    pairs = dedup.find_similar_pairs(movies, threshold)
+    # Case-insensitive exact duplicates are merged even when the threshold is 100.
+    exact = {}
+    for movie in movies:
+        exact.setdefault((movie['title'].lower(), movie['year']), []).append(movie)
+    pairs += [[group[0], other] for group in exact.values() for other in group[1:]]
+
+    plan = [dedup.plan_merge(cluster, policy) for cluster in dedup.group_duplicates(pairs)]
+    if dry_run:
+        return plan
+
+    for chunk in _chunked(plan, chunk_size):
+        with transaction() as conn:
+            for entry in chunk:
+                keep_id = entry['keep']['id']
+                conn.executemany("DELETE FROM movies WHERE id = ?", [(m['id'],) for m in entry['remove']])
+                if entry['fields']:
+                    assignments = ", ".join(f'"{column}" = ?' for column in entry['fields'])
+                    conn.execute(f"UPDATE movies SET {assignments} WHERE id = ?", (*entry['fields'].values(), keep_id))
+                    if ENTITY_COLUMNS.keys() & entry['fields'].keys():
+                        row = conn.execute("SELECT * FROM movies WHERE id = ?", (keep_id,)).fetchone()
+                        _sync_movie_entities(conn, keep_id, row)
+
+    removed = sum(len(entry['remove']) for entry in plan)
+    app_logger.log_info(
+        f"Auto-merged {removed} duplicate movies in {len(plan)} groups (policy: {policy}).",
+        operation='auto_merge', removed=removed, groups=len(plan)
+    )
+    return plan
+
+def build_normalized_title_index():
+    """
+    Maps (normalized title, year) to the matching movie row for the whole
+    archive, so importers can resolve titles with platform-specific
+    differences (e.g. with or without a colon ':') by dictionary lookup.
+    When several rows normalize alike, the oldest one wins.
+    """
+    from . import core # Lazy import to use the normalizer
+
+    with get_db_connection() as conn:
+        rows = conn.execute("SELECT id, title, year FROM movies ORDER BY id").fetchall()
+
+    index = {}
+    for row in rows:
+        index.setdefault((core.normalize_title(row['title']), row['year']), row)
+    return index
+
 def find_movie_by_normalized_title(normalized_title, year):
     """
     Finds a movie in the database by comparing its normalized title and year.
-    This is used to match titles that might have platform-specific differences
-    (e.g., with or without a colon ':').
+    For many lookups, build the index once with build_normalized_title_index().
     """
     from . import core # Lazy import to use the normalizer
     
     with get_db_connection() as conn:
-        # We cannot use a simple SQL query here because normalization happens in Python.
-        # We must fetch all potential candidates and check them one by one.
-        # This is less efficient, but necessary for this kind of fuzzy matching.
-        cursor = conn.execute("SELECT * FROM movies WHERE year = ?", (year,))
-        
-        for movie_row in cursor.fetchall():
-            db_title_normalized = core.normalize_title(movie_row['title'])
-            if db_title_normalized == normalized_title:
-                return movie_row # Return the full row object if a match is found
+        # Normalization happens in Python, so only the year narrows the query.
+        cursor = conn.execute("SELECT * FROM movies WHERE year = ? ORDER BY id", (year,))
+        for movie_row in cursor:
+            if core.normalize_title(movie_row['title']) == normalized_title:
+                return movie_row
     
     return None # No match found
 
+_LETTERBOXD_INSERT_SQL = "INSERT OR IGNORE INTO movies (title, year, watched, user_rating) VALUES (?, ?, 1, ?)"
+_LETTERBOXD_UPDATE_SQL = """
+    UPDATE movies SET watched = 1, user_rating = COALESCE(?, user_rating)
+    WHERE title = ? AND year = ?
+"""
+
+def apply_letterboxd_import(movies, watchlist=()):
+    """
+    Applies a processed Letterboxd export in a single transaction.
+
+    Every movie is upserted as watched with its rating (an existing rating is
+    kept when Letterboxd has none), and watchlist titles are added unless
+    already present.
+
+    Args:
+        movies (iterable): Dicts from core.process_letterboxd_zip; matched
+            movies carry the archive's spelling in 'original_title'
+        watchlist (iterable): Plain titles for the watchlist, stored like `watchlist --add` does
+
+    Returns:
+        tuple: (added_count, updated_count, watchlist_added_count)
+    """
+    params = (
+        (m['original_title'] if 'original_title' in m else m['title'].title(), m['year'], m.get('rating'))
+        for m in movies
+    )
+    added = updated = 0
+    with transaction() as conn:
+        # The INSERT's rowcount tells new movies from existing ones without recounting the table.
+        for title, year, rating in params:
+            if conn.execute(_LETTERBOXD_INSERT_SQL, (title, year, rating)).rowcount:
+                added += 1
+            else:
+                updated += conn.execute(_LETTERBOXD_UPDATE_SQL, (rating, title, year)).rowcount
+        watchlist_added = conn.executemany(
+            "INSERT OR IGNORE INTO watchlist (title) VALUES (?)",
+            ((title.strip().title(),) for title in watchlist)
+        ).rowcount
+    return added, updated, watchlist_added
+
+def apply_library_changes(added, removed):
+    """
+    Applies one batch of library changes in a single transaction.
+    Movies that are watched or rated are never removed, so a renamed or
+    temporarily missing folder cannot discard the user's own data.
+
+    Args:
+        added (iterable): (title, year) tuples for folders that appeared
+        removed (iterable): (title, year) tuples for folders that disappeared
+
+    Returns:
+        tuple: (inserted, removed_count) where inserted lists the (title, year)
+        tuples that were not in the archive yet
+    """
+    inserted = []
+    with transaction() as conn:
+        for title, year in added:
+            if conn.execute("INSERT OR IGNORE INTO movies (title, year) VALUES (?, ?)", (title.title(), year)).rowcount:
+                inserted.append((title.title(), year))
+        removed_count = conn.executemany(
+            "DELETE FROM movies WHERE LOWER(title) = LOWER(?) AND year = ? AND watched = 0 AND user_rating IS NULL",
+            list(removed)
+        ).rowcount
+    return inserted, removed_count
+
+def _create_scan_manifest(conn):
+    """Creates the table that remembers which library folders a scan has already listed."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS scan_manifest (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            subdirs TEXT NOT NULL
+        )
+    ''')
+
+def _manifest_scope(root):
+    """WHERE clause and parameters selecting `root` and every folder below it."""
+    prefix = os.path.join(root, '')
+    return "path = ? OR substr(path, 1, ?) = ?", (root, len(prefix), prefix)
+
+def get_scan_manifest(root):
+    """
+    Returns the recorded state of every folder under `root` as
+    {path: {'mtime_ns', 'inode', 'subdirs'}}.
+    """
+    import json
+    where, params = _manifest_scope(root)
+    with get_db_connection() as conn:
+        rows = conn.execute(f"SELECT path, mtime_ns, inode, subdirs FROM scan_manifest WHERE {where}", params).fetchall()
+    return {
+        row['path']: {'mtime_ns': row['mtime_ns'], 'inode': row['inode'], 'subdirs': json.loads(row['subdirs'])}
+        for row in rows
+    }
+
+def save_scan_manifest(root, records):
+    """
+    Replaces the manifest for `root` with the folders seen by a scan.
+    Folders no longer reachable from `root` are forgotten.
+
+    Args:
+        root (str): Absolute library root
+        records (list): (path, mtime_ns, inode, subdirs) tuples
+    """
+    import json
+    where, params = _manifest_scope(root)
+    with transaction() as conn:
+        conn.execute(f"DELETE FROM scan_manifest WHERE {where}", params)
+        conn.executemany(
+            "INSERT OR REPLACE INTO scan_manifest (path, mtime_ns, inode, subdirs) VALUES (?, ?, ?, ?)",
+            ((path, mtime_ns, inode, json.dumps(subdirs)) for path, mtime_ns, inode, subdirs in records)
+        )
+
 #Functions for Watchlist Management
 def get_watchlist():
     """Returns all titles from the watchlist, sorted alphabetically."""
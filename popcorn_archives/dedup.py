@@ -0,0 +1,166 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+DEFAULT_THRESHOLD = 85
+BLOCK_SIZE = 512  # Rows scored per cdist call inside one year bucket
+
+
+def _length_limit(length, cutoff):
+    """
+    Returns the longest title that can still reach `cutoff` against a title
+    of `length` characters. fuzz.ratio is 200 * matches / (len1 + len2) and
+    matches <= the shorter length, so longer titles can be skipped outright.
+    """
+    return int(length * (200 - cutoff) / cutoff) if cutoff > 0 else float('inf')
+
+
+def _bucket_pairs(bucket, threshold, cutoff, workers):
+    """
+    Scores one year bucket. Titles are sorted by length and compared in blocks
+    against the window of longer titles that can still match, so the number
+    of comparisons grows with the window width rather than the bucket size.
+    Yields (position, position) pairs into the caller's movie list.
+    """
+    from rapidfuzz import fuzz, process
+
+    bucket.sort(key=lambda item: len(item[1]))
+    titles = [title for _, title in bucket]
+    lengths = [len(title) for title in titles]
+
+    for start in range(0, len(titles), BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, len(titles))
+        stop = max(end, bisect_right(lengths, _length_limit(lengths[end - 1], cutoff)))
+        scores = process.cdist(
+            titles[start:end], titles[start:stop],
+            scorer=fuzz.ratio, score_cutoff=cutoff, workers=workers
+        )
+        for row, col in zip(*scores.nonzero()):
+            i, j = start + row, start + col
+            # round() mirrors thefuzz's integer scores, so results match fuzz.ratio exactly.
+            if j > i and round(scores[row, col]) > threshold:
+                a, b = bucket[i][0], bucket[j][0]
+                yield (a, b) if a < b else (b, a)
+
+
+def find_similar_pairs(movies, threshold=DEFAULT_THRESHOLD, workers=-1):
+    """
+    Finds pairs of movies from the same year whose lowercased titles have a
+    fuzz.ratio above `threshold`.
+
+    Movies are blocked by year, pruned by title length and scored with
+    rapidfuzz's vectorized cdist, which runs on `workers` threads
+    (-1 uses every core). The result is identical to comparing every pair.
+
+    Args:
+        movies (list): Rows or dicts with 'id', 'title' and 'year'
+        threshold (int): Minimum similarity score, exclusive (0-100)
+        workers (int): Threads used by the scorer
+
+    Returns:
+        list: [movie, other] pairs ordered as a nested loop over `movies` would find them
+    """
+    buckets = defaultdict(list)
+    for position, movie in enumerate(movies):
+        buckets[movie['year']].append((position, movie['title'].lower()))
+
+    # A score of threshold - 0.5 still rounds above the threshold.
+    cutoff = max(threshold - 0.5, 0)
+    pairs = set()
+    for bucket in buckets.values():
+        if len(bucket) > 1:
+            pairs.update(_bucket_pairs(bucket, threshold, cutoff, workers))
+
+    return [[movies[a], movies[b]] for a, b in sorted(pairs)]
+
+
+# How --auto picks the row that survives a merge. Ties fall back to the oldest id.
+MERGE_POLICIES = {
+    'oldest': lambda movie: (movie['id'],),
+    'enriched': lambda movie: (-_filled_count(movie), movie['id']),
+    'rating': lambda movie: (-(movie['user_rating'] or 0), movie['id']),
+}
+DEFAULT_POLICY = 'enriched'
+
+# Columns that identify or track a row rather than describe the movie; never
+# merged. Copying updated_at onto the kept row would also stop the change log
+# from recording the merge.
+_IDENTITY_COLUMNS = ('id', 'title', 'year', 'created_at', 'updated_at')
+
+
+def _is_blank(value):
+    """Treats NULL, empty strings, 'N/A' placeholders and zero numbers as missing data."""
+    if isinstance(value, str):
+        return value.strip() in ('', 'N/A')
+    return value is None or value == 0
+
+
+def _filled_count(movie):
+    return sum(1 for column in movie.keys() if column not in _IDENTITY_COLUMNS and not _is_blank(movie[column]))
+
+
+def group_duplicates(pairs):
+    """
+    Merges duplicate pairs into clusters with union-find, so A~B and B~C
+    become one {A, B, C} group instead of two separate decisions.
+
+    Args:
+        pairs (iterable): [movie, other] pairs of rows or dicts with an 'id'
+
+    Returns:
+        list: Clusters as lists of movies sorted by id, ordered by their lowest id
+    """
+    parent = {}
+    movies = {}
+
+    def find(movie_id):
+        root = movie_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[movie_id] != root:  # Path compression
+            parent[movie_id], movie_id = root, parent[movie_id]
+        return root
+
+    for first, second in pairs:
+        for movie in (first, second):
+            if movie['id'] not in parent:
+                parent[movie['id']] = movie['id']
+                movies[movie['id']] = movie
+        a, b = find(first['id']), find(second['id'])
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    clusters = {}
+    for movie_id in sorted(movies):
+        clusters.setdefault(find(movie_id), []).append(movies[movie_id])
+    return list(clusters.values())
+
+
+def plan_merge(cluster, policy=DEFAULT_POLICY):
+    """
+    Decides how one duplicate cluster is merged.
+
+    The policy picks the row to keep. Its missing fields are filled from the
+    other rows in policy order, and the movie counts as watched if any copy was.
+
+    Returns:
+        dict: JSON-serializable plan with 'keep' and 'remove' ({id, title, year}
+        entries) and 'fields', the values to write onto the kept row
+    """
+    ranked = sorted(cluster, key=MERGE_POLICIES[policy])
+    keeper, others = ranked[0], ranked[1:]
+
+    fields = {}
+    for column in keeper.keys():
+        if column in _IDENTITY_COLUMNS:
+            continue
+        if column == 'watched':
+            watched = max(movie['watched'] or 0 for movie in ranked)
+            if watched != keeper['watched']:
+                fields[column] = watched
+        elif _is_blank(keeper[column]):
+            value = next((movie[column] for movie in others if not _is_blank(movie[column])), None)
+            if value is not None:
+                fields[column] = value
+
+    summary = lambda movie: {'id': movie['id'], 'title': movie['title'], 'year': movie['year']}
+    return {'keep': summary(keeper), 'remove': [summary(movie) for movie in others], 'fields': fields}
@@ -0,0 +1,178 @@
+import os
+import csv
+import json
+from . import database
+
+# Format -> file extensions that select it (the first one is appended when a path has none).
+EXPORT_FORMATS = {
+    'csv': ('.csv',),
+    'csv.gz': ('.csv.gz',),
+    'jsonl': ('.jsonl', '.ndjson'),
+    'jsonl.gz': ('.jsonl.gz', '.ndjson.gz'),
+    'parquet': ('.parquet',),
+    'feather': ('.feather', '.arrow'),
+}
+DEFAULT_FORMAT = 'csv'
+EXPORT_CHUNK_SIZE = 5000
+# CSV keeps its historical single "Title Year" column, which `import` reads back.
+# Every other format exports all columns unless told otherwise.
+LEGACY_CSV_COLUMNS = ('name',)
+
+_ARROW_TYPES = {'INTEGER': 'int64', 'REAL': 'float64'}  # Anything else is exported as a string
+
+
+def resolve_format(path, fmt=None):
+    """
+    Picks the export format from `fmt` or the file extension and makes sure
+    the path ends with a matching extension. Returns (path, format).
+    """
+    lowered = path.lower()
+    if fmt is None:
+        # Longest extensions first, so 'movies.csv.gz' is not taken for plain CSV.
+        matches = [(ext, name) for name, exts in EXPORT_FORMATS.items() for ext in exts if lowered.endswith(ext)]
+        fmt = max(matches, key=lambda match: len(match[0]))[1] if matches else DEFAULT_FORMAT
+    elif fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'.")
+    if not lowered.endswith(EXPORT_FORMATS[fmt]):
+        path += EXPORT_FORMATS[fmt][0]
+    return path, fmt
+
+
+def resolve_columns(columns, fmt):
+    """
+    Expands a column selection: None picks the format's default, 'all'
+    means every movies column, and 'name' is the computed "Title Year".
+    """
+    if not columns:
+        columns = LEGACY_CSV_COLUMNS if fmt in ('csv', 'csv.gz') else ['all']
+    resolved = []
+    for column in columns:
+        resolved.extend(database.get_movie_columns() if column == 'all' else [column])
+    return list(dict.fromkeys(resolved))
+
+
+def _open_text(path, fmt):
+    if fmt.endswith('.gz'):
+        import gzip
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def _write_csv(path, fmt, columns, chunks, progress):
+    with _open_text(path, fmt) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            progress(len(chunk))
+
+
+def _write_jsonl(path, fmt, columns, chunks, progress):
+    with _open_text(path, fmt) as f:
+        for chunk in chunks:
+            f.write(''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in chunk))
+            progress(len(chunk))
+
+
+def _arrow_schema(columns):
+    import pyarrow as pa
+    types = {'seq': 'INTEGER', **database.get_movie_columns()}
+    return pa.schema([
+        (column, getattr(pa, _ARROW_TYPES.get((types.get(column) or '').split(' ')[0].upper(), 'string'))())
+        for column in columns
+    ])
+
+
+def _write_arrow(path, fmt, columns, chunks, progress):
+    """Writes one record batch (a Parquet row group) per chunk, so the whole table is never held in memory."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(f"Exporting to {fmt} requires pyarrow: pip install 'popcorn-archives[columnar]'") from None
+
+    schema = _arrow_schema(columns)
+    writer = pq.ParquetWriter(path, schema) if fmt == 'parquet' else pa.ipc.new_file(path, schema)
+    with writer:
+        for chunk in chunks:
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)], schema=schema
+            )
+            writer.write_batch(batch)
+            progress(len(chunk))
+
+
+_WRITERS = {
+    'csv': _write_csv,
+    'csv.gz': _write_csv,
+    'jsonl': _write_jsonl,
+    'jsonl.gz': _write_jsonl,
+    'parquet': _write_arrow,
+    'feather': _write_arrow,
+}
+
+
+def _export(path, fmt, columns, chunks, progress):
+    """Writes `chunks` to `path` through a temporary file. Returns the number of rows written."""
+    written = 0
+
+    def count(rows):
+        nonlocal written
+        written += rows
+        if progress:
+            progress(rows)
+
+    temp_path = f"{path}.part"
+    try:
+        _WRITERS[fmt](temp_path, fmt, columns, chunks, count)
+        os.replace(temp_path, path)
+    finally:
+        chunks.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return written
+
+
+def export_movies(path, fmt=None, columns=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Streams the archive to a file.
+
+    Rows are read from one database cursor in chunks and written as they
+    arrive, so memory use does not grow with the archive. The file is
+    written under a temporary name and moved into place when complete, so
+    a failed export never leaves a truncated file behind.
+
+    Args:
+        path (str): Destination; a missing extension is added for the format
+        fmt (str, optional): One of EXPORT_FORMATS, otherwise taken from the extension
+        columns (list, optional): Column names, 'all' or 'name' (see resolve_columns)
+        chunk_size (int): Rows fetched and written at a time
+        progress (callable, optional): Called with the number of rows written per chunk
+
+    Returns:
+        tuple: (path, rows_written)
+    """
+    path, fmt = resolve_format(path, fmt)
+    columns = resolve_columns(columns, fmt)
+    return path, _export(path, fmt, columns, database.iter_movie_chunks(columns, chunk_size), progress)
+
+
+# Leading columns of a delta export.
+CHANGE_COLUMNS = ('seq', 'op', 'changed_at')
+
+
+def export_changes(path, since_seq, fmt=None, columns=None, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Streams only the movies inserted, updated or deleted after change
+    `since_seq` (see database.iter_change_chunks), one row per movie with
+    CHANGE_COLUMNS first. Columns default to every movies column.
+
+    Returns:
+        tuple: (path, rows_written, last_seq) where last_seq is the value
+        to pass as `since_seq` next time
+    """
+    path, fmt = resolve_format(path, fmt)
+    columns = resolve_columns(columns or ['all'], fmt)
+    last_seq = database.get_change_seq()
+    chunks = database.iter_change_chunks(since_seq, last_seq, columns, chunk_size)
+    return path, _export(path, fmt, [*CHANGE_COLUMNS, *columns], chunks, progress), last_seq
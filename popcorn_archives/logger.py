@@ -1,5 +1,8 @@
 import logging
 import os
+import json
+import atexit
+import threading
 import click
 from . import config as config_manager
 
@@ -8,30 +11,115 @@ APP_NAME = "PopcornArchives"
 APP_DIR = click.get_app_dir(APP_NAME)
 LOG_FILE = os.path.join(APP_DIR, 'poparch.log')
 
+# The log rotates at LOG_MAX_BYTES into gzip-compressed segments
+# (poparch.log.1.gz is the newest); the oldest beyond LOG_BACKUP_COUNT is dropped.
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Bulk operations log this many sample items and a count of the rest.
+LOG_SAMPLE_SIZE = 10
+
 # Get the logger, but DO NOT configure it yet.
 logger = logging.getLogger('poparch_logger')
 
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class TextFormatter(logging.Formatter):
+    """The classic 'time - LEVEL - message' line, with any fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(levelname)s - %(message)s', datefmt=LOG_DATE_FORMAT)
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' | ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message and the record's fields."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, LOG_DATE_FORMAT),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+
+def _gzip_rotator(source, dest):
+    """Compresses the full log into its rotated segment and starts a new one."""
+    import gzip
+    import shutil
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
 def setup_logger():
     """
-    Sets up the logger, creating the directory and file handler.
-    This should be called once when the application starts.
+    Sets up the logger. Records are put on an in-memory queue and written by
+    a background QueueListener thread, so logging never waits on the disk.
+    Nothing is started while logging is disabled; log_info/log_error call
+    this again once it is enabled. Safe to call repeatedly.
     """
-    # Only set up handlers if they haven't been set up already.
-    if logger.hasHandlers():
+    global _listener
+    if _listener is not None or not config_manager.is_logging_enabled():
         return
 
-    try:
-        os.makedirs(APP_DIR, exist_ok=True)
-    except OSError:
-        # Handle cases where we can't create the directory
-        click.echo(click.style("Warning: Could not create config directory for logging.", fg='red'))
-        return
+    with _listener_lock:
+        if _listener is not None:
+            return
+        try:
+            os.makedirs(APP_DIR, exist_ok=True)
+        except OSError:
+            # Handle cases where we can't create the directory
+            click.echo(click.style("Warning: Could not create config directory for logging.", fg='red'))
+            return
+
+        import queue
+        import logging.handlers
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+        )
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+        json_lines = config_manager.get_settings().log_format == 'json'
+        file_handler.setFormatter(JsonLinesFormatter() if json_lines else TextFormatter())
+
+        records = queue.SimpleQueue()
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, file_handler)
+        _listener.start()
+        atexit.register(shutdown_logger)
+
+
+def shutdown_logger():
+    """Writes out any queued records and stops the background writer."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        _listener = None
 
-    logger.setLevel(logging.INFO)
-    file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
 def initialize_log_file():
     """Creates the log file with an initial message if it doesn't exist."""
@@ -48,22 +136,42 @@ def initialize_log_file():
         temp_logger.info(initial_message)
         temp_logger.removeHandler(temp_handler)
 
-def log_info(message):
-    """Logs an info message if logging is enabled."""
-    if config_manager.is_logging_enabled():
-        logger.info(message)
 
-def log_error(message):
-    """Logs an error message if logging is enabled."""
-    if config_manager.is_logging_enabled():
-        logger.error(message)
+def summarize_items(items, limit=LOG_SAMPLE_SIZE):
+    """Joins the first `limit` items and counts the rest, e.g. "A, B, C and 97 more"."""
+    items = list(items)
+    sample = ", ".join(str(item) for item in items[:limit])
+    return f"{sample} and {len(items) - limit} more" if len(items) > limit else sample
+
+
+def _log(level, message, fields):
+    if not config_manager.is_logging_enabled():
+        return
+    if _listener is None:
+        setup_logger()
+    logger.log(level, message, extra={'fields': fields})
+
+def log_info(message, **fields):
+    """
+    Logs an info message if logging is enabled. Keyword arguments are
+    recorded as structured fields (e.g. added=12, duration=3.4).
+    """
+    _log(logging.INFO, message, fields)
+
+def log_error(message, **fields):
+    """Logs an error message if logging is enabled. See log_info for `fields`."""
+    _log(logging.ERROR, message, fields)
 
 def clear_logs():
-    """Clears the contents of the log file."""
+    """Clears the contents of the log file and deletes its rotated segments."""
     try:
         with open(LOG_FILE, 'w'):
             pass # Opening in 'w' mode and closing clears the file
+        for index in range(1, LOG_BACKUP_COUNT + 1):
+            segment = _gzip_namer(f"{LOG_FILE}.{index}")
+            if os.path.exists(segment):
+                os.remove(segment)
         log_info("Log file cleared by user.")
         return True
     except Exception:
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from . import logger as app_logger
+
+BLOCK_SIZE = 64 * 1024      # Bytes read per backward seek
+FOLLOW_INTERVAL = 0.5       # Seconds between checks for new lines in --follow
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+_TEXT_RECORD_RE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - ([A-Z]+) - ')
+
+
+def log_segments():
+    """Returns the existing log files, newest first: poparch.log, then poparch.log.1.gz, ..."""
+    paths = [app_logger.LOG_FILE]
+    paths += [app_logger._gzip_namer(f"{app_logger.LOG_FILE}.{index}") for index in range(1, app_logger.LOG_BACKUP_COUNT + 1)]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _read_backwards(path):
+    """
+    Yields the lines of a plain file from last to first, reading BLOCK_SIZE
+    blocks from the end, so only as much of the file is read as is consumed.
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b'\n')
+            remainder = lines.pop(0)  # May continue in the previous block
+            yield from reversed(lines)
+        yield remainder
+
+
+def _read_gzip_backwards(path):
+    """Gzip streams cannot be read backwards, so a compressed segment is decompressed whole (at most LOG_MAX_BYTES)."""
+    import gzip
+    with gzip.open(path, 'rb') as f:
+        lines = f.read().split(b'\n')
+    yield from reversed(lines)
+
+
+def _reversed_lines():
+    """Yields every log line across all segments, newest first."""
+    for path in log_segments():
+        reader = _read_gzip_backwards if path.endswith('.gz') else _read_backwards
+        for line in reader(path):
+            if line.strip():
+                yield line.decode('utf-8', errors='replace')
+
+
+def parse_record(line):
+    """
+    Returns (timestamp, level) for a text or JSON-lines record. Lines that
+    are not records, such as continuation lines, give (None, None).
+    """
+    if line.startswith('{'):
+        try:
+            entry = json.loads(line)
+            return datetime.strptime(entry['time'], app_logger.LOG_DATE_FORMAT), entry['level']
+        except (ValueError, KeyError, TypeError):
+            return None, None
+    match = _TEXT_RECORD_RE.match(line)
+    if not match:
+        return None, None
+    return datetime.strptime(match.group(1), app_logger.LOG_DATE_FORMAT), match.group(2)
+
+
+def _matches(line, level=None, since=None, until=None):
+    """Checks a line against the filters. Lines that are not records only pass when there are no filters."""
+    if not (level or since or until):
+        return True
+    timestamp, record_level = parse_record(line)
+    if timestamp is None:
+        return False
+    if level and LEVELS.get(record_level, 0) < LEVELS[level]:
+        return False
+    if since and timestamp < since:
+        return False
+    return not (until and timestamp > until)
+
+
+def tail(count=20, level=None, since=None, until=None):
+    """
+    Returns the last `count` log lines that pass the filters, oldest first.
+
+    Segments are read backwards from the end, and reading stops once enough
+    lines are found or a record older than `since` is reached, so the cost
+    depends on the output rather than the size of the log.
+
+    Args:
+        count (int): Maximum number of lines to return
+        level (str, optional): Minimum level name, e.g. 'WARNING'
+        since (datetime, optional): Skip records older than this
+        until (datetime, optional): Skip records newer than this
+
+    Returns:
+        list: Lines without their trailing newline
+    """
+    found = []
+    if count <= 0:
+        return found
+    for line in _reversed_lines():
+        if since:
+            timestamp, _ = parse_record(line)
+            if timestamp is not None and timestamp < since:
+                break  # Records are chronological; everything further back is older
+        if _matches(line, level, since, until):
+            found.append(line)
+            if len(found) == count:
+                break
+    found.reverse()
+    return found
+
+
+def follow(level=None, since=None, until=None, interval=FOLLOW_INTERVAL, stop_event=None):
+    """
+    Yields lines appended to the log after the call, like `tail -f`, until
+    `stop_event` is set. A rotated or cleared log is reopened from its start.
+    """
+    path = app_logger.LOG_FILE
+    # The end of the log is taken now rather than on the first next(), so nothing written in between is missed.
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    return _follow(path, offset, level, since, until, interval, stop_event or threading.Event())
+
+
+def _follow(path, offset, level, since, until, interval, stop_event):
+    f, inode, pending = None, None, b''
+    try:
+        while not stop_event.is_set():
+            if f is None and os.path.exists(path):
+                f = open(path, 'rb')
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                offset, pending = 0, b''  # A replacement file is read from its start
+            data = f.read() if f else b''
+            if data:
+                lines = (pending + data).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    text = line.decode('utf-8', errors='replace')
+                    if line.strip() and _matches(text, level, since, until):
+                        yield text
+                continue
+            if f:
+                try:
+                    stat = os.stat(path)
+                    replaced = stat.st_ino != inode or stat.st_size < f.tell()
+                except FileNotFoundError:
+                    replaced = True
+                if replaced:
+                    f.close()
+                    f = None
+                    continue
+            stop_event.wait(interval)
+    finally:
+        if f:
+            f.close()
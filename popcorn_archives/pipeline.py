@@ -0,0 +1,153 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import core
+from . import database
+from . import logger as app_logger
+
+DEFAULT_SEARCH_CONCURRENCY = 8
+DEFAULT_DETAILS_CONCURRENCY = 8
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0
+
+_DONE = object()  # Sentinel that tells a stage its input is exhausted.
+
+
+async def _enrich(movies, search_concurrency, details_concurrency, queue_size, batch_size, on_result):
+    """
+    Runs the three enrichment stages connected by bounded queues:
+
+        search (N tasks) -> details fetch (M tasks) -> single DB writer
+
+    The blocking HTTP and SQLite calls run in worker threads, so a slow
+    TMDb response never stalls the writer and a commit never stalls the
+    fetchers. Bounded queues apply back-pressure when a stage falls behind.
+    """
+    search_queue = asyncio.Queue(queue_size)
+    details_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    summary = {'updated': 0, 'failed': []}
+
+    def report(movie, error):
+        if error:
+            summary['failed'].append((f"{movie['title']} ({movie['year']})", error))
+        else:
+            summary['updated'] += 1
+        if on_result:
+            on_result(movie, error)
+
+    async def searcher():
+        while (movie := await search_queue.get()) is not _DONE:
+            match = await asyncio.to_thread(core.search_tmdb_movie, movie['title'], movie['year'])
+            if "id" in match:
+                await details_queue.put((movie, match["id"]))
+            else:
+                # Failed searches skip the details stage but are still reported by the writer.
+                await write_queue.put((movie, match))
+
+    async def fetcher():
+        while (item := await details_queue.get()) is not _DONE:
+            movie, movie_id = item
+            details = await asyncio.to_thread(core.fetch_tmdb_movie_details, movie_id, movie['title'], movie['year'])
+            await write_queue.put((movie, details))
+
+    async def writer():
+        batch = []
+
+        async def flush():
+            if not batch:
+                return
+            # Taken out of `batch` before awaiting, so a cancelled run does not write it twice.
+            pending, batch[:] = batch[:], []
+            items = [(m['title'], m['year'], d) for m, d in pending]
+            written = await asyncio.to_thread(database.update_movies_details_bulk, items)
+            for (movie, details), ok in zip(pending, written):
+                if details.get("Error"):
+                    report(movie, details["Error"])
+                else:
+                    report(movie, None if ok else "Database update failed")
+
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(write_queue.get(), timeout=FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    await flush()  # Keep progress moving when results trickle in.
+                    continue
+                if item is _DONE:
+                    await flush()
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    await flush()
+        finally:
+            # Commit whatever was fetched but not yet handed to a flush, even if the run is cancelled.
+            if batch:
+                items = [(m['title'], m['year'], d) for m, d in batch]
+                database.update_movies_details_bulk(items)
+
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=search_concurrency + details_concurrency + 1))
+
+    async def feeder():
+        for movie in movies:
+            await search_queue.put(movie)
+        for _ in searchers:
+            await search_queue.put(_DONE)
+        await asyncio.gather(*searchers)
+
+        for _ in fetchers:
+            await details_queue.put(_DONE)
+        await asyncio.gather(*fetchers)
+
+        await write_queue.put(_DONE)
+
+    searchers = [asyncio.create_task(searcher()) for _ in range(search_concurrency)]
+    fetchers = [asyncio.create_task(fetcher()) for _ in range(details_concurrency)]
+    writer_task = asyncio.create_task(writer())
+    tasks = [asyncio.create_task(feeder())] + searchers + fetchers + [writer_task]
+
+    try:
+        # A stage that fails stops draining its queue, which would leave the
+        # stages before it blocked on put() forever, so any failure ends the run.
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception():
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return summary['updated'], summary['failed']
+
+
+def run_enrichment_pipeline(movies, search_concurrency=DEFAULT_SEARCH_CONCURRENCY,
+                            details_concurrency=DEFAULT_DETAILS_CONCURRENCY,
+                            queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                            on_result=None):
+    """
+    Enriches movies with TMDb details using the asyncio pipeline.
+
+    Args:
+        movies (iterable): Rows or dicts with 'title' and 'year'
+        search_concurrency (int): Concurrent search requests
+        details_concurrency (int): Concurrent details requests
+        queue_size (int): Capacity of each queue between stages
+        batch_size (int): Results committed per database transaction
+        on_result (callable, optional): Called as on_result(movie, error)
+            for every movie once its result is committed; error is None on success
+
+    Returns:
+        tuple: (updated_count, failed_movies) where failed_movies is a list of
+        ("Title (YYYY)", reason) pairs
+    """
+    start = time.monotonic()
+    updated, failed = asyncio.run(
+        _enrich(movies, search_concurrency, details_concurrency, queue_size, batch_size, on_result)
+    )
+    app_logger.log_info(f"Pipeline enrichment finished: {updated} updated, {len(failed)} failed.",
+                        operation='pipeline', updated=updated, failed=len(failed),
+                        duration=round(time.monotonic() - start, 3))
+    return updated, failed
@@ -0,0 +1,94 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from . import core
+from . import database
+
+DEFAULT_DEPTH = 1
+DEFAULT_SCAN_WORKERS = 8
+
+ScanResult = namedtuple('ScanResult', ['movies', 'invalid_folders', 'visited', 'listed'])
+
+
+def _visit(path, manifest):
+    """
+    Returns the sub-folder names of `path` and its manifest entry. A folder
+    whose mtime and inode match the manifest is not listed again: adding,
+    removing or renaming a child always bumps the parent's mtime.
+    """
+    stat = os.stat(path)
+    known = manifest.get(path)
+    if known and known['mtime_ns'] == stat.st_mtime_ns and known['inode'] == stat.st_ino:
+        return known['subdirs'], stat, False
+    with os.scandir(path) as entries:
+        subdirs = sorted(entry.name for entry in entries if entry.is_dir())
+    return subdirs, stat, True
+
+
+def scan_library(root, depth=DEFAULT_DEPTH, workers=DEFAULT_SCAN_WORKERS, incremental=False, progress=None):
+    """
+    Walks a movie library and classifies its folders.
+
+    Folders named like "Title YYYY" or "Title (YYYY)" are movies and are not
+    descended into. Other folders up to `depth` levels below `root` are
+    treated as containers (e.g. Movies/<Genre>/<Title (Year)>) and listed on a
+    thread pool, which keeps slow network shares busy. A non-movie folder is
+    reported as invalid when it sits at the depth limit or has no sub-folders.
+
+    Every listed folder is recorded in the scan manifest. With
+    `incremental=True`, folders unchanged since the last scan reuse their
+    recorded sub-folders instead of being listed again.
+
+    Args:
+        root (str): Library root
+        depth (int): How many folder levels below `root` to search for movies
+        workers (int): Folders listed concurrently
+        incremental (bool): Skip listing folders the manifest says are unchanged
+        progress (callable, optional): Called with 1 for every folder visited
+
+    Returns:
+        ScanResult: (movies, invalid_folders, visited, listed) where movies are
+        (title, year) tuples, invalid folders are paths relative to `root`,
+        and visited/listed count the folders checked and actually read
+    """
+    root = os.path.abspath(root)
+    manifest = database.get_scan_manifest(root) if incremental else {}
+    found, invalid, records = [], [], []
+    seen = set()
+    listed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_visit, root, manifest): (root, 0)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, level = pending.pop(future)
+                try:
+                    subdirs, stat, was_listed = future.result()
+                except OSError:
+                    if level == 0:
+                        raise
+                    invalid.append(os.path.relpath(path, root))  # Unreadable folder
+                    continue
+                if progress:
+                    progress(1)
+                if (stat.st_dev, stat.st_ino) in seen:
+                    continue  # Symlink loop
+                seen.add((stat.st_dev, stat.st_ino))
+                listed += was_listed
+                records.append((path, stat.st_mtime_ns, stat.st_ino, subdirs))
+
+                if level > 0 and not subdirs:
+                    invalid.append(os.path.relpath(path, root))
+                for name, (title, year) in zip(subdirs, core.parse_many(subdirs)):
+                    child = os.path.join(path, name)
+                    if title and year:
+                        found.append((os.path.relpath(child, root), (title, year)))
+                    elif level + 1 < depth:
+                        pending[executor.submit(_visit, child, manifest)] = (child, level + 1)
+                    else:
+                        invalid.append(os.path.relpath(child, root))
+
+    database.save_scan_manifest(root, records)
+    movies = [movie for _, movie in sorted(found)]
+    return ScanResult(movies, sorted(invalid), len(records), listed)
@@ -0,0 +1,78 @@
+from . import database
+
+# Dashboard sections backed by entity_stats: (dashboard key, link role).
+TOP_LISTS = (
+    ('top_genres', 'genre'),
+    ('top_directors', 'director'),
+    ('top_actors', 'cast'),
+    ('top_keywords', 'keywords'),
+)
+
+_SUMMARY_SQL = """
+    SELECT
+        (SELECT count FROM movie_stats WHERE kind = 'total' AND bucket = 0) AS total,
+        (SELECT count FROM movie_stats WHERE kind = 'watched' AND bucket = 1) AS watched,
+        (SELECT bucket FROM movie_stats WHERE kind = 'decade' ORDER BY count DESC, bucket LIMIT 1) AS top_decade,
+        (SELECT MAX(count) FROM movie_stats WHERE kind = 'decade') AS top_decade_count,
+        (SELECT id FROM movies ORDER BY year, id LIMIT 1) AS oldest_id,
+        (SELECT id FROM movies ORDER BY year DESC, id LIMIT 1) AS newest_id,
+        (SELECT id FROM movies WHERE runtime > 0 ORDER BY runtime, id LIMIT 1) AS shortest_id,
+        (SELECT id FROM movies WHERE runtime > 0 ORDER BY runtime DESC, id LIMIT 1) AS longest_id,
+        (SELECT id FROM movies WHERE user_rating > 0 ORDER BY user_rating DESC, id LIMIT 1) AS top_rated_id
+"""
+
+_TOP_ITEM_SQL = """
+    SELECT * FROM (
+        SELECT s.role, e.name, s.count
+        FROM entity_stats s
+        JOIN entities e ON e.id = s.entity_id
+        WHERE s.role = ?
+        ORDER BY s.count DESC, e.name
+        LIMIT ?
+    )
+"""
+
+
+def get_dashboard(top_n=3):
+    """
+    Computes everything `poparch stats` shows with three queries on one
+    connection. Counts come from the trigger-maintained movie_stats and
+    entity_stats tables and the extremes are index lookups, so the cost does
+    not grow with the size of the archive.
+
+    Returns:
+        dict: 'total', 'watched', 'unwatched', 'top_decade' ((decade, count) or
+        None), 'oldest', 'newest', 'shortest', 'longest' and 'top_rated' (movie
+        rows or None), plus 'top_genres', 'top_directors', 'top_actors' and
+        'top_keywords' as lists of (name, count)
+    """
+    with database.get_db_connection() as conn:
+        summary = conn.execute(_SUMMARY_SQL).fetchone()
+
+        movie_ids = {key: summary[f"{key}_id"] for key in ('oldest', 'newest', 'shortest', 'longest', 'top_rated')}
+        wanted = [movie_id for movie_id in set(movie_ids.values()) if movie_id is not None]
+        placeholders = ",".join("?" * len(wanted))
+        movies = {
+            row['id']: row for row in conn.execute(
+                f"SELECT id, title, year, runtime, user_rating FROM movies WHERE id IN ({placeholders})", wanted
+            )
+        } if wanted else {}
+
+        roles = {role: key for key, role in TOP_LISTS}
+        top_items = {key: [] for key, _ in TOP_LISTS}
+        sql = " UNION ALL ".join([_TOP_ITEM_SQL] * len(TOP_LISTS))
+        params = [value for _, role in TOP_LISTS for value in (role, top_n)]
+        for row in conn.execute(sql, params):
+            top_items[roles[row['role']]].append((row['name'], row['count']))
+
+    total = summary['total'] or 0
+    watched = summary['watched'] or 0
+    dashboard = {
+        'total': total,
+        'watched': watched,
+        'unwatched': total - watched,
+        'top_decade': (summary['top_decade'], summary['top_decade_count']) if summary['top_decade'] is not None else None,
+    }
+    dashboard.update({key: movies.get(movie_id) for key, movie_id in movie_ids.items()})
+    dashboard.update(top_items)
+    return dashboard
@@ -0,0 +1,263 @@
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import threading
+from . import config as config_manager
+from . import database
+from . import scanner
+from . import logger as app_logger
+
+DEFAULT_DEBOUNCE = 2.0        # Quiet seconds after the last event before rescanning
+DEFAULT_POLL_INTERVAL = 30.0  # Seconds between rescans when inotify is unavailable
+ENRICH_WORKERS = 4
+ENRICH_STOP_TIMEOUT = 10.0    # Seconds to let queued enrichment finish when watch mode stops
+# More vanished folders than this in one sync looks like a broken mount or a
+# mass move rather than deleted movies, so none of them are removed.
+MAX_REMOVALS_PER_SYNC = 25
+
+# inotify(7) constants
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyTrigger:
+    """
+    Reports folder creations, deletions and renames under the watched
+    folders through Linux inotify. Raises OSError where it is unavailable.
+    """
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watched = {}  # watch descriptor -> path
+
+    def watch(self, paths):
+        """Adds watches for folders that are not watched yet."""
+        for path in set(paths) - set(self._watched.values()):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd >= 0:
+                self._watched[wd] = path
+
+    def _drain(self):
+        """Reads pending events and returns True if any of them concerns a folder."""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_IGNORED:
+                    self._watched.pop(wd, None)  # The folder is gone; watch it again if it comes back
+                relevant |= bool(mask & (IN_ISDIR | IN_DELETE_SELF | IN_MOVE_SELF))
+
+    def wait(self, timeout, debounce):
+        """
+        Blocks until a folder changes and no further events arrive for
+        `debounce` seconds. Returns False if nothing changed within `timeout`.
+        """
+        deadline = time.monotonic() + timeout
+        changed = False
+        while True:
+            remaining = (debounce if changed else deadline - time.monotonic())
+            if remaining <= 0:
+                return changed
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return changed
+            changed |= self._drain()
+
+    def close(self):
+        os.close(self._fd)
+        self._watched.clear()
+
+
+class PollingTrigger:
+    """Fallback trigger that simply rescans every `interval` seconds."""
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._next_poll = time.monotonic() + interval
+
+    def watch(self, paths):
+        pass
+
+    def wait(self, timeout, debounce):
+        """Sleeps until the next poll is due, or for `timeout` seconds if sooner."""
+        time.sleep(max(0, min(timeout, self._next_poll - time.monotonic())))
+        if time.monotonic() < self._next_poll:
+            return False
+        self._next_poll = time.monotonic() + self.interval
+        return True
+
+    def close(self):
+        pass
+
+
+class _Enricher(threading.Thread):
+    """Background worker that fetches TMDb details for newly added movies."""
+
+    def __init__(self):
+        super().__init__(name="poparch-enricher", daemon=True)
+        self.queue = queue.Queue()
+        self.pending = 0  # Movies queued or in progress, not yet written
+        self._lock = threading.Lock()
+
+    def enqueue(self, movies):
+        with self._lock:
+            self.pending += len(movies)
+        self.queue.put(list(movies))
+
+    def run(self):
+        from . import core
+        while (batch := self.queue.get()) is not None:
+            while not self.queue.empty():  # Fold queued batches into one lookup round
+                more = self.queue.get()
+                if more is None:
+                    self.queue.put(None)
+                    break
+                batch.extend(more)
+            movies = [{'title': title, 'year': year} for title, year in batch]
+            results = [(m['title'], m['year'], details) for m, details in core.fetch_many_movie_details(movies, ENRICH_WORKERS)]
+            written = database.update_movies_details_bulk(results)
+            with self._lock:
+                self.pending -= len(batch)
+            app_logger.log_info(f"Watch mode enriched {sum(written)} of {len(results)} new movies.",
+                                operation='watch_enrich', updated=sum(written), total=len(results))
+
+    def stop(self, timeout=ENRICH_STOP_TIMEOUT):
+        """
+        Lets queued enrichment finish for up to `timeout` seconds. Returns the
+        number of movies left without details, which is also logged.
+        """
+        self.queue.put(None)
+        if self.is_alive():
+            self.join(timeout)
+        with self._lock:
+            skipped = self.pending
+        if skipped:
+            app_logger.log_error(f"Watch mode stopped before enriching {skipped} new movies; run `poparch update` to fetch them.",
+                                 operation='watch_enrich', skipped=skipped)
+        return skipped
+
+
+class LibraryWatcher:
+    """
+    Keeps the archive in sync with a library folder.
+
+    Each sync is an incremental scan (only changed folders are listed, see
+    scanner.scan_library), diffed against the previous one. Movie folders
+    that appeared are added and ones that disappeared are removed in one
+    transaction. Only movies seen on disk during this session are ever
+    removed, so titles added by other means are left alone.
+
+    Removals are guarded so that an unmounted or emptied library cannot wipe
+    the archive: a scan that finds nothing after movies were seen is
+    refused, more than `max_removals` vanished folders in one sync are
+    reported but not removed, and movies that are watched or rated are never
+    deleted (see database.apply_library_changes).
+    """
+
+    def __init__(self, root, depth=scanner.DEFAULT_DEPTH, workers=scanner.DEFAULT_SCAN_WORKERS,
+                 trigger=None, enrich=True, on_change=None, on_error=None, max_removals=MAX_REMOVALS_PER_SYNC):
+        self.root = os.path.abspath(root)
+        self.depth = depth
+        self.workers = workers
+        self.trigger = trigger
+        self.on_change = on_change
+        self.on_error = on_error
+        self.max_removals = max_removals
+        self.known = set()
+        self.enricher = _Enricher() if enrich and config_manager.get_api_key() else None
+
+    def _refuse(self, message):
+        app_logger.log_error(message, operation='watch_sync')
+        if self.on_error:
+            self.on_error(message)
+
+    def sync(self):
+        """
+        Rescans the library and applies the difference. Returns (inserted, removed_count).
+        Raises OSError if the library root is missing or unreadable.
+        """
+        if not os.path.isdir(self.root):
+            raise OSError(f"Library folder '{self.root}' does not exist or is not mounted.")
+        result = scanner.scan_library(self.root, depth=self.depth, workers=self.workers, incremental=True)
+        current = set(result.movies)
+        if self.known and not current:
+            self._refuse(f"Scan of '{self.root}' found no movies; skipping sync in case the library is not mounted.")
+            return [], 0
+
+        vanished = self.known - current
+        if len(vanished) > self.max_removals:
+            self._refuse(f"{len(vanished)} movie folders vanished from '{self.root}' at once; not removing them from the archive.")
+            current |= vanished  # Still known, so the next sync checks them again
+            vanished = set()
+
+        inserted, removed_count = database.apply_library_changes(sorted(current - self.known), sorted(vanished))
+        self.known = current
+        if inserted or removed_count:
+            app_logger.log_info(f"Watch mode synced '{self.root}': {len(inserted)} added, {removed_count} removed.",
+                                operation='watch_sync', added=len(inserted), removed=removed_count)
+            if self.enricher and inserted:
+                self.enricher.enqueue(inserted)
+            if self.on_change:
+                self.on_change(inserted, removed_count)
+        return inserted, removed_count
+
+    def _safe_sync(self):
+        """Syncs, reporting a vanished or unreadable library instead of stopping the watcher."""
+        try:
+            self.sync()
+        except OSError as e:
+            self._refuse(f"Watch mode could not scan '{self.root}': {e}")
+
+    def _watched_folders(self):
+        """The folders a scan lists, i.e. the ones where movie folders can appear."""
+        return database.get_scan_manifest(self.root).keys()
+
+    def run(self, stop_event=None, debounce=DEFAULT_DEBOUNCE):
+        """Syncs once, then again after every debounced change until `stop_event` is set."""
+        if self.trigger is None:
+            try:
+                self.trigger = InotifyTrigger()
+            except (OSError, AttributeError):
+                self.trigger = PollingTrigger()
+        if self.enricher:
+            self.enricher.start()
+        stop_event = stop_event or threading.Event()
+        try:
+            self._safe_sync()
+            while not stop_event.is_set():
+                self.trigger.watch(self._watched_folders())
+                if self.trigger.wait(timeout=1.0, debounce=debounce):
+                    self._safe_sync()
+        finally:
+            self.trigger.close()
+            if self.enricher:
+                skipped = self.enricher.stop()
+                if skipped and self.on_error:
+                    self.on_error(f"{skipped} new movies were not enriched; run `poparch update` to fetch them.")
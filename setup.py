@@ -14,10 +14,15 @@ setup(
         'thefuzz',
         'fuzzywuzzy',
         'python-Levenshtein',
-        'pandas',
+        'rapidfuzz',
+        'numpy',
         'openpyxl',
         'click-completion',
     ],
+    extras_require={
+        # Parquet and Feather export
+        'columnar': ['pyarrow'],
+    },
     entry_points={
         'console_scripts': [
             'poparch = popcorn_archives.cli:cli',
@@ -0,0 +1,21 @@
+import pytest
+from popcorn_archives import config, database, logger
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    """Points the real connection manager at a fresh on-disk database."""
+    monkeypatch.setattr(database, 'DB_FILE', str(tmp_path / 'movies.db'))
+    database.close_db_connection()
+    database.init_db()
+    yield database.get_db_connection()
+    database.close_db_connection()
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    """Enables logging into a temporary file and stops the writer afterwards."""
+    monkeypatch.setattr(logger, 'APP_DIR', str(tmp_path))
+    monkeypatch.setattr(logger, 'LOG_FILE', str(tmp_path / 'poparch.log'))
+    monkeypatch.setattr(config, 'is_logging_enabled', lambda: True)
+    logger.shutdown_logger()
+    yield tmp_path / 'poparch.log'
+    logger.shutdown_logger()
@@ -221,6 +221,27 @@ def test_update_command_default_workflow(mocker):
     mock_fetch.assert_called_once_with('Movie To Update', 2023)
     mock_db_update.assert_called_once()
 
+def test_update_command_async_mode(mocker):
+    """Tests that `update --async` hands the movies to the asyncio pipeline."""
+    mocker.patch('popcorn_archives.cli.config_manager.get_api_key', return_value='a_fake_api_key')
+    mocker.patch('popcorn_archives.database.get_movies_missing_details', return_value=[
+        {'title': 'Movie To Update', 'year': 2023}
+    ])
+
+    def fake_pipeline(movies, on_result=None, **kwargs):
+        for movie in movies:
+            on_result(movie, None)
+        return len(movies), []
+
+    mock_pipeline = mocker.patch('popcorn_archives.pipeline.run_enrichment_pipeline', side_effect=fake_pipeline)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['update', '--async', '--workers', '4'])
+
+    assert result.exit_code == 0
+    assert "Successfully updated: 1" in result.output
+    assert mock_pipeline.call_args.kwargs['search_concurrency'] == 4
+
 def test_update_cleanup_mode_standalone(mocker):
     """Tests that `update --cleanup` alone only performs cleanup."""
     # Mock the database function to simulate finding and merging 2 duplicates
@@ -319,4 +340,61 @@ def test_search_command_interactive_genre(mocker):
     mock_search_db.assert_called_once_with(
         title=None, actor=None, director=None, keyword=None, collection=None,
         year=None, decade=None, writer=None, dop=None, company=None, genre='Action'
-    )
\ No newline at end of file
+    )
+
+def test_cli_startup_defers_heavy_imports():
+    """Guards startup time: importing the CLI must not pull in the heavy optional modules."""
+    import subprocess
+    import sys
+    heavy = ['pandas', 'requests', 'inquirer', 'tqdm', 'click_completion', 'thefuzz', 'openpyxl', 'rapidfuzz', 'pyarrow']
+    script = f"import sys, popcorn_archives.cli; print(*[m for m in {heavy!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout.split()
+
+    assert output == []
+
+def test_update_auto_cleanup_dry_run_writes_report(mocker, tmp_path):
+    """Tests that `update --auto --dry-run --report` prints and saves the plan."""
+    import json
+    plan = [{'keep': {'id': 1, 'title': 'Alien', 'year': 1979}, 'remove': [{'id': 2, 'title': 'Alien.', 'year': 1979}], 'fields': {}}]
+    mock_merge = mocker.patch('popcorn_archives.database.auto_merge_duplicates', return_value=plan)
+    report = tmp_path / 'plan.json'
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['update', '--auto', '--policy', 'rating', '--dry-run', '--report', str(report)])
+
+    assert result.exit_code == 0
+    mock_merge.assert_called_once_with(policy='rating', dry_run=True)
+    assert "Keep Alien (1979) <- Alien. (1979)" in result.output
+    assert "1 duplicate movies in 1 groups would be merged" in result.output
+    assert json.loads(report.read_text())['groups'] == plan
+
+def test_import_csv_streams_into_bulk_insert(mocker, tmp_path):
+    """Tests that `import` feeds parsed CSV rows straight into the bulk insert."""
+    csv_file = tmp_path / "movies.csv"
+    csv_file.write_text("year\tname\n1999\tThe Matrix 1999\n1994\tPulp Fiction (1994)\n", encoding='utf-8')
+    received = []
+    mocker.patch('popcorn_archives.database.add_movies_bulk',
+                 side_effect=lambda movies: (received.extend(movies), (len(received), 0))[1])
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ['import', str(csv_file), '--column', '2', '--delimiter', 'tab'])
+
+    assert result.exit_code == 0
+    assert received == [("The Matrix", 1999), ("Pulp Fiction", 1994)]
+    assert "Added: 2 new movies." in result.output
+
+def test_letterboxd_import_only_existing_skips_watchlist(mocker, tmp_path):
+    """Tests that choosing to only update existing movies leaves the watchlist alone too."""
+    zip_path = tmp_path / 'letterboxd.zip'
+    zip_path.write_bytes(b'')
+    existing = {'title': "Heat", 'year': 1995, 'rating': None, 'watched': True, 'original_title': "Heat"}
+    new = {'title': "Alien", 'year': 1979, 'rating': 8, 'watched': True}
+    mocker.patch('popcorn_archives.core.process_letterboxd_zip', return_value=([existing], [new], ["Stalker"], None))
+    mocker.patch('inquirer.prompt', return_value={'choice': 'Only update existing movies'})
+    mock_apply = mocker.patch('popcorn_archives.database.apply_letterboxd_import', return_value=(0, 1, 0))
+
+    result = CliRunner().invoke(cli, ['import', '--letterboxd', str(zip_path)])
+
+    assert result.exit_code == 0
+    assert "Alien (1979), Stalker" in result.output
+    mock_apply.assert_called_once_with([existing], [])
@@ -0,0 +1,58 @@
+import os
+import configparser
+import pytest
+from popcorn_archives import config
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Points the config module at an empty directory with no overrides."""
+    monkeypatch.setattr(config, 'APP_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'CONFIG_FILE', str(tmp_path / 'config.ini'))
+    for _, _, env_var, _, _ in config._FIELDS.values():
+        monkeypatch.delenv(env_var, raising=False)
+    config.invalidate_settings()
+    yield tmp_path / 'config.ini'
+    config.invalidate_settings()
+
+def test_defaults_without_config_file(config_file):
+    """Tests that every setting has a default when config.ini does not exist."""
+    assert config.get_settings() == config.Settings(None, False, 8, 40, 30, 'text')
+    assert config.get_api_key() is None
+    assert config.is_logging_enabled() is False
+
+def test_settings_are_read_once_until_the_file_changes(config_file, monkeypatch, mocker):
+    """Tests that repeated lookups reuse the parsed file and a new mtime triggers a reload."""
+    config.save_api_key("first")
+    read = mocker.spy(configparser.ConfigParser, 'read')
+    for _ in range(1000):
+        assert config.get_api_key() == "first"
+        config.is_logging_enabled()
+    assert read.call_count == 1
+
+    # Rewrite the file behind the cache's back with a different mtime.
+    config_file.write_text("[TMDB]\nAPI_KEY = second\n")
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert config.get_api_key() == "first"  # Within the stat throttle window
+    monkeypatch.setattr(config, 'RELOAD_CHECK_INTERVAL', 0)
+    assert config.get_api_key() == "second"
+    assert read.call_count == 2
+
+def test_saving_keeps_other_options(config_file):
+    """Tests that saves update the cache and no longer drop unrelated sections."""
+    config.save_logging_status(True)
+    config.save_api_key("key")
+    config.save_setting('workers', 12)
+
+    assert config.get_settings() == config.Settings("key", True, 12, 40, 30, 'text')
+    with pytest.raises(ValueError):
+        config.save_setting('rate_limit', 0)
+
+def test_environment_overrides_and_bad_values(config_file, monkeypatch):
+    """Tests that POPARCH_* variables win over the file and malformed values fall back to defaults."""
+    config_file.write_text("[TMDB]\nAPI_KEY = file\n[SETTINGS]\nWORKERS = many\nRATE_LIMIT = 20\n")
+    monkeypatch.setenv('POPARCH_API_KEY', "env")
+    monkeypatch.setenv('POPARCH_LOGGING', "yes")
+    monkeypatch.setenv('POPARCH_CACHE_TTL_DAYS', "0.5")
+
+    assert config.get_settings() == config.Settings("env", True, 8, 20, 0.5, 'text')
@@ -1,7 +1,7 @@
 import pytest
+import threading
 from unittest.mock import MagicMock
 from popcorn_archives import core
-import pandas as pd
 from thefuzz import fuzz
 
 
@@ -34,7 +34,32 @@ def test_year_outside_range_is_invalid():
     assert result == (None, None)
 
 
-def test_scan_movie_folders(tmp_path):
+@pytest.mark.parametrize("name, expected", [
+    ("Heat.1995.1080p.BluRay.x264-GROUP", ("Heat", 1995)),
+    ("The_Matrix_1999_720p", ("The Matrix", 1999)),
+    ("Blade.Runner.2049.2017.2160p.UHD.BluRay.REMUX", ("Blade Runner 2049", 2017)),
+    ("Dr. Strangelove 1964 1080p WEB-DL", ("Dr. Strangelove", 1964)),
+    ("Alien (1979) Directors Cut [1080p]", ("Alien", 1979)),
+    ("Some.Movie.2012.Part.2", (None, None)),  # Text after the year that is not a release tag
+])
+def test_parse_release_style_names(name, expected):
+    """Tests dot/underscore-separated release names with quality tags."""
+    assert core.parse_movie_title(name) == expected
+
+def test_parse_many_matches_single_parses_and_uses_the_cache():
+    """Tests that bulk parsing agrees with parse_movie_title and serves repeated names from the cache."""
+    names = [f"Movie Number {i} ({1900 + i % 120})" for i in range(500)]
+    names += [f"Release.Name.{i}.{1900 + i % 120}.1080p.BluRay.x264-GRP" for i in range(500)]
+    names += ["Bad Movie Folder"]
+    core.parse_movie_title.cache_clear()
+
+    parsed = core.parse_many(names + names)
+
+    assert core.parse_movie_title.cache_info().hits == len(names)
+    assert parsed == [core.parse_movie_title(name) for name in names + names]
+    assert (parsed[0], parsed[999], parsed[1000]) == (("Movie Number 0", 1900), ("Release Name 499", 1919), (None, None))
+
+def test_scan_movie_folders(tmp_path, file_db):
     """Tests scanning a directory using a temporary file system."""
     movies_dir = tmp_path / "movies"
     movies_dir.mkdir()
@@ -50,8 +75,20 @@ def test_scan_movie_folders(tmp_path):
     assert invalid == ["Bad Movie Folder"]
 
 
-def test_fetch_movie_details_success(mocker):
+@pytest.fixture
+def temp_cache(tmp_path, monkeypatch):
+    """Points the TMDb response cache at a throwaway database."""
+    from popcorn_archives import cache
+    monkeypatch.setattr(cache, 'CACHE_FILE', str(tmp_path / 'http_cache.db'))
+    cache.configure()
+    yield cache
+    cache.configure()
+    cache.close_cache_connection()
+
+
+def test_fetch_movie_details_success(mocker, temp_cache):
     """Tests a successful API call with a complete mock data payload."""
+    temp_cache.configure(enabled=False)
     
     # Mock the config manager
     mocker.patch('popcorn_archives.core.config_manager.get_api_key', return_value='a_fake_api_key')
@@ -105,7 +142,7 @@ def test_fetch_movie_details_success(mocker):
     
     # Setup the mock to return same response for both API calls
     mock_response.json.side_effect = [search_json, details_json] * 2  # Times 2 for both test cases
-    mocker.patch('requests.get', return_value=mock_response)
+    mocker.patch('requests.Session.get', return_value=mock_response)
     
     # Test 1: Exact title match
     details = core.fetch_movie_details_from_api("Pulp Fiction", 1994)
@@ -165,21 +202,30 @@ def test_read_csv_file_no_header(tmp_path):
     assert len(result) == 2
     assert set(result) == {("Movie One", 2022), ("Movie Two", 2023)}
 
+def test_iter_csv_file_streams_selected_column(tmp_path):
+    """Tests delimiter sniffing, column selection by name and byte progress."""
+    csv_file = tmp_path / "catalog.csv"
+    csv_file.write_text("id;Film;notes\n1;Movie One (2022);x\n2;Invalid Movie;y\n3;Movie Two 2023;z\n4\n", encoding='utf-8')
+    progress = []
+
+    rows = core.iter_csv_file(csv_file, column='film', progress=progress.append)
+
+    assert next(rows) == ("Movie One", 2022)  # Rows are produced lazily
+    assert list(rows) == [("Movie Two", 2023)]
+    assert sum(progress) == csv_file.stat().st_size
+    with pytest.raises(ValueError):
+        list(core.iter_csv_file(csv_file, column='director'))
+
 def test_read_excel_file(tmp_path):
     """Tests reading an Excel file using a temporary .xlsx file."""
-    # Setup: Create a temporary Excel file using pandas
+    from openpyxl import Workbook
+    # Setup: Create a temporary Excel file; the column header can be anything
     excel_file = tmp_path / "movies.xlsx"
-    # Create some data in a pandas DataFrame
-    data = {
-        "Movie Title Column": [ # The column header can be anything
-            "Excel Movie 1 (2024)",
-            "Another Excel Movie 2025",
-            "Invalid Excel Entry"
-        ]
-    }
-    df = pd.DataFrame(data)
-    # Write the DataFrame to an Excel file
-    df.to_excel(excel_file, index=False, engine='openpyxl')
+    workbook = Workbook()
+    sheet = workbook.active
+    for value in ["Movie Title Column", "Excel Movie 1 (2024)", "Another Excel Movie 2025", "Invalid Excel Entry", 1999]:
+        sheet.append([value])
+    workbook.save(excel_file)
 
     # Execution
     result = core.read_excel_file(excel_file)
@@ -187,4 +233,161 @@ def test_read_excel_file(tmp_path):
     # Assertion
     assert isinstance(result, list)
     assert len(result) == 2
-    assert set(result) == {("Excel Movie 1", 2024), ("Another Excel Movie", 2025)}
\ No newline at end of file
+    assert set(result) == {("Excel Movie 1", 2024), ("Another Excel Movie", 2025)}
+
+def test_iter_excel_file_streams_named_column(tmp_path):
+    """Tests that workbook rows are streamed from a column chosen by header name."""
+    from openpyxl import Workbook
+    excel_file = tmp_path / "catalog.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Shelf", "Film"])
+    sheet.append(["A1", "Heat 1995"])
+    sheet.append(["A2"])
+    sheet.append(["A3", "Alien (1979)"])
+    workbook.save(excel_file)
+    progress = []
+
+    rows = core.iter_excel_file(excel_file, column="film", progress=progress.append)
+
+    assert list(rows) == [("Heat", 1995), ("Alien", 1979)]
+    assert sum(progress) == 3
+    assert core.count_excel_rows(excel_file) == 4
+
+def test_fetch_many_movie_details_runs_all_lookups(mocker):
+    """Tests that the worker pool looks up every movie exactly once."""
+    mock_fetch = mocker.patch('popcorn_archives.core.fetch_movie_details_from_api',
+                              side_effect=lambda title, year: {"plot": f"{title} plot"})
+    movies = [{'title': f"Movie {i}", 'year': 2000 + i} for i in range(20)]
+
+    results = list(core.fetch_many_movie_details(movies, workers=4))
+
+    assert len(results) == 20
+    assert mock_fetch.call_count == 20
+    assert {movie['title'] for movie, _ in results} == {m['title'] for m in movies}
+    assert all(details['plot'] == f"{movie['title']} plot" for movie, details in results)
+
+def test_rate_limiter_allows_burst_then_waits(mocker):
+    """Tests that the token bucket only sleeps once its burst capacity is used up."""
+    mock_sleep = mocker.patch('popcorn_archives.core.time.sleep')
+    clock = iter([0.0] * 4 + [0.5])
+    mocker.patch('popcorn_archives.core.time.monotonic', side_effect=lambda: next(clock))
+
+    limiter = core.RateLimiter(rate=2)
+    limiter.acquire()
+    limiter.acquire()
+    mock_sleep.assert_not_called()
+
+    limiter.acquire()  # Bucket is empty: must wait for a refill.
+    mock_sleep.assert_called_once()
+
+def test_http_session_is_pooled_and_retries(mocker):
+    """Tests that all TMDb calls share one session that retries 429/5xx responses."""
+    mocker.patch.object(core, '_http_session', None)
+
+    session = core.get_http_session()
+    assert core.get_http_session() is session
+
+    adapter = session.get_adapter(core.BASE_URL)
+    assert adapter._pool_maxsize == core.HTTP_POOL_SIZE
+    assert 429 in adapter.max_retries.status_forcelist
+    assert adapter.max_retries.respect_retry_after_header
+
+    resized = core.configure_http_session(pool_size=32)
+    assert resized.get_adapter(core.BASE_URL)._pool_maxsize == 32
+
+def test_tmdb_responses_are_cached_and_revalidated(mocker, temp_cache):
+    """Tests that repeat lookups are served from disk and stale entries use ETags."""
+    mock_response = MagicMock(status_code=200, headers={'ETag': '"v1"'})
+    mock_response.json.return_value = {'results': []}
+    mock_get = mocker.patch('requests.Session.get', return_value=mock_response)
+
+    params = {'api_key': 'secret', 'query': 'The  Matrix', 'year': 1999}
+    assert core._tmdb_get("/search/movie", params) == {'results': []}
+    assert core._tmdb_get("/search/movie", {**params, 'query': 'the matrix'}) == {'results': []}
+    assert mock_get.call_count == 1  # Second call hit the cache.
+
+    # With --refresh-cache, the entry is revalidated and a 304 reuses it.
+    temp_cache.configure(refresh=True)
+    mock_get.return_value = MagicMock(status_code=304)
+    assert core._tmdb_get("/search/movie", params) == {'results': []}
+    assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+
+def test_prune_keeps_stale_entries_for_offline_use(mocker, temp_cache):
+    """Tests that pruning only enforces the size cap, so a stale entry is still served offline."""
+    import requests
+    temp_cache.put(temp_cache.make_key("/movie/1", {}), {'id': 1}, '"v1"')
+    temp_cache.put(temp_cache.make_key("/movie/2", {}), {'id': 2, 'plot': "x" * 100})
+    with temp_cache.get_cache_connection() as conn:
+        conn.execute("UPDATE responses SET stored_at = 0 WHERE key = ?", (temp_cache.make_key("/movie/1", {}),))
+
+    assert temp_cache.prune() == 0
+    mocker.patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError)
+    assert core._tmdb_get("/movie/1", {}) == {'id': 1}
+
+    with temp_cache.get_cache_connection() as conn:
+        newest_size = conn.execute("SELECT size FROM responses WHERE key = ?", (temp_cache.make_key("/movie/2", {}),)).fetchone()[0]
+    assert temp_cache.prune(max_bytes=newest_size) == 1  # Over the cap, the oldest entry goes first
+    assert temp_cache.get(temp_cache.make_key("/movie/2", {})) is not None
+
+def test_process_letterboxd_zip_uses_one_index(mocker, tmp_path):
+    """Tests that Letterboxd rows are matched against an archive index built once."""
+    import time
+    import zipfile
+    archive = {(f"movie {i}", 2000 + i % 20): {'title': f"Movie: {i}"} for i in range(40000)}
+    mock_index = mocker.patch('popcorn_archives.database.build_normalized_title_index', return_value=archive)
+    rows = ["Date,Name,Year,Letterboxd URI,Rating"]
+    rows += [f"2024-01-01,Movie {i},{2000 + i % 20},uri,{1 + i % 5}" for i in range(0, 10000, 2)]  # 5k ratings
+    zip_path = tmp_path / 'letterboxd.zip'
+    with zipfile.ZipFile(zip_path, 'w') as zf:
+        zf.writestr('ratings.csv', "\n".join(rows) + "\n" + "2024-01-01,Brand New,2024,uri,4.5\n")
+
+    start = time.perf_counter()
+    to_update, to_add, watchlist, error = core.process_letterboxd_zip(str(zip_path))
+    elapsed = time.perf_counter() - start
+
+    assert error is None
+    mock_index.assert_called_once()
+    assert len(to_update) == 5000
+    assert to_update[0] == {'title': "Movie 0", 'year': 2000, 'rating': 2, 'watched': True, 'original_title': "Movie: 0"}
+    assert to_add == [{'title': "Brand New", 'year': 2024, 'rating': 9, 'watched': True}]
+    assert watchlist == []
+    assert elapsed < 1.0
+
+def test_process_letterboxd_zip_merges_all_export_files(mocker, tmp_path):
+    """Tests that watched, diary, ratings and watchlist files are combined per film."""
+    import zipfile
+    mocker.patch('popcorn_archives.database.build_normalized_title_index',
+                 return_value={("heat", 1995): {'title': "Heat"}, ("solaris", 1972): {'title': "Solaris"}})
+    zip_path = tmp_path / 'letterboxd.zip'
+    with zipfile.ZipFile(zip_path, 'w') as zf:
+        zf.writestr('watched.csv', "\ufeffDate,Name,Year,Letterboxd URI\n2024-01-01,Heat,1995,uri\n2024-01-02,Alien,1979,uri\n")
+        zf.writestr('diary.csv', "Date,Name,Year,Letterboxd URI,Rating,Rewatch,Tags,Watched Date\n"
+                                 "2024-01-03,Alien,1979,uri,3,,,2024-01-03\n2024-02-03,Alien,1979,uri,3.5,Yes,,2024-02-03\n"
+                                 "2024-02-04,Ran,1985,uri,4,,,2024-02-04\n")
+        zf.writestr('ratings.csv', "Date,Name,Year,Letterboxd URI,Rating\n2024-03-01,Ran,1985,uri,5\n2024-03-01,Bad Year,,uri,5\n")
+        zf.writestr('watchlist.csv', "Date,Name,Year,Letterboxd URI\n2024-01-01,Alien,1979,uri\n"
+                                     "2024-01-01,Solaris,1972,uri\n2024-01-01,Stalker,1979,uri\n")
+
+    to_update, to_add, watchlist, error = core.process_letterboxd_zip(str(zip_path))
+
+    assert error is None
+    assert to_update == [{'title': "Heat", 'year': 1995, 'rating': None, 'watched': True, 'original_title': "Heat"}]
+    assert to_add == [
+        {'title': "Alien", 'year': 1979, 'rating': 7, 'watched': True},  # Latest diary rating
+        {'title': "Ran", 'year': 1985, 'rating': 10, 'watched': True},   # ratings.csv wins over the diary
+    ]
+    assert watchlist == ["Stalker"]  # Films watched or already archived are not added to the watchlist
+
+def test_cache_reuses_one_connection_per_thread(temp_cache):
+    """Tests that cache calls share a connection instead of reconnecting every time."""
+    conn = temp_cache.get_cache_connection()
+    temp_cache.put("movie/1?", {"id": 1})
+    assert temp_cache.get("movie/1?").payload == {"id": 1}
+    assert temp_cache.get_cache_connection() is conn
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(temp_cache.get_cache_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
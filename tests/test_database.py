@@ -39,7 +39,6 @@ def db_connection(monkeypatch):
     # --- Monkeypatch the database connection function ---
     # This is the key: we tell our app's code to use THIS connection
     # for the duration of the test, instead of creating its own.
-    monkeypatch = pytest.MonkeyPatch()
     monkeypatch.setattr(database, 'get_db_connection', lambda: conn)
 
     yield conn  # Provide the connection to the test function
@@ -106,4 +105,262 @@ def test_get_highest_rated_movie(db_connection):
     
     assert rating == 9
     # The result could be either of the two movies with a 9/10 rating
-    assert movie['title'] in ["Good Movie", "Great Movie"]
\ No newline at end of file
+    assert movie['title'] in ["Good Movie", "Great Movie"]
+
+def test_add_movies_bulk_counts(db_connection):
+    """Tests that bulk inserts report exact added and skipped counts."""
+    movies = [
+        ("bulk movie one", 2001),
+        ("Bulk Movie Two", 2002),
+        ("Test Movie", 2020),      # Already in the archive (from the fixture)
+        ("Bulk Movie One", 2001),  # Repeated within the same import
+        ("Bulk Movie Three", 2003),
+    ]
+    progress = []
+
+    added, skipped = database.add_movies_bulk(iter(movies), chunk_size=2, progress=progress.append)
+
+    assert (added, skipped) == (3, 2)
+    assert progress == [2, 2, 1]
+    count = db_connection.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+    assert count == 4
+    # Titles are stored in Title Case, like add_movie does.
+    assert database.get_movie_details("Bulk Movie One", 2001)['title'] == "Bulk Movie One"
+
+def test_init_db_skips_migration_when_schema_is_current(file_db):
+    """Tests that init_db only runs its migration once per schema version."""
+    assert file_db.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+
+    statements = []
+    file_db.set_trace_callback(statements.append)
+    database.init_db()
+    file_db.set_trace_callback(None)
+    assert statements == ["PRAGMA user_version"]
+
+def test_connection_is_reused_and_tuned(file_db):
+    """Tests that helpers share one WAL-mode connection per thread."""
+    import threading
+
+    assert database.get_db_connection() is file_db
+    assert file_db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert file_db.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert file_db.execute("PRAGMA temp_store").fetchone()[0] == 2   # MEMORY
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(database.get_db_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not file_db
+
+def test_transaction_commits_or_rolls_back(file_db):
+    """Tests that helper commits are deferred to an explicit transaction."""
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.add_movie("Rolled Back", 1999)
+            database.set_movie_watched_status("Rolled Back", 1999, True)
+            raise RuntimeError("abort")
+    assert database.get_movie_details("Rolled Back", 1999) is None
+
+    with database.transaction():
+        database.add_movie("Committed", 2000)
+        database.set_user_rating("Committed", 2000, 7)
+    assert database.get_movie_details("Committed", 2000)['user_rating'] == 7
+
+def test_fulltext_search_ranks_and_tracks_changes(file_db):
+    """Tests prefix matching, bm25 ranking and trigger-based index sync."""
+    database.add_movie("Heat", 1995)
+    database.add_movie("Oceans Eleven", 2001)
+    database.update_movie_details("Heat", 1995, {"plot": "A heist crew is hunted by a detective.", "director": "Michael Mann"})
+    database.update_movie_details("Oceans Eleven", 2001, {"plot": "Danny Ocean plans a Las Vegas casino heist.", "director": "Steven Soderbergh"})
+
+    # Prefix query across plot and people columns.
+    assert [m['title'] for m in database.search_movies_fulltext("heis soderb")] == ["Oceans Eleven"]
+    # Both plots match, but the title hit ranks first.
+    assert [m['title'] for m in database.search_movies_fulltext("heat heist")] == ["Heat"]
+    assert len(database.search_movies_fulltext("heist")) == 2
+
+    database.update_movie_details("Heat", 1995, {"plot": "Cops and robbers in Los Angeles."})
+    assert [m['title'] for m in database.search_movies_fulltext("heist")] == ["Oceans Eleven"]
+
+    database.delete_movie("Oceans Eleven", 2001)
+    assert database.search_movies_fulltext("heist") == []
+    # Punctuation and FTS operators in user input are treated as plain words.
+    assert database.search_movies_fulltext('"AND" OR*') == []
+
+def test_entity_tables_back_aggregates_and_filters(file_db):
+    """Tests that people and genres are normalized, counted and filtered by join."""
+    database.add_movie("Heat", 1995)
+    database.add_movie("Collateral", 2004)
+    database.add_movie("Thief", 1981)
+    database.update_movie_details("Heat", 1995, {"genre": "Crime, Drama", "director": "Michael Mann", "cast": "Al Pacino, Robert De Niro"})
+    database.update_movie_details("Collateral", 2004, {"genre": "Crime, Thriller", "director": "Michael Mann", "cast": "Tom Cruise"})
+    database.update_movie_details("Thief", 1981, {"genre": "Crime", "director": "N/A", "cast": "James Caan"})
+
+    assert database.get_top_items_from_column('genre', limit=2) == [("Crime", 3), ("Drama", 1)]
+    assert database.get_top_items_from_column('director', limit=3) == [("Michael Mann", 2)]  # 'N/A' is not a person
+    assert database.get_all_unique_genres() == ["Crime", "Drama", "Thriller"]
+
+    titles = lambda rows: sorted(r['title'] for r in rows)
+    assert titles(database.search_movies_advanced(director="mann")) == ["Collateral", "Heat"]
+    assert titles(database.search_movies_advanced(actor="De Niro", genre="crime")) == ["Heat"]
+    assert database.search_movies_advanced(genre="Crim") == []  # Genres match exactly
+    plan = [row[3] for row in file_db.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM movies WHERE " + database._entity_filter('director'), ('director', 'person', '%mann%'))]
+    assert "SEARCH movie_entities USING COVERING INDEX idx_movie_entities_role (role=? AND entity_id=?)" in plan
+
+    # Deleting a movie drops its links; existing rows are backfilled on migration.
+    database.delete_movie("Collateral", 2004)
+    file_db.execute("DROP TABLE movie_entities")
+    file_db.execute("DROP TABLE entities")
+    file_db.execute("PRAGMA user_version = 0")
+    file_db.commit()
+    database.init_db()
+    assert database.get_top_items_from_column('director') == [("Michael Mann", 1)]
+
+def _query_plans(conn, func, *args):
+    """Runs a database helper and returns the EXPLAIN QUERY PLAN of every query it issued."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        func(*args)
+    finally:
+        conn.set_trace_callback(None)
+
+    plans = []
+    for sql in statements:
+        if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            continue
+        if "?" in sql:
+            pytest.skip("This Python's sqlite3 trace callback does not expand bound parameters.")
+        plans.extend(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+    return plans
+
+@pytest.mark.parametrize("func, args, expected_index", [
+    (database.get_movie_details, ("heat", 1995), "idx_movies_title_lower"),
+    (database.set_user_rating, ("heat", 1995, 8), "idx_movies_title_lower"),
+    (database.get_movies_by_name_list, (["Heat (1995)", "Thief 1981"],), "idx_movies_title_lower"),
+    (database.get_movies_by_year, (1995,), "idx_movies_year"),
+    (database.get_oldest_movie, (), "idx_movies_year"),
+    (database.get_random_unwatched_movie, (), "idx_movies_watched"),
+    (database.get_highest_rated_movie, (), "idx_movies_user_rating"),
+])
+def test_lookups_use_indexes(file_db, func, args, expected_index):
+    """Tests via EXPLAIN QUERY PLAN that lookups hit an index instead of scanning."""
+    database.add_movie("Heat", 1995)
+    database.set_user_rating("Heat", 1995, 9)
+
+    plans = _query_plans(file_db, func, *args)
+
+    assert any(expected_index in plan for plan in plans), plans
+    assert not any(plan.startswith("SCAN movies") and "INDEX" not in plan for plan in plans), plans
+
+def test_cleanup_groups_duplicates_with_title_index(file_db):
+    """Tests that exact-duplicate detection walks the LOWER(title) index."""
+    plan = [row[3] for row in file_db.execute("EXPLAIN QUERY PLAN " + database._EXACT_DUPLICATES_SQL)]
+    assert plan == ["SCAN movies USING INDEX idx_movies_title_lower"]
+
+def test_auto_merge_duplicates(file_db):
+    """Tests that --auto merges whole clusters, keeps metadata and honours dry runs."""
+    for title in ("The Thing", "The Thing.", "The Thingg", "Heat"):
+        database.add_movie(title, 1982)
+    database.update_movie_details("The Thing.", 1982, {"genre": "Horror", "director": "John Carpenter"})
+    database.set_movie_watched_status("The Thingg", 1982, True)
+
+    plan = database.auto_merge_duplicates(policy='oldest', dry_run=True)
+    assert len(plan) == 1
+    assert plan[0]['keep']['title'] == "The Thing"
+    assert sorted(m['title'] for m in plan[0]['remove']) == ["The Thing.", "The Thingg"]
+    assert plan[0]['fields'] == {'watched': 1, 'genre': "Horror", 'director': "John Carpenter"}
+    assert database.get_total_movies_count() == 4  # Dry run leaves the archive alone
+
+    database.auto_merge_duplicates(policy='oldest', chunk_size=1)
+    kept = database.get_movie_details("The Thing", 1982)
+    assert database.get_total_movies_count() == 2
+    assert (kept['watched'], kept['genre'], kept['director']) == (1, "Horror", "John Carpenter")
+    assert database.get_top_items_from_column('director') == [("John Carpenter", 1)]
+    assert database.auto_merge_duplicates() == []
+
+def test_auto_merge_records_an_update_for_the_kept_row(file_db):
+    """Tests that a merge onto a pre-migration row (no timestamps) still lands in the change log."""
+    database.add_movie("Alien", 1979)
+    database.add_movie("Alien.", 1979)
+    database.update_movie_details("Alien.", 1979, {"genre": "Horror"})
+    file_db.execute("UPDATE movies SET created_at = NULL, updated_at = NULL WHERE title = 'Alien'")
+    file_db.commit()
+    since = database.get_change_seq()
+
+    plan = database.auto_merge_duplicates(policy='oldest')
+    assert plan[0]['fields'] == {'genre': "Horror"}
+    changes = file_db.execute("SELECT movie_id, op FROM movie_changes WHERE seq > ? ORDER BY seq", (since,)).fetchall()
+    assert [tuple(row) for row in changes] == [(plan[0]['remove'][0]['id'], 'delete'), (plan[0]['keep']['id'], 'update')]
+
+def test_normalized_title_index(file_db):
+    """Tests that the import index resolves platform-specific title variants."""
+    database.add_movie("Mission: Impossible", 1996)
+    database.add_movie("Heat", 1995)
+
+    index = database.build_normalized_title_index()
+
+    assert index[("mission impossible", 1996)]['title'] == "Mission: Impossible"
+    assert ("heat", 1996) not in index
+    assert database.find_movie_by_normalized_title("mission impossible", 1996)['title'] == "Mission: Impossible"
+
+def test_apply_letterboxd_import(file_db):
+    """Tests that a Letterboxd import is applied in one transaction, keeping existing ratings."""
+    database.add_movie("Heat", 1995)
+    database.set_user_rating("Heat", 1995, 8)
+
+    added, updated, watchlisted = database.apply_letterboxd_import(
+        [{'title': "heat", 'year': 1995, 'rating': None, 'original_title': "Heat"},
+         {'title': "the thing", 'year': 1982, 'rating': 9}],
+        ["stalker", "Stalker"]
+    )
+
+    assert (added, updated, watchlisted) == (1, 1, 1)
+    heat, thing = database.get_movie_details("Heat", 1995), database.get_movie_details("The Thing", 1982)
+    assert (heat['watched'], heat['user_rating']) == (1, 8)
+    assert (thing['title'], thing['watched'], thing['user_rating']) == ("The Thing", 1, 9)
+    assert database.get_watchlist() == ["Stalker"]
+
+def test_change_tracking_timestamps_and_log(file_db):
+    """Tests that triggers stamp movies and log one change per statement with a growing seq."""
+    database.add_movie("Heat", 1995)
+    database.add_movie("Thief", 1981)
+    start = database.get_change_seq()
+    heat = database.get_movie_details("Heat", 1995)
+    assert heat['created_at'] and heat['created_at'] == heat['updated_at']
+
+    file_db.execute("UPDATE movies SET updated_at = '2000-01-01 00:00:00.000' WHERE title = 'Heat'")
+    file_db.commit()
+    database.set_user_rating("Heat", 1995, 9)
+    database.delete_movie("Thief", 1981)
+
+    heat = database.get_movie_details("Heat", 1995)
+    assert heat['updated_at'] > '2000-01-01 00:00:00.000'
+    changes = file_db.execute("SELECT seq, op, title FROM movie_changes WHERE seq > ? ORDER BY seq", (start,)).fetchall()
+    assert [(c['op'], c['title']) for c in changes] == [("update", "Heat"), ("delete", "Thief")]
+    assert [c['seq'] for c in changes] == [start + 1, start + 2] == [3, 4]
+    assert database.get_change_seq_before('2999-01-01') == database.get_change_seq()
+
+def test_iter_change_chunks_reports_latest_change_per_movie(file_db):
+    """Tests that a delta reads only the change log and folds several changes into one row."""
+    database.add_movies_bulk([("Heat", 1995), ("Thief", 1981), ("Ran", 1985)])
+    synced = database.get_change_seq()
+    database.add_movie("Alien", 1979)
+    database.set_user_rating("Alien", 1979, 8)
+    database.set_movie_watched_status("Heat", 1995, True)
+    database.delete_movie("Thief", 1981)
+
+    rows = [row for chunk in database.iter_change_chunks(synced, database.get_change_seq(), ['title', 'year', 'watched', 'user_rating'])
+            for row in chunk]
+    assert [row[1:2] + row[3:] for row in rows] == [
+        ("insert", "Alien", 1979, 0, 8),
+        ("update", "Heat", 1995, 1, None),
+        ("delete", "Thief", 1981, None, None),
+    ]
+
+    plans = [row['detail'] for row in file_db.execute(
+        f"EXPLAIN QUERY PLAN {database._CHANGES_SQL.format(select='c.title')}", (synced, 99)
+    )]
+    assert any("movie_changes USING INTEGER PRIMARY KEY" in plan for plan in plans)
+    assert not any(plan.startswith("SCAN m") for plan in plans)
@@ -0,0 +1,58 @@
+import random
+from thefuzz import fuzz
+from popcorn_archives import dedup
+
+def _brute_force_pairs(movies, threshold):
+    """The original nested-loop comparison that find_similar_pairs replaces."""
+    pairs = []
+    for i in range(len(movies)):
+        for j in range(i + 1, len(movies)):
+            m1, m2 = movies[i], movies[j]
+            if m1['year'] == m2['year'] and fuzz.ratio(m1['title'].lower(), m2['title'].lower()) > threshold:
+                pairs.append([m1, m2])
+    return pairs
+
+def _random_archive(count, seed=7):
+    rng = random.Random(seed)
+    words = ["the", "dark", "knight", "returns", "star", "wars", "alien", "aliens", "heat", "night", "of", "living", "dead"]
+    movies = []
+    for movie_id in range(1, count + 1):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            title = title[:-1] if len(title) > 3 else title + "s"  # Near-duplicate spelling
+        movies.append({'id': movie_id, 'title': title.title(), 'year': rng.randint(1990, 1994)})
+    return movies
+
+def test_find_similar_pairs_matches_brute_force(monkeypatch):
+    """Tests that blocking and length pruning find exactly the pairs of the nested loop."""
+    monkeypatch.setattr(dedup, 'BLOCK_SIZE', 16)  # Exercise several blocks per year bucket
+    movies = _random_archive(400)
+
+    for threshold in (60, 85, 95):
+        assert dedup.find_similar_pairs(movies, threshold) == _brute_force_pairs(movies, threshold)
+
+def test_find_similar_pairs_uses_rounded_scores():
+    """Tests that scores are compared after rounding, like thefuzz's integer ratio."""
+    # fuzz.ratio("abcdefgh", "abcdefghi") is 94.1 -> 94; only thresholds below 94 match.
+    movies = [{'id': 1, 'title': "abcdefgh", 'year': 2000}, {'id': 2, 'title': "abcdefghi", 'year': 2000},
+              {'id': 3, 'title': "abcdefgh", 'year': 2001}]
+    assert dedup.find_similar_pairs(movies, 93) == [[movies[0], movies[1]]]
+    assert dedup.find_similar_pairs(movies, 94) == []
+
+def test_group_duplicates_and_plan_merge():
+    """Tests that chained pairs form one cluster and the merge keeps the policy's row with filled gaps."""
+    a = {'id': 1, 'title': "Alien", 'year': 1979, 'watched': 1, 'user_rating': None, 'director': None, 'runtime': 117}
+    b = {'id': 2, 'title': "Alien.", 'year': 1979, 'watched': 0, 'user_rating': 9, 'director': "Ridley Scott", 'runtime': 0}
+    c = {'id': 3, 'title': "Alien!", 'year': 1979, 'watched': 0, 'user_rating': 7, 'director': "N/A", 'runtime': None}
+    d = {'id': 4, 'title': "Heat", 'year': 1995, 'watched': 0, 'user_rating': None, 'director': None, 'runtime': None}
+    e = {'id': 5, 'title': "Heat", 'year': 1995, 'watched': 0, 'user_rating': None, 'director': None, 'runtime': None}
+
+    clusters = dedup.group_duplicates([[b, c], [d, e], [a, c]])
+    assert [[m['id'] for m in cluster] for cluster in clusters] == [[1, 2, 3], [4, 5]]
+
+    plan = dedup.plan_merge(clusters[0], 'rating')
+    assert plan['keep']['id'] == 2
+    assert [m['id'] for m in plan['remove']] == [3, 1]
+    assert plan['fields'] == {'watched': 1, 'runtime': 117}
+
+    assert dedup.plan_merge(clusters[0], 'oldest')['fields'] == {'director': "Ridley Scott", 'user_rating': 9}
@@ -0,0 +1,89 @@
+import csv
+import gzip
+import json
+import tracemalloc
+import pytest
+from popcorn_archives import database, exporter
+
+@pytest.fixture
+def archive(file_db):
+    database.add_movie("Heat", 1995)
+    database.add_movie(' "Alien" ', 1979)
+    database.update_movie_details("Heat", 1995, {"director": "Michael Mann", "runtime": 170})
+    database.set_movie_watched_status("Heat", 1995, True)
+    database.set_user_rating("Heat", 1995, 9)
+    return database
+
+def test_resolve_format():
+    assert exporter.resolve_format("backup") == ("backup.csv", 'csv')
+    assert exporter.resolve_format("movies.CSV.gz") == ("movies.CSV.gz", 'csv.gz')
+    assert exporter.resolve_format("movies.ndjson") == ("movies.ndjson", 'jsonl')
+    assert exporter.resolve_format("movies.csv", 'parquet') == ("movies.csv.parquet", 'parquet')
+
+def test_csv_export_keeps_the_importable_name_column(archive, tmp_path):
+    """Tests the default CSV layout and the cleaned "Title Year" names."""
+    path, written = exporter.export_movies(str(tmp_path / 'backup'))
+
+    assert (path, written) == (str(tmp_path / 'backup.csv'), 2)
+    with open(path, newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [['name'], ['Heat 1995'], ['Alien 1979']]
+    assert not (tmp_path / 'backup.csv.part').exists()
+
+def test_gzip_jsonl_export_with_all_columns(archive, tmp_path):
+    """Tests that JSON lines carry every field, including watched and user_rating."""
+    path, written = exporter.export_movies(str(tmp_path / 'movies.jsonl.gz'), chunk_size=1)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert written == 2
+    assert rows[0]['title'] == "Heat" and rows[0]['director'] == "Michael Mann"
+    assert (rows[0]['watched'], rows[0]['user_rating'], rows[0]['runtime']) == (1, 9, 170)
+    assert set(rows[1]) == set(database.get_movie_columns())
+
+def test_column_selection_and_unknown_columns(archive, tmp_path):
+    path, _ = exporter.export_movies(str(tmp_path / 'm.csv.gz'), columns=['name', 'user_rating', 'name'])
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        assert list(csv.reader(f)) == [['name', 'user_rating'], ['Heat 1995', '9'], ['Alien 1979', '']]
+
+    with pytest.raises(ValueError):
+        exporter.export_movies(str(tmp_path / 'bad.csv'), columns=['title', 'budgetz'])
+    assert not list(tmp_path.glob('bad.csv*'))
+
+def test_parquet_export(archive, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path, _ = exporter.export_movies(str(tmp_path / 'movies.parquet'), columns=['title', 'year', 'user_rating'], chunk_size=1)
+
+    table = pq.read_table(path)
+    assert table.to_pydict() == {'title': ["Heat", ' "Alien" '], 'year': [1995, 1979], 'user_rating': [9, None]}
+
+def test_export_memory_stays_flat(archive, tmp_path):
+    """Tests that memory use depends on the chunk size, not the archive size."""
+    database.add_movies_bulk([(f"Movie {i} " + "x" * 200, 1900 + i % 120) for i in range(20000)])
+
+    tracemalloc.start()
+    _, written = exporter.export_movies(str(tmp_path / 'big.jsonl'), columns=['all'], chunk_size=200)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert written == 20002
+    assert peak < 5 * 1024 * 1024  # The rows alone are well over 5 MB
+
+def test_incremental_export_emits_changes_and_tombstones(archive, tmp_path):
+    """Tests that --since exports only what changed after the last sync, including deletes."""
+    synced = database.get_change_seq()
+    database.add_movie("Ran", 1985)
+    database.set_user_rating("Heat", 1995, 10)
+    database.delete_movie(' "Alien" ', 1979)
+
+    path, written, last_seq = exporter.export_changes(str(tmp_path / 'delta.jsonl'), synced, columns=['title', 'year', 'user_rating'])
+
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert written == 3 and last_seq == database.get_change_seq()
+    assert [(r['op'], r['title'], r['user_rating']) for r in rows] == [
+        ("insert", "Ran", None), ("update", "Heat", 10), ("delete", ' "Alien" ', None)
+    ]
+    assert [r['seq'] for r in rows] == sorted(r['seq'] for r in rows) and rows[0]['changed_at']
+
+    _, written, _ = exporter.export_changes(str(tmp_path / 'empty.csv'), last_seq)
+    assert written == 0
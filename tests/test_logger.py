@@ -0,0 +1,69 @@
+import gzip
+import json
+import threading
+import logging.handlers
+import pytest
+from popcorn_archives import config, logger
+
+def _use_format(monkeypatch, log_format):
+    settings = config.get_settings()._replace(log_format=log_format)
+    monkeypatch.setattr(config, 'get_settings', lambda: settings)
+
+def test_records_are_written_by_a_background_thread(log_file, monkeypatch, mocker):
+    """Tests that the calling thread only enqueues and the listener writes the text line."""
+    _use_format(monkeypatch, 'text')
+    writers = []
+    original_emit = logging.handlers.RotatingFileHandler.emit
+    def spy_emit(handler, record):
+        writers.append(threading.current_thread())
+        original_emit(handler, record)
+    mocker.patch('logging.handlers.RotatingFileHandler.emit', spy_emit)
+
+    logger.log_info("Imported movies.", added=3, skipped=1)
+    logger.shutdown_logger()
+
+    assert writers and threading.current_thread() not in writers
+    assert log_file.read_text().rstrip().endswith("- INFO - Imported movies. | added=3 skipped=1")
+
+def test_json_lines_records_carry_fields(log_file, monkeypatch):
+    """Tests that JSON-lines records include the level, message and structured fields."""
+    _use_format(monkeypatch, 'json')
+    logger.log_error("Update failed.", failed=2, duration=1.5)
+    logger.shutdown_logger()
+
+    entry = json.loads(log_file.read_text())
+    assert (entry['level'], entry['message'], entry['failed'], entry['duration']) == ("ERROR", "Update failed.", 2, 1.5)
+
+def test_rotated_segments_are_compressed(log_file, monkeypatch):
+    """Tests that the log rotates by size into gzip segments and clear_logs removes them."""
+    _use_format(monkeypatch, 'text')
+    monkeypatch.setattr(logger, 'LOG_MAX_BYTES', 2000)
+    for i in range(100):
+        logger.log_info(f"Record {i:03d} " + "x" * 40)
+    logger.shutdown_logger()
+
+    segment = log_file.parent / 'poparch.log.1.gz'
+    assert segment.exists()
+    with gzip.open(segment, 'rt', encoding='utf-8') as f:
+        rotated = f.read()
+    assert "Record" in rotated and rotated not in log_file.read_text()
+    assert not (log_file.parent / 'poparch.log.1').exists()
+
+    assert logger.clear_logs()
+    assert not segment.exists()
+
+def test_disabled_logging_starts_nothing(tmp_path, monkeypatch):
+    """Tests that no writer thread or file is created while logging is off."""
+    monkeypatch.setattr(logger, 'LOG_FILE', str(tmp_path / 'poparch.log'))
+    monkeypatch.setattr(config, 'is_logging_enabled', lambda: False)
+    logger.shutdown_logger()
+
+    logger.setup_logger()
+    logger.log_info("Ignored.")
+
+    assert logger._listener is None
+    assert not (tmp_path / 'poparch.log').exists()
+
+def test_summarize_items():
+    assert logger.summarize_items(["A", "B"]) == "A, B"
+    assert logger.summarize_items(range(25), limit=3) == "0, 1, 2 and 22 more"
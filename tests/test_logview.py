@@ -0,0 +1,70 @@
+import gzip
+import threading
+from datetime import datetime
+import pytest
+from click.testing import CliRunner
+from popcorn_archives import logview
+from popcorn_archives.cli import cli
+
+def _record(minute, level, message):
+    return f"2025-01-01 10:{minute:02d}:00 - {level} - {message}\n"
+
+@pytest.fixture
+def log_segments(log_file):
+    """A current log plus one compressed segment holding the older records."""
+    with gzip.open(f"{log_file}.1.gz", 'wt', encoding='utf-8') as f:
+        f.writelines(_record(minute, 'INFO', f"old {minute}") for minute in range(10))
+    log_file.write_text(''.join(
+        _record(minute, 'ERROR' if minute % 5 == 0 else 'INFO', f"new {minute}") for minute in range(10, 30)
+    ))
+    return log_file
+
+def test_tail_reads_backwards_across_segments(log_segments, monkeypatch):
+    """Tests that the tail spans block boundaries and continues into rotated segments."""
+    monkeypatch.setattr(logview, 'BLOCK_SIZE', 16)
+
+    assert logview.tail(3) == [_record(m, 'INFO', f"new {m}").rstrip() for m in (27, 28, 29)]
+    lines = logview.tail(22)
+    assert lines[0].endswith("INFO - old 8") and lines[2].endswith("ERROR - new 10")
+
+def test_tail_filters_by_level_and_time(log_segments):
+    """Tests level and time range filters, including JSON-lines records."""
+    with open(log_segments, 'a', encoding='utf-8') as f:
+        f.write('{"time": "2025-01-01 10:30:00", "level": "ERROR", "message": "json", "failed": 2}\n')
+
+    errors = logview.tail(10, level='ERROR')
+    assert [line.rsplit(' - ', 1)[1] for line in errors[:-1]] == ["new 10", "new 15", "new 20", "new 25"]
+    assert errors[-1].startswith('{"time"')
+
+    window = logview.tail(100, since=datetime(2025, 1, 1, 10, 8), until=datetime(2025, 1, 1, 10, 11))
+    assert [line.rsplit(' - ', 1)[1] for line in window] == ["old 8", "old 9", "new 10", "new 11"]
+
+def test_tail_stops_at_the_requested_lines(log_file):
+    """Tests that the cost follows the output: a huge sparse prefix is never read."""
+    with open(log_file, 'wb') as f:
+        f.truncate(256 * 1024 * 1024)
+        f.seek(0, 2)
+        f.write(b"\n" + "".join(_record(m, 'INFO', f"m{m}") for m in range(5)).encode())
+
+    assert [line[-2:] for line in logview.tail(2)] == ["m3", "m4"]
+
+def test_follow_yields_new_lines_and_survives_rotation(log_segments):
+    """Tests that follow starts at the end, sees appended lines and reopens a rotated log."""
+    stop = threading.Event()
+    lines = logview.follow(interval=0.01, stop_event=stop)
+
+    with open(log_segments, 'a', encoding='utf-8') as f:
+        f.write(_record(40, 'INFO', "appended"))
+    assert next(lines).endswith("appended")
+
+    log_segments.rename(log_segments.parent / 'rotated')
+    log_segments.write_text(_record(41, 'INFO', "after rotation"))
+    assert next(lines).endswith("after rotation")
+    stop.set()
+
+def test_log_view_command(log_segments):
+    runner = CliRunner()
+    result = runner.invoke(cli, ['log', 'view', '-n', '2', '--level', 'error'])
+
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [_record(20, 'ERROR', "new 20").rstrip(), _record(25, 'ERROR', "new 25").rstrip()]
@@ -0,0 +1,56 @@
+import threading
+from popcorn_archives import pipeline
+
+
+def test_pipeline_enriches_and_batches_writes(mocker):
+    """Tests that every movie flows through search, details and a batched DB write."""
+    mocker.patch('popcorn_archives.core.search_tmdb_movie', side_effect=lambda title, year:
+        {"Error": f"Movie '{title}' not found on TMDb."} if title == "Unknown" else {"id": year})
+    mocker.patch('popcorn_archives.core.fetch_tmdb_movie_details', side_effect=lambda movie_id, title, year:
+        {"title": title, "plot": f"Plot {movie_id}"})
+    mock_bulk = mocker.patch('popcorn_archives.database.update_movies_details_bulk',
+                             side_effect=lambda items: [True] * len(items))
+
+    movies = [{'title': f"Movie {i}", 'year': 2000 + i} for i in range(10)]
+    movies.append({'title': "Unknown", 'year': 1999})
+    results = []
+
+    updated, failed = pipeline.run_enrichment_pipeline(
+        movies, search_concurrency=3, details_concurrency=2, queue_size=2, batch_size=4,
+        on_result=lambda movie, error: results.append((movie['title'], error))
+    )
+
+    assert updated == 10
+    assert failed == [("Unknown (1999)", "Movie 'Unknown' not found on TMDb.")]
+    assert len(results) == 11
+    written = [item for call in mock_bulk.call_args_list for item in call.args[0]]
+    assert {title for title, _, details in written if "Error" not in details} == {m['title'] for m in movies[:10]}
+    assert all(len(call.args[0]) <= 4 for call in mock_bulk.call_args_list)
+
+
+def test_pipeline_writer_failure_stops_the_run(mocker):
+    """Tests that a failing writer ends the run with its error instead of leaving full queues blocked."""
+    mocker.patch('popcorn_archives.core.search_tmdb_movie', side_effect=lambda title, year: {"id": year})
+    mocker.patch('popcorn_archives.core.fetch_tmdb_movie_details', side_effect=lambda movie_id, title, year: {"title": title})
+    mock_bulk = mocker.patch('popcorn_archives.database.update_movies_details_bulk',
+                             side_effect=lambda items: [True] * len(items))
+
+    def stop(movie, error):
+        raise RuntimeError("stopped")
+
+    movies = [{'title': f"Movie {i}", 'year': 2000 + i} for i in range(500)]
+    errors = []
+
+    def run():
+        try:
+            pipeline.run_enrichment_pipeline(movies, queue_size=4, batch_size=2, on_result=stop)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive() and [str(e) for e in errors] == ["stopped"]
+    # The batch handed to the failed flush is not written again on the way out.
+    assert [len(call.args[0]) for call in mock_bulk.call_args_list] == [2]
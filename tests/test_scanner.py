@@ -0,0 +1,40 @@
+import os
+import pytest
+from popcorn_archives import database, scanner
+
+@pytest.fixture
+def library(tmp_path):
+    """A nested Movies/<Genre>/<Title (Year)> tree."""
+    root = tmp_path / "Movies"
+    for folder in ["Action/Heat (1995)", "Action/Heat (1995)/Subs", "Action/Ronin 1998",
+                   "Sci-Fi/Alien (1979)", "Sci-Fi/Empty Shelf", "Stalker (1979)"]:
+        (root / folder).mkdir(parents=True)
+    return root
+
+def test_scan_library_recurses_to_depth(library, file_db):
+    """Tests that genre folders are descended into and movie folders are not."""
+    flat = scanner.scan_library(library)
+    assert flat.movies == [("Stalker", 1979)]
+    assert flat.invalid_folders == ["Action", "Sci-Fi"]
+
+    nested = scanner.scan_library(library, depth=2, workers=4)
+    assert nested.movies == [("Heat", 1995), ("Ronin", 1998), ("Alien", 1979), ("Stalker", 1979)]
+    assert nested.invalid_folders == [os.path.join("Sci-Fi", "Empty Shelf")]
+    assert nested.visited == 3  # Root and the two genres; movie folders are never opened
+
+def test_incremental_scan_only_lists_changed_folders(library, file_db):
+    """Tests that the manifest lets a rescan skip unchanged folders."""
+    first = scanner.scan_library(library, depth=2, incremental=True)
+    assert first.listed == first.visited == 3
+
+    unchanged = scanner.scan_library(library, depth=2, incremental=True)
+    assert unchanged.movies == first.movies
+    assert unchanged.listed == 0
+
+    (library / "Action" / "Thief (1981)").mkdir()
+    changed = scanner.scan_library(library, depth=2, incremental=True)
+    assert ("Thief", 1981) in changed.movies
+    assert changed.listed == 1  # Only the Action folder was read again
+    assert set(database.get_scan_manifest(str(library))) == {
+        str(library), str(library / "Action"), str(library / "Sci-Fi")
+    }
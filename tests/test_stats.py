@@ -0,0 +1,62 @@
+import pytest
+from popcorn_archives import database, stats
+
+@pytest.fixture
+def archive(file_db):
+    """A small on-disk archive with details, ratings and watched flags."""
+    for title, year in [("Heat", 1995), ("Thief", 1981), ("Collateral", 2004), ("Alien", 1979), ("Ran", 1985)]:
+        database.add_movie(title, year)
+    database.update_movie_details("Heat", 1995, {"genre": "Crime, Drama", "director": "Michael Mann", "cast": "Al Pacino, Robert De Niro", "runtime": 170})
+    database.update_movie_details("Thief", 1981, {"genre": "Crime", "director": "Michael Mann", "cast": "James Caan", "runtime": 123})
+    database.update_movie_details("Alien", 1979, {"genre": "Horror", "director": "Ridley Scott", "runtime": 117})
+    database.set_movie_watched_status("Heat", 1995, True)
+    database.set_user_rating("Thief", 1981, 9)
+    return database
+
+def test_dashboard_matches_legacy_queries(archive):
+    """Tests that the aggregate tables agree with the row-scanning helpers."""
+    database.delete_movie("Collateral", 2004)
+    database.set_movie_watched_status("Ran", 1985, True)
+    database.set_movie_watched_status("Heat", 1995, False)
+
+    dashboard = stats.get_dashboard(top_n=3)
+
+    assert dashboard['total'] == database.get_total_movies_count() == 4
+    assert (dashboard['watched'], dashboard['unwatched']) == tuple(database.get_watched_stats()) == (1, 3)
+    assert dashboard['top_decade'] == (1980, 2)
+    assert (dashboard['oldest']['title'], dashboard['newest']['title']) == ("Alien", "Heat")
+    assert (dashboard['shortest']['title'], dashboard['longest']['title']) == ("Alien", "Heat")
+    assert (dashboard['top_rated']['title'], dashboard['top_rated']['user_rating']) == ("Thief", 9)
+    assert dashboard['top_genres'] == [("Crime", 2), ("Drama", 1), ("Horror", 1)]
+    assert dashboard['top_directors'] == database.get_top_items_from_column('director', 3) == [("Michael Mann", 2), ("Ridley Scott", 1)]
+    assert dashboard['top_keywords'] == []
+
+def test_dashboard_is_three_indexed_queries(archive):
+    """Tests that the dashboard never scans the movies or link tables."""
+    conn = database.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    stats.get_dashboard()
+    conn.set_trace_callback(None)
+
+    assert len(statements) == 3
+    for sql in statements:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        assert not any(step.startswith("SCAN movies") and "INDEX" not in step for step in plan), plan
+        assert not any("movie_entities" in step for step in plan), plan
+
+def test_stats_command_on_empty_and_filled_archive(archive):
+    """Tests the `stats` dashboard end to end."""
+    from click.testing import CliRunner
+    from popcorn_archives.cli import cli
+
+    result = CliRunner().invoke(cli, ['stats'])
+
+    assert result.exit_code == 0
+    assert "Total Movies:" in result.output and "5" in result.output
+    assert "Michael Mann" in result.output
+    assert "The 1980s (with 2 movies)" in result.output
+    assert "Thief (1981) - (9/10 ⭐)" in result.output
+
+    database.clear_all_movies()
+    assert "The archive is empty" in CliRunner().invoke(cli, ['stats']).output
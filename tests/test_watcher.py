@@ -0,0 +1,110 @@
+import sys
+import threading
+import pytest
+from popcorn_archives import database, watcher
+
+def test_sync_applies_incremental_adds_and_removes(tmp_path, file_db):
+    """Tests that each sync adds new movie folders and removes vanished ones."""
+    root = tmp_path / "Movies"
+    (root / "Drama" / "Heat (1995)").mkdir(parents=True)
+    (root / "Alien 1979").mkdir()
+    database.add_movie("Stalker", 1979)  # Not on disk: must never be removed
+    library = watcher.LibraryWatcher(root, depth=2, enrich=False)
+
+    assert library.sync() == ([("Alien", 1979), ("Heat", 1995)], 0)
+    assert library.sync() == ([], 0)
+
+    (root / "Drama" / "Heat (1995)").rename(root / "Drama" / "Thief (1981)")
+    assert library.sync() == ([("Thief", 1981)], 1)
+    assert sorted(m['title'] for m in database.get_all_movies()) == ["Alien", "Stalker", "Thief"]
+
+def test_sync_guards_against_unmounted_library_and_mass_removal(tmp_path, file_db):
+    """Tests that an emptied, vanished or mostly-moved library does not delete the archive."""
+    root = tmp_path / "Movies"
+    for year in range(2001, 2005):
+        (root / f"Film {year}").mkdir(parents=True)
+    errors = []
+    library = watcher.LibraryWatcher(root, enrich=False, max_removals=2, on_error=errors.append)
+    library.sync()
+    database.set_movie_watched_status("Film", 2001, True)
+
+    for folder in root.iterdir():
+        folder.rmdir()
+    assert library.sync() == ([], 0)  # Empty scan, e.g. an unmounted share
+
+    root.rmdir()
+    with pytest.raises(OSError):
+        library.sync()
+    library._safe_sync()
+    assert len(errors) == 2
+
+    root.mkdir()
+    (root / "Film 2004").mkdir()
+    assert library.sync() == ([], 0)  # Three folders vanished at once: over the cap
+    assert len(errors) == 3 and len(database.get_all_movies()) == 4
+
+    library.max_removals = 25
+    assert library.sync() == ([], 2)  # Still missing next time; the watched movie is kept
+    assert sorted(m['year'] for m in database.get_all_movies()) == [2001, 2004]
+
+def test_run_enqueues_new_movies_for_enrichment(tmp_path, file_db, mocker):
+    """Tests that watch mode reacts to new folders and enriches them in the background."""
+    mocker.patch('popcorn_archives.config.get_api_key', return_value="key")
+    enriched = threading.Event()
+    mocker.patch('popcorn_archives.core.fetch_many_movie_details',
+                 side_effect=lambda movies, workers: [(m, {"genre": "Crime"}) for m in movies])
+    mocker.patch('popcorn_archives.database.update_movies_details_bulk',
+                 side_effect=lambda items: enriched.set() or [True] * len(items))
+    root = tmp_path / "Movies"
+    root.mkdir()
+    changes = []
+    stop = threading.Event()
+    library = watcher.LibraryWatcher(root, trigger=watcher.PollingTrigger(interval=0.05),
+                                     on_change=lambda inserted, removed: (changes.append(inserted), stop.set()))
+    thread = threading.Thread(target=library.run, kwargs={'stop_event': stop})
+    thread.start()
+    (root / "Ronin (1998)").mkdir()
+    thread.join(timeout=5)
+
+    assert changes == [[("Ronin", 1998)]]
+    assert enriched.wait(timeout=5)
+
+def test_enricher_stop_waits_and_reports_skipped_movies(file_db, mocker):
+    """Tests that stopping lets queued enrichment finish and reports what could not."""
+    release = threading.Event()
+    mocker.patch('popcorn_archives.core.fetch_many_movie_details',
+                 side_effect=lambda movies, workers: release.wait(5) and [(m, {"genre": "Crime"}) for m in movies])
+    mock_bulk = mocker.patch('popcorn_archives.database.update_movies_details_bulk',
+                             side_effect=lambda items: [True] * len(items))
+    mock_log = mocker.patch('popcorn_archives.logger.log_error')
+
+    enricher = watcher._Enricher()
+    enricher.start()
+    enricher.enqueue([("Heat", 1995), ("Thief", 1981)])
+    assert enricher.stop(timeout=0.05) == 2
+    assert mock_log.call_args.kwargs['skipped'] == 2
+
+    release.set()
+    enricher.join(timeout=5)
+    assert enricher.pending == 0 and mock_bulk.call_count == 1
+
+    finished = watcher._Enricher()
+    finished.start()
+    finished.enqueue([("Alien", 1979)])
+    assert finished.stop() == 0 and not finished.is_alive()
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify is Linux-only")
+def test_inotify_trigger_debounces_folder_events(tmp_path):
+    """Tests that a burst of folder events is reported once, after it settles."""
+    trigger = watcher.InotifyTrigger()
+    try:
+        trigger.watch([str(tmp_path)])
+        assert trigger.wait(timeout=0.05, debounce=0.05) is False
+        for name in ("A (2001)", "B (2002)", "C (2003)"):
+            (tmp_path / name).mkdir()
+        assert trigger.wait(timeout=1, debounce=0.1) is True
+        assert trigger.wait(timeout=0.05, debounce=0.05) is False
+        (tmp_path / "notes.txt").touch()  # Files are not movie folders
+        assert trigger.wait(timeout=0.1, debounce=0.05) is False
+    finally:
+        trigger.close()